@@ -2,9 +2,11 @@ import streamlit as st
 import pandas as pd
 import time
 import plotly.express as px
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 from src.scrapers.price import PriceMonitor
+from src.scrapers.price_history import PriceHistory
+from utils.lot_store import SOURCES, load_lots, source_fingerprint
 
 
 st.set_page_config(
@@ -13,22 +15,26 @@ st.set_page_config(
     layout="wide"
 )
 
-@st.cache_data(ttl=10)  # 10 seconds cache
-def load_data():
+PRODUCTS_CSV = 'data/output/products.csv'
+PUBLISHED_CSV = 'data/check/published_products.csv'
+
+
+@st.cache_data(max_entries=2)  # Reloaded only when one of the files changes
+def load_data(fingerprint):
     try:
-        if os.path.exists('data/output/products.csv'):
-            products_df = pd.read_csv('data/output/products.csv')
+        if os.path.exists(PRODUCTS_CSV):
+            products_df = pd.read_csv(PRODUCTS_CSV)
         else:
             products_df = pd.DataFrame()
             
-        if os.path.exists('data/output/lots_details.csv'):
-            lots_df = pd.read_csv('data/output/lots_details.csv')
+        if os.path.exists(SOURCES['lots']):
+            lots_df = load_lots('lots')
         else:
             lots_df = pd.DataFrame()
             
         # Load price monitoring data
-        if os.path.exists('data/check/published_products.csv'):
-            price_df = pd.read_csv('data/check/published_products.csv')
+        if os.path.exists(PUBLISHED_CSV):
+            price_df = pd.read_csv(PUBLISHED_CSV)
         else:
             price_df = pd.DataFrame()
             
@@ -37,6 +43,16 @@ def load_data():
         st.error(f"Data loading error: {str(e)}")
         return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
+@st.cache_data(ttl=10)
+def load_price_history(urls, hours):
+    """Bid trajectories for the selected lots over the last `hours` hours"""
+    try:
+        start = datetime.now() - timedelta(hours=hours)
+        return PriceHistory().query(urls=list(urls), start=start)
+    except Exception as e:
+        st.error(f"Price history loading error: {str(e)}")
+        return pd.DataFrame(columns=['url', 'timestamp', 'price'])
+
 def main():
     st.title("📊 IBidder Auction Monitor")
     
@@ -56,7 +72,7 @@ def main():
         st.cache_data.clear()
     
     # Load data
-    products_df, lots_df, price_df = load_data()
+    products_df, lots_df, price_df = load_data(source_fingerprint(PRODUCTS_CSV, SOURCES['lots'], PUBLISHED_CSV))
     
     # Display selected page
     if page == "Price Monitor":
@@ -67,20 +83,21 @@ def main():
         with col1:
             if st.button("Start Price Monitor"):
                 monitor = PriceMonitor(driver_count=2, tabs_per_driver=2)
+                monitor.start()
                 st.session_state['price_monitor'] = monitor
                 st.success("Price monitoring started!")
                 
         with col2:
             if st.button("Stop Monitor"):
                 if 'price_monitor' in st.session_state:
-                    st.session_state['price_monitor'].stop_event.set()
+                    st.session_state['price_monitor'].stop()
                     del st.session_state['price_monitor']
                     st.info("Price monitoring stopped.")
                     
         with col3:
             if st.button("Check Now"):
                 if 'price_monitor' in st.session_state:
-                    st.session_state['price_monitor'].monitor_urls()
+                    st.session_state['price_monitor'].check_now()
                     st.success("Price check initiated!")
         
         # Display price monitoring data
@@ -102,6 +119,35 @@ def main():
                                labels={'value': 'Price (£)', 'variable': 'Price Type'},
                                barmode='group')
                     st.plotly_chart(fig)
+
+            # Bid trajectories from the price history store
+            st.subheader("📈 Price History")
+            titles = price_df.set_index('auction_url')['title'].to_dict()
+            hcol1, hcol2 = st.columns([3, 1])
+            with hcol1:
+                selected_urls = st.multiselect(
+                    "Lots",
+                    options=list(titles),
+                    default=list(titles)[:5],
+                    format_func=lambda url: str(titles.get(url, url))[:80]
+                )
+            with hcol2:
+                hours = st.selectbox("Time Range (hours)", [6, 24, 72, 168], index=1)
+
+            history_df = load_price_history(tuple(selected_urls), hours)
+            if not history_df.empty:
+                history_df['title'] = history_df['url'].map(titles)
+                fig = px.line(history_df,
+                              x='timestamp',
+                              y='price',
+                              color='title',
+                              line_shape='hv',
+                              markers=True,
+                              title='Bid Trajectories',
+                              labels={'price': 'Price (£)', 'timestamp': 'Time'})
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No price history for the selected lots yet.")
         else:
             st.info("No price monitoring data available.")
     
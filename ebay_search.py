@@ -7,17 +7,28 @@ from selenium.webdriver.support import expected_conditions as EC
 import time
 from tqdm import tqdm
 import re
-from difflib import SequenceMatcher
 from selenium.webdriver.common.keys import Keys
 import threading
 from queue import Queue
-from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
+from src.scrapers.browser_pool import BrowserPool
+from src.scrapers.checkpoint import atomic_write_csv, open_committed
+from src.scrapers.rate_limit import RateLimiter
+from src.scrapers.core import HttpBackend
+from src.scrapers.ebay_listings import parse_sold_listings
+from src.scrapers.price_cache import MarketPriceCache, STALE
+from src.scrapers.title_matcher import TitleMatcher
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-GB,en;q=0.9'
+}
 
 def read_lots_details():
     """Read products from lots_details.csv"""
     products = []
     try:
-        with open('data/output/lots_details.csv', 'r', encoding='utf-8') as file:
+        with open_committed('data/output/lots_details.csv') as file:
             reader = csv.DictReader(file)
             products = list(reader)
         print(f"Total {len(products)} products loaded")
@@ -26,11 +37,38 @@ def read_lots_details():
         print(f"CSV reading error: {str(e)}")
         return []
 
+EMPTY_RESULT = {
+    'ebay_url': '',
+    'google_url': '',
+    'ebay_lowest_price': '',
+    'suggested_price': '',
+    'all_prices': [],
+    'price_source': ''
+}
+
 class EbaySearchManager:
-    def __init__(self):
+    def __init__(self, browsers=4, tabs_per_browser=2, rate=2.0, search_mode='http', http_workers=8, http_rate=4.0, use_cache=True,
+                 progress=None):
         self.setup_driver()
-        self.thread_count = 10
+        # 'http': sayfa HTTP ile çekilip parse edilir, browser sadece fallback; 'browser': her arama Selenium
+        self.search_mode = search_mode
+        self.http_workers = http_workers
+        self.http_rate = http_rate
+        self.browsers = browsers
+        self.tabs_per_browser = tabs_per_browser
+        self.rate = rate
+        self.pool = None
         self.result_queue = Queue()
+        # Normalize başlık / model numarası ile kalıcı piyasa fiyatı cache'i
+        self.cache = MarketPriceCache() if use_cache else None
+        self.revalidation = None
+        self.matcher = TitleMatcher()
+        # Opsiyonel progress(stage, done, total) callback (arka plan job'ları için)
+        self.progress = progress
+
+    def report(self, stage, done, total):
+        if self.progress:
+            self.progress(stage, done, total)
 
     def setup_driver(self):
         """Configure Chrome driver"""
@@ -40,6 +78,51 @@ class EbaySearchManager:
         self.chrome_options.add_argument('--no-sandbox')
         self.chrome_options.add_argument('--disable-dev-shm-usage')
 
+    def create_driver(self):
+        return webdriver.Chrome(options=self.chrome_options)
+
+    def get_pool(self):
+        """Shared browser pool; every search job goes through one work queue"""
+        if self.pool is None:
+            self.pool = BrowserPool(
+                browsers=self.browsers,
+                tabs_per_browser=self.tabs_per_browser,
+                driver_factory=self.create_driver,
+                rate_limiter=RateLimiter(self.rate) if self.rate else None,
+                url_getter=lambda job: job['search_url']
+            ).start()
+        return self.pool
+
+    def close(self):
+        # Stale fiyat yenilemesi bitmeden dönme: job worker'ı çıkınca thread de ölür
+        if self.revalidation is not None:
+            self.revalidation.join()
+            self.revalidation = None
+        if self.pool is not None:
+            print(self.pool.format_stats())
+            self.pool.close()
+            self.pool = None
+
+    def build_search_url(self, title):
+        """eBay UK sold/completed listings search for a product title"""
+        cleaned_title = self.clean_product_title(title)
+        return f"https://www.ebay.co.uk/sch/i.html?_nkw={quote_plus(cleaned_title)}&LH_Complete=1&LH_Sold=1"
+
+    def build_google_url(self, title):
+        cleaned_title = self.clean_product_title(title)
+        return f"https://www.google.co.uk/search?tbm=shop&hl=en-GB&gl=uk&q={quote_plus(cleaned_title)}"
+
+    def search(self, title):
+        """Search one title (HTTP first, then the shared pool)"""
+        if self.search_mode == 'http':
+            result = self.search_http([title]).get(title)
+            if result:
+                return result
+        job = {'title': title, 'search_url': self.build_search_url(title)}
+        for _, result in self.get_pool().map(
+                lambda driver, job: self.search_single_product(driver, job['title'], navigate=False), [job]):
+            return result
+
     def extract_price(self, price_text):
         """Extract numerical value from price text"""
         try:
@@ -62,7 +145,7 @@ class EbaySearchManager:
 
     def check_title_similarity(self, listing_title, original_title):
         """Check if listing title is similar enough to original title"""
-        return SequenceMatcher(None, listing_title.lower(), original_title.lower()).ratio() > 0.8
+        return self.matcher.is_match(listing_title, original_title)
 
     def clean_product_title(self, title):
         """Clean product title for better search results"""
@@ -96,24 +179,27 @@ class EbaySearchManager:
         
         return ' '.join(important_words)
 
-    def search_google_shopping(self, title):
+    def search_google_shopping(self, title, driver=None):
         """Search Google Shopping for price backup with average pricing"""
-        driver = webdriver.Chrome(options=self.chrome_options)
+        if driver is None:
+            job = {'title': title, 'search_url': self.build_google_url(title)}
+            for _, result in self.get_pool().map(
+                    lambda driver, job: self.search_google_shopping(job['title'], driver), [job]):
+                return result
+            return None
+
         try:
-            # Clean the title for better search results
             cleaned_title = self.clean_product_title(title)
             print(f"\nSearching Google Shopping for: {cleaned_title}")
-            
-            # Go to Google Shopping with UK settings
-            driver.get("https://shopping.google.co.uk")
-            time.sleep(2)
-            
-            # Find and use the search box
-            search_box = driver.find_element(By.NAME, "q")
-            search_box.clear()
-            search_box.send_keys(cleaned_title)
-            search_box.send_keys(Keys.RETURN)
-            time.sleep(2)
+
+            # Pool sayfayı zaten yükledi; fiyatlar görünene kadar bekle
+            try:
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "span.T14wmb"))
+                )
+            except Exception:
+                print(f"No Google Shopping prices for: {cleaned_title}")
+                return None
             
             # Store search URL
             search_url = driver.current_url
@@ -153,220 +239,238 @@ class EbaySearchManager:
             
         except Exception as e:
             print(f"Google Shopping search error: {str(e)}")
-        finally:
-            driver.quit()
         
         return None
 
-    def process_batch(self, batch):
-        """Process a batch of products"""
-        try:
-            driver = webdriver.Chrome(options=self.chrome_options)
-            
-            for product in batch:
-                try:
-                    title = product['name']
-                    print(f"\nProcessing: {title}")
-                    
-                    result = self.search_single_product(driver, title)
-                    if result:
-                        print(f"Found result for {title}:")
-                        print(f"Price: {result.get('ebay_lowest_price', 'Not Found')}")
-                        print(f"Link: {result.get('ebay_product_link', 'Not Found')}")
-                        
-                        # Queue'ya eklerken kontrol et
-                        print(f"Adding to queue: {title}")
-                        self.result_queue.put((title, result))
-                        print(f"Added to queue successfully: {title}")
-                    else:
-                        print(f"No result found for: {title}")
-                        # Boş sonuç da ekleyelim
-                        empty_result = {
-                            'ebay_url': '',
-                            'ebay_product_link': '',
-                            'google_url': '',
-                            'ebay_lowest_price': '',
-                            'suggested_price': '',
-                            'all_prices': [],
-                            'price_source': ''
-                        }
-                        self.result_queue.put((title, empty_result))
-                    
-                except Exception as e:
-                    print(f"Error processing product {title}: {str(e)}")
-                    continue
-                
-            driver.quit()
-            
-        except Exception as e:
-            print(f"Batch processing error: {str(e)}")
-
-    def search_single_product(self, driver, title):
-        """Search for a single product using provided driver"""
-        try:
-            wait = WebDriverWait(driver, 10)
-            
-            cleaned_title = self.clean_product_title(title)
-            search_url = f"https://www.ebay.co.uk/sch/i.html?_nkw={cleaned_title.replace(' ', '+')}&LH_Complete=1&LH_Sold=1"
-            
-            driver.get(search_url)
-            time.sleep(3)
-
-            best_match = None
-            highest_similarity = 0
-            best_price = None
-            best_link = None
-            returning_link = None  # Returning result için link
-            all_prices = []
+    def read_browser_listings(self, driver):
+        """Listings from a loaded search page, in parse_sold_listings format"""
+        wait = WebDriverWait(driver, 10)
+        elements = wait.until(EC.presence_of_all_elements_located((
+            By.CSS_SELECTOR, "li.s-item"
+        )))
 
+        listings = []
+        for listing in elements[:10]:
             try:
-                listings = wait.until(EC.presence_of_all_elements_located((
-                    By.CSS_SELECTOR, "li.s-item"
-                )))
+                # Get title and link
+                listing_title = listing.find_element(By.CSS_SELECTOR, "div.s-item__title").text
+                product_link = listing.find_element(By.CSS_SELECTOR, "a.s-item__link").get_attribute('href')
 
-                for listing in listings[:10]:
+                # Try multiple price selectors
+                price_text = None
+                for selector in [
+                    "span.s-item__price",
+                    "span.POSITIVE",
+                    "span.s-item__price span.POSITIVE",
+                    "span.s-item__price span"
+                ]:
                     try:
-                        # Get title and link
-                        title_elem = listing.find_element(By.CSS_SELECTOR, "div.s-item__title")
-                        listing_title = title_elem.text
-                        
-                        # Her listing için linki al
-                        link_elem = listing.find_element(By.CSS_SELECTOR, "a.s-item__link")
-                        product_link = link_elem.get_attribute('href')
-                        
-                        # İlk returning result linkini kaydet
-                        if not returning_link:
-                            returning_link = product_link
-                            print(f"\nSaved first returning result link: {returning_link}")
-                        
-                        # Try multiple price selectors
-                        price_text = None
-                        for selector in [
-                            "span.s-item__price",
-                            "span.POSITIVE",
-                            "span.s-item__price span.POSITIVE",
-                            "span.s-item__price span"
-                        ]:
-                            try:
-                                price_elem = listing.find_element(By.CSS_SELECTOR, selector)
-                                price_text = price_elem.text.strip()
-                                if price_text and '£' in price_text:
-                                    break
-                            except:
-                                continue
-                        
-                        if not price_text:
-                            continue
-                        
-                        # Check if item is sold
-                        try:
-                            sold_elem = listing.find_element(
-                                By.CSS_SELECTOR, "span.POSITIVE:not(.s-item__price span.POSITIVE)"
-                            )
-                            is_sold = "Sold" in sold_elem.text
-                        except:
-                            try:
-                                sold_elem = listing.find_element(
-                                    By.CSS_SELECTOR, "span.s-item__caption--signal"
-                                )
-                                is_sold = "Sold" in sold_elem.text
-                            except:
-                                is_sold = False
-                        
-                        if is_sold and price_text:
-                            price = self.extract_price(price_text)
-                            if price:
-                                similarity = SequenceMatcher(None, listing_title.lower(), title.lower()).ratio()
-                                print(f"\nFound listing: {listing_title}")
-                                print(f"Similarity: {similarity:.2f}")
-                                print(f"Price: £{price:.2f}")
-                                print(f"Link: {product_link}")
-                                
-                                # En iyi eşleşmeyi güncelle
-                                if similarity > highest_similarity and similarity > 0.5:
-                                    highest_similarity = similarity
-                                    best_match = listing
-                                    best_price = price
-                                    best_link = product_link
-                                    print("-> New best match!")
-                                
-                                # Tüm fiyatları kaydet
-                                all_prices.append(f"£{price:.2f}")
-                    
-                    except Exception as e:
-                        print(f"Error processing listing: {str(e)}")
+                        price_elem = listing.find_element(By.CSS_SELECTOR, selector)
+                        price_text = price_elem.text.strip()
+                        if price_text and '£' in price_text:
+                            break
+                    except:
                         continue
 
-                # Sonuç oluştur
-                if best_match and best_price:
-                    print("\nUsing best match result")
-                    suggested_price = best_price * 0.98
-                    result = {
-                        'ebay_url': best_link,
-                        'google_url': '',
-                        'ebay_lowest_price': f"£{best_price:.2f}",
-                        'suggested_price': f"£{suggested_price:.2f}",
-                        'all_prices': all_prices,
-                        'price_source': 'ebay_sold'
-                    }
-                elif returning_link:
-                    print("\nNo best match found, using returning result")
-                    result = {
-                        'ebay_url': returning_link,
-                        'google_url': '',
-                        'ebay_lowest_price': '',
-                        'suggested_price': '',
-                        'all_prices': all_prices,
-                        'price_source': 'ebay_sold'
-                    }
-                else:
-                    print("\nNo suitable links found")
-                    result = {
-                        'ebay_url': '',
-                        'google_url': '',
-                        'ebay_lowest_price': '',
-                        'suggested_price': '',
-                        'all_prices': [],
-                        'price_source': ''
-                    }
+                # Check if item is sold
+                try:
+                    sold_elem = listing.find_element(
+                        By.CSS_SELECTOR, "span.POSITIVE:not(.s-item__price span.POSITIVE)"
+                    )
+                    is_sold = "Sold" in sold_elem.text
+                except:
+                    try:
+                        sold_elem = listing.find_element(
+                            By.CSS_SELECTOR, "span.s-item__caption--signal"
+                        )
+                        is_sold = "Sold" in sold_elem.text
+                    except:
+                        is_sold = False
 
-                print("\nReturning result:")
-                print(result)
-                
-                return result
-                
+                listings.append({
+                    'title': listing_title,
+                    'link': product_link,
+                    'price_text': price_text or '',
+                    'price': self.extract_price(price_text) if price_text else None,
+                    'sold': is_sold
+                })
+            except Exception as e:
+                print(f"Error processing listing: {str(e)}")
+                continue
+        return listings
+
+    def build_result(self, title, listings):
+        """Pick the best sold listing for title from parsed search results"""
+        best_price = None
+        best_link = None
+        highest_similarity = 0
+        returning_link = None  # Returning result için link
+        all_prices = []
+
+        listings = listings[:10]
+        # Sayfadaki tüm başlıklar tek seferde skorlanır
+        similarities = self.matcher.score(title, [listing['title'] for listing in listings])
+        for listing, similarity in zip(listings, similarities):
+            # İlk returning result linkini kaydet
+            if not returning_link and listing['link']:
+                returning_link = listing['link']
+
+            price = listing['price']
+            if not listing['sold'] or not price:
+                continue
+
+            print(f"\nFound listing: {listing['title']}")
+            print(f"Similarity: {similarity:.2f}")
+            print(f"Price: £{price:.2f}")
+
+            # En iyi eşleşmeyi güncelle
+            if similarity > highest_similarity and similarity > self.matcher.threshold:
+                highest_similarity = similarity
+                best_price = price
+                best_link = listing['link']
+                print("-> New best match!")
+
+            # Tüm fiyatları kaydet
+            all_prices.append(f"£{price:.2f}")
+
+        # Sonuç oluştur
+        if best_price:
+            return {
+                'ebay_url': best_link,
+                'google_url': '',
+                'ebay_lowest_price': f"£{best_price:.2f}",
+                'suggested_price': f"£{best_price * 0.98:.2f}",
+                'all_prices': all_prices,
+                'price_source': 'ebay_sold'
+            }
+        if returning_link:
+            print("\nNo best match found, using returning result")
+            return {
+                'ebay_url': returning_link,
+                'google_url': '',
+                'ebay_lowest_price': '',
+                'suggested_price': '',
+                'all_prices': all_prices,
+                'price_source': 'ebay_sold'
+            }
+        print("\nNo suitable links found")
+        return dict(EMPTY_RESULT)
+
+    def search_single_product(self, driver, title, navigate=True):
+        """Search for a single product using provided driver (navigate=False: page already loaded)"""
+        try:
+            if navigate:
+                driver.get(self.build_search_url(title))
+            try:
+                listings = self.read_browser_listings(driver)
             except Exception as e:
                 print(f"Error finding listings: {str(e)}")
                 return None
-            
+            return self.build_result(title, listings)
         except Exception as e:
             print(f"Error searching for {title}: {str(e)}")
             return None
 
+    def search_http(self, titles, report=True):
+        """HTTP fast path: {title: result} for titles whose results page fetched and parsed"""
+        urls = {self.build_search_url(title): title for title in titles}
+        results = {}
+        backend = HttpBackend(headers=HTTP_HEADERS, workers=self.http_workers, rate=self.http_rate)
+        try:
+            fetched = tqdm(backend.fetch_many(list(urls)), total=len(urls), desc="eBay HTTP")
+            for done, (url, html) in enumerate(fetched, 1):
+                if report:
+                    self.report('ebay_http', done, len(urls))
+                listings = parse_sold_listings(html, limit=10) if html else []
+                # Boş sayfa (captcha / bot kontrolü olabilir) -> browser fallback
+                if listings:
+                    results[urls[url]] = self.build_result(urls[url], listings)
+        finally:
+            backend.close()
+        return results
+
+    def search_titles(self, titles):
+        """{title: result} - HTTP first, remaining titles on the shared browser pool"""
+        jobs = [{'title': title, 'search_url': self.build_search_url(title)} for title in titles]
+        results = {}
+        if jobs and self.search_mode == 'http':
+            results = self.search_http(titles)
+            jobs = [job for job in jobs if job['title'] not in results]
+            print(f"HTTP parsed {len(results)} titles, {len(jobs)} left for the browser fallback")
+
+        if jobs:
+            pool = self.get_pool()
+            search = lambda driver, job: self.search_single_product(driver, job['title'], navigate=False)
+            searched = tqdm(pool.map(search, jobs), total=len(jobs), desc="eBay browser")
+            for done, (job, result) in enumerate(searched, 1):
+                results[job['title']] = result or dict(EMPTY_RESULT)
+                self.report('ebay_browser', done, len(jobs))
+
+            metrics = pool.metrics()
+            print(f"Browser throughput: {metrics['jobs_per_min']:.1f} searches/min, "
+                  f"p50 {metrics['p50_seconds']:.2f}s, p95 {metrics['p95_seconds']:.2f}s")
+        return results
+
+    def cache_results(self, results_by_key):
+        """Store {key: (title, result)}; empty results (nothing found / failed) are not cached"""
+        entries = {key: (self.clean_product_title(title), result)
+                   for key, (title, result) in results_by_key.items()
+                   if result and (result.get('ebay_url') or result.get('ebay_lowest_price'))}
+        if entries:
+            self.cache.put_many(entries)
+
+    def revalidate(self, stale):
+        """Refresh stale cache entries {key: title} over HTTP in the background (close() waits for it)"""
+        def run():
+            try:
+                # Job ilerlemesine raporlanmaz: iş bittikten sonra job kaydını değiştirmemeli
+                fetched = self.search_http(list(stale.values()), report=False)
+                self.cache_results({key: (title, fetched.get(title)) for key, title in stale.items()})
+                print(f"Revalidated {len(fetched)}/{len(stale)} stale market prices")
+            except Exception as e:
+                print(f"Revalidation error: {str(e)}")
+
+        self.revalidation = threading.Thread(target=run)
+        self.revalidation.start()
+        return self.revalidation
+
     def process_all_products(self, products):
-        """Process all products using thread pool with improved result handling"""
+        """Price every distinct title: cache first, one search per uncached title / model number"""
         try:
-            # Split products into batches
-            batch_size = max(1, len(products) // self.thread_count)
-            batches = [products[i:i + batch_size] for i in range(0, len(products), batch_size)]
-            
-            print(f"\nProcessing {len(products)} products in {len(batches)} batches")
-            
-            # Process batches in parallel
-            with ThreadPoolExecutor(max_workers=self.thread_count) as executor:
-                executor.map(self.process_batch, batches)
-            
-            # Collect and verify results
+            titles = list(dict.fromkeys(product['name'] for product in products))
+            print(f"\nProcessing {len(products)} products ({len(titles)} distinct titles)")
+            if self.cache is None:
+                results = self.search_titles(titles)
+                print(f"\nTotal results collected: {len(results)}")
+                return results
+
+            # Aynı temiz başlık / model numarası (ve aynı ürün) -> tek arama
+            cleaned = {title: self.clean_product_title(title) for title in titles}
+            query_keys, cached = self.cache.lookup(cleaned.values())
+            keys = {title: query_keys[query] for title, query in cleaned.items()}
+            to_search, stale = {}, {}
+            for title, key in keys.items():
+                if key not in cached:
+                    to_search.setdefault(key, title)
+                elif cached[key][1] == STALE:
+                    stale.setdefault(key, title)
+            print(f"Price cache: {len(cached) - len(stale)} fresh, {len(stale)} stale, "
+                  f"{len(to_search)} to search")
+
+            fetched = self.search_titles(list(to_search.values()))
+            self.cache_results({key: (title, fetched.get(title)) for key, title in to_search.items()})
+
             results = {}
-            print("\nCollecting results from queue...")
-            while not self.result_queue.empty():
-                title, result = self.result_queue.get()
-                if result:  # Only add valid results
-                    print(f"Found result for: {title}")
-                    print(f"Price: {result.get('ebay_lowest_price', 'Not Found')}")
-                    print(f"Link: {result.get('ebay_product_link', 'Not Found')}")  # Link'i de yazdır
-                    results[title] = result
-            
+            for title, key in keys.items():
+                if key in cached:
+                    results[title] = cached[key][0]
+                else:
+                    results[title] = fetched.get(to_search[key]) or dict(EMPTY_RESULT)
+
+            # Stale sonuçlar hemen kullanılır, arka planda yenilenir
+            if stale:
+                self.revalidate(stale)
+
             print(f"\nTotal results collected: {len(results)}")
             return results
             
@@ -391,8 +495,10 @@ class EbaySearchManager:
             print(f"Cost calculation error: {str(e)}")
             return None
 
-def save_results(products):
-    """Save results to CSV with detailed logging"""
+OUTPUT_FILE = 'data/output/lots_details_with_ebay.csv'
+
+def save_results(products, output_file=OUTPUT_FILE):
+    """Save results to CSV with detailed logging (written atomically, extra keys ignored)"""
     try:
         print("\nSaving results to CSV...")
         fieldnames = [
@@ -417,41 +523,58 @@ def save_results(products):
         products_with_prices = sum(1 for p in products if p.get('ebay_lowest_price') not in [None, '', 'Not Found'])
         print(f"\nTotal products with prices: {products_with_prices} out of {len(products)}")
         
-        with open('data/output/lots_details_with_ebay.csv', 'w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
+        for product in products:
+            # Ensure all required fields exist
+            for field in fieldnames:
+                if field not in product:
+                    product[field] = ''
             
-            for product in products:
-                # Ensure all required fields exist
-                for field in fieldnames:
-                    if field not in product:
-                        product[field] = ''
-                
-                # Convert None values to empty strings
-                for key in product:
-                    if product[key] is None:
-                        product[key] = ''
-                
-                writer.writerow(product)
+            # Convert None values to empty strings
+            for key in product:
+                if product[key] is None:
+                    product[key] = ''
+        
+        # Temp file + rename: a failing row can't leave a truncated CSV behind
+        atomic_write_csv(output_file, fieldnames, products)
             
         print("\nResults saved successfully!")
         
         # Verify saved data
         print("\nVerifying saved data...")
-        with open('data/output/lots_details_with_ebay.csv', 'r', encoding='utf-8') as file:
+        with open(output_file, 'r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
             saved_products = list(reader)
             prices_found = sum(1 for p in saved_products if p['ebay_lowest_price'] not in ['', 'Not Found'])
             print(f"Verified prices in CSV: {prices_found} products have prices")
+        return True
             
     except Exception as e:
         print(f"\nError saving results: {str(e)}")
         print("Full error traceback:")
         import traceback
         traceback.print_exc()
+        return False
+
+def check_save_results():
+    """Save a priced and a not-found product to a temp CSV and read both back"""
+    import tempfile
+    products = [
+        {'name': 'Priced lot', 'url': 'https://fixture.local/lot/1', 'ebay_url': 'https://fixture.local/itm/1',
+         'google_url': '', 'ebay_lowest_price': '£10.00', 'suggested_price': '£9.80',
+         'all_prices': ['£10.00'], 'price_source': 'ebay_sold'},
+        {'name': 'Unfound lot', 'url': 'https://fixture.local/lot/2', 'extra_column': 'x', **EMPTY_RESULT},
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, 'lots_details_with_ebay.csv')
+        saved = save_results(products, output_file)
+        with open(output_file, 'r', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+    ok = saved and [row['name'] for row in rows] == ['Priced lot', 'Unfound lot'] and rows[1]['ebay_lowest_price'] == ''
+    print(f"\nSave check {'passed' if ok else 'FAILED'}: {len(rows)} rows written")
+    return ok
 
-def main():
-    """Main process flow with improved error handling"""
+def main(progress=None):
+    """Main process flow with improved error handling (progress: optional progress(stage, done, total) callback)"""
     try:
         products = read_lots_details()
         if not products:
@@ -460,8 +583,11 @@ def main():
         
         print(f"\nLoaded {len(products)} products")
         
-        ebay_manager = EbaySearchManager()
-        results = ebay_manager.process_all_products(products)
+        ebay_manager = EbaySearchManager(progress=progress)
+        try:
+            results = ebay_manager.process_all_products(products)
+        finally:
+            ebay_manager.close()
         
         print(f"\nProcessing complete. Found {len(results)} results")
         
@@ -488,12 +614,17 @@ def main():
             print(f"eBay Price: {product.get('ebay_lowest_price', 'Not Set')}")
         
         save_results(products)
+        return True
         
     except Exception as e:
         print(f"\nMain process error: {str(e)}")
         print("Full error traceback:")
         import traceback
         traceback.print_exc()
+        return False
 
 if __name__ == "__main__":
+    import sys
+    if '--check' in sys.argv[1:]:
+        sys.exit(0 if check_save_results() else 1)
     main() 
\ No newline at end of file
@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from utils.lot_store import load_lots
 
 st.set_page_config(
     page_title="i-bidder Data Center",
@@ -12,29 +13,17 @@ st.set_page_config(
 
 st.title("📊 i-bidder Data Center")
 
-def clean_price(price_str):
-    """Clean price string and convert to float"""
-    try:
-        if pd.isna(price_str):
-            return 0.0
-        return float(str(price_str).replace('GBP', '').replace('£', '').replace(',', '').strip())
-    except:
-        return 0.0
-
 try:
     # Load data
-    lots_df = pd.read_csv('./data/output/lots_details.csv')
-    lots_with_ebay_df = pd.read_csv('./data/output/lots_details_with_ebay.csv')
+    lots_df = load_lots('lots')
+    lots_with_ebay_df = load_lots('lots_with_ebay')
     
-    # Clean price data
-    lots_df['current_bid'] = lots_df['current_bid'].apply(clean_price)
-    lots_with_ebay_df['ebay_lowest_price'] = lots_with_ebay_df['ebay_lowest_price'].apply(clean_price)
+    # Price columns are already floats in the store; missing prices count as 0
+    lots_df['current_bid'] = lots_df['current_bid_value'].fillna(0.0)
+    lots_with_ebay_df['ebay_lowest_price'] = lots_with_ebay_df['ebay_lowest_price'].fillna(0.0)
     
     # Calculate total cost including fees
-    lots_df['total_cost'] = lots_df.apply(
-        lambda row: row['current_bid'] * (1 + float(row['commission'])/100 + float(row['vat_rate'])/100), 
-        axis=1
-    )
+    lots_df['total_cost'] = lots_df['current_bid'] * (1 + lots_df['commission']/100 + lots_df['vat_rate']/100)
     
     # Dashboard metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -140,9 +129,8 @@ try:
     with tab3:
         # Time Analysis
         try:
-            # Tarih formatını düzelt
-            lots_df['bidding_ends'] = lots_df['bidding_ends'].str.replace('Bidding ends:', '').str.strip()
-            lots_df['bidding_ends'] = pd.to_datetime(lots_df['bidding_ends'], format='%d %b %Y %H:%M GMT')
+            # Bitiş zamanı store'da zaten datetime
+            lots_df['bidding_ends'] = lots_df['ends_at']
             lots_df['days_left'] = (lots_df['bidding_ends'] - pd.Timestamp.now()).dt.total_seconds() / (24*60*60)
             
             # Zaman analizi grafikleri
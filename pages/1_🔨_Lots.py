@@ -8,29 +8,22 @@ import signal
 import nest_asyncio
 import time
 from datetime import datetime
+from utils.lot_store import ENRICHMENT_STORE, SOURCES, load_lots, source_fingerprint, store_path, with_enrichment
+from utils.job_status import show_job_controls
 
-@st.cache_data(ttl=2)
-def load_lots_data():
-    """Load data from lots_details.csv"""
+@st.cache_data(max_entries=2)
+def load_lots_data(fingerprint):
+    """Load data from lots_details.csv (fingerprint: source and enrichment file stats, the cache key)"""
     try:
         if os.path.exists('data/output/lots_details.csv'):
-            lots_df = pd.read_csv('data/output/lots_details.csv')
-            
-            # Clean data
-            def clean_percentage(value):
-                if pd.isna(value):
-                    return 0.0
-                if isinstance(value, str):
-                    return float(value.replace('%', '').strip())
-                return float(value)
-            
-            lots_df['commission'] = lots_df['commission'].apply(clean_percentage)
-            lots_df['vat_rate'] = lots_df['vat_rate'].apply(clean_percentage)
+            # Typed frame from the shared store: rates are floats, images are lists
+            lots_df = with_enrichment(load_lots('lots'))
             
             # Fill NaN values
+            lots_df['commission'] = lots_df['commission'].fillna(0.0)
+            lots_df['vat_rate'] = lots_df['vat_rate'].fillna(0.0)
             lots_df['url'] = lots_df['url'].fillna('')
             lots_df['current_bid'] = lots_df['current_bid'].fillna('No Bid')
-            lots_df['images'] = lots_df['images'].fillna('[]').apply(eval)
             
             return lots_df
         else:
@@ -88,40 +81,10 @@ class Dashboard:
             info_placeholder.info("This will fetch new data from i-bidder.com")
         
         with col2:
-            if st.button("Update Data", type="primary", help="Fetch new data from i-bidder"):
-                with st.spinner("Updating data... This may take a while..."):
-                    try:
-                        # Import scraper
-                        from src.scrapers.ibidder_scraper import run_scraper
-                        
-                        # Create progress bar
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        
-                        # Run the scraper
-                        status_text.text("Step 1/2: Fetching product listings...")
-                        progress_bar.progress(25)
-                        
-                        if run_scraper():
-                            progress_bar.progress(100)
-                            status_text.text("Completed! Refreshing page...")
-                            st.success("✅ Data updated successfully!")
-                            time.sleep(2)  # Give time to see success message
-                            st.rerun()  # Refresh the page
-                        else:
-                            progress_bar.empty()
-                            status_text.empty()
-                            st.error("❌ Error updating data")
-                            
-                    except Exception as e:
-                        st.error(f"Error running scraper: {str(e)}")
-                    finally:
-                        # Clean up progress indicators
-                        try:
-                            progress_bar.empty()
-                            status_text.empty()
-                        except:
-                            pass
+            # Scraper ayrı bir worker process'te çalışır; sayfa bloklanmaz
+            show_job_controls('scraper', "Update Data", help="Fetch new data from i-bidder")
+            show_job_controls('enrichment', "Enrich Products",
+                              help="Generate descriptions, brand and model for the lots with ChatGPT")
 
     def show_metrics(self):
         if st.session_state.lots_df is not None:
@@ -131,7 +94,7 @@ class Dashboard:
                 st.metric("Total Lots", len(st.session_state.lots_df))
             
             with col2:
-                has_current = st.session_state.lots_df['has_current_bid'].eq('TRUE').sum()
+                has_current = st.session_state.lots_df['has_current_bid'].sum()
                 st.metric("Lots with Bids", has_current)
             
             with col3:
@@ -188,6 +151,12 @@ class Dashboard:
                 # Lot name
                 st.markdown(f"**{lot.get('name', 'N/A')}**")
                 
+                # ChatGPT enrichment (once the enrichment job has covered this lot)
+                if lot.get('brand') or lot.get('model_number'):
+                    st.markdown(f"🏷️ {lot.get('brand') or '-'} / {lot.get('model_number') or '-'}")
+                if lot.get('technical_description'):
+                    st.caption(lot['technical_description'])
+                
                 # Bid information
                 if lot.get('has_current_bid'):
                     st.markdown(f"🔨 Current Bid: {lot['current_bid']}")
@@ -264,14 +233,8 @@ class Dashboard:
         
         st.markdown("---")
         
-        # Check if it's time to refresh
-        current_time = time.time()
-        if auto_refresh and (current_time - st.session_state.last_refresh) >= self.refresh_interval:
-            st.cache_data.clear()
-            st.session_state.last_refresh = current_time
-        
-        # Load data - sınıf dışındaki fonksiyonu kullan
-        lots_df = load_lots_data()
+        # Load data - CSV değişmedikçe cache'ten gelir
+        lots_df = load_lots_data(source_fingerprint(SOURCES['lots'], store_path(ENRICHMENT_STORE)))
         if lots_df is not None:
             st.session_state.lots_df = lots_df
             
@@ -1,18 +1,23 @@
 import csv
 import pandas as pd
 from datetime import datetime
+from math import ceil
 import streamlit as st
 import plotly.express as px
 import numpy as np
 from ebay_search import EbaySearchManager
 from utils.ebay_api import EbayAPI
 from utils.listing_manager import ListingManager
+from utils.lot_store import SOURCES, load_lots, parse_list, source_fingerprint
+from utils.profitability import compute_profitability
+from utils.job_status import show_job_controls
 from urllib.parse import quote  # URL encoding için import ekleyin
 from src.services.ebay_listing_service import listing_service
 from src.services.woocommerce_service import WooCommerceService
 from src.services.ebay_service import EbayService
 from src.services.ebay_category_finder import EbayCategoryFinder
 import json
+import html
 import time
 from woocommerce import API
 import os
@@ -156,61 +161,88 @@ def is_valid_image_url(url):
     valid_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
     return any(ext in url.lower() for ext in valid_extensions)
 
-@st.cache_data(ttl=2)  # 2 saniyelik cache
-def load_and_process_data():
-    """Load and process data with new pricing strategy"""
+# Kart stilleri - her kart için değil, sayfa başına bir kez eklenir
+ITEM_CARD_STYLE = """
+        <style>
+        .item-grid {
+            display: grid;
+            grid-template-columns: 200px 1fr 250px;
+            gap: 20px;
+            align-items: start;
+        }
+        .item-image {
+            width: 100%;
+            border-radius: 8px;
+        }
+        .item-details {
+            display: flex;
+            flex-direction: column;
+            gap: 10px;
+        }
+        .item-actions {
+            display: flex;
+            flex-direction: column;
+            gap: 10px;
+        }
+        .price-tag {
+            font-size: 1.2rem;
+            font-weight: bold;
+            color: #4CAF50;
+            background: rgba(76, 175, 80, 0.1);
+            padding: 5px 10px;
+            border-radius: 4px;
+        }
+        .bid-info {
+            display: grid;
+            grid-template-columns: repeat(2, 1fr);
+            gap: 10px;
+            margin: 10px 0;
+        }
+        .bid-box {
+            background: #262626;
+            padding: 10px;
+            border-radius: 4px;
+        }
+        .item-title {
+            font-size: 1.2rem;
+            font-weight: 500;
+            color: #E0E0E0;
+            margin-bottom: 10px;
+        }
+        </style>
+"""
+
+# Sayfa başına kart sayısı (render maliyeti veri boyutuna değil sayfa boyutuna bağlı)
+ITEMS_PER_PAGE = 10
+
+# Sort By seçeneği -> kolon ve yön
+SORT_OPTIONS = {
+    'profit': ('profit', False),
+    'total_cost': ('total_cost', False),
+    'ebay_price': ('ebay_price', False),
+    'bidding_ends': ('ends_at', True),  # en yakın biten önce
+}
+
+@st.cache_data(max_entries=2)  # CSV değişmedikçe cache'ten gelir
+def load_and_process_data(fingerprint):
+    """Load and process data with new pricing strategy (fingerprint: source file stat, the cache key)"""
     try:
         print("\n=== Loading Data ===")
         
-        # Read CSV as strings initially
-        df = pd.read_csv('data/output/lots_details_with_ebay.csv', dtype=str)
+        # Typed lots from the shared store (prices, rates already floats)
+        df = load_lots('lots_with_ebay')
         print("\n1. Initial data shape:", df.shape)
         
-        # Clean price columns
-        def clean_price(price_str):
-            if pd.isna(price_str) or price_str in ['Unknown', 'Not Found', 'Not Available', 'No Bid', 'N/A']:
-                return None
-            # Remove '£' and convert to float
-            try:
-                return float(str(price_str).replace('£', '').strip())
-            except:
-                return None
-
-        # Clean and convert price columns
-        price_columns = ['ebay_lowest_price', 'suggested_price', 'current_bid', 'opening_bid', 'current_price']
-        for col in price_columns:
-            if col in df.columns:  # Kolon varsa işle
-                df[col] = df[col].apply(clean_price)
+        # Maliyet hesabı current/opening bid'i sayı olarak kullanır
+        for col in ['current_bid', 'opening_bid']:
+            df[col] = df[f'{col}_value']
             
         print("\n2. Price columns converted")
         
-        # Convert commission and VAT rates
-        numeric_columns = ['commission', 'vat_rate']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
         print("\n3. Starting calculations")
         
-        # Calculate total cost
-        df['total_cost'] = df.apply(calculate_total_cost, axis=1)
-        
-        # Calculate eBay price
-        df['ebay_price'] = df.apply(
-            lambda row: calculate_ebay_price(row) if pd.notna(row['ebay_lowest_price']) else None, 
-            axis=1
-        )
-        
-        # Calculate profit
-        df['profit'] = df.apply(
-            lambda row: calculate_profitability(row) if pd.notna(row['ebay_price']) else None, 
-            axis=1
-        )
-        
-        # Check if profitable
-        df['is_profitable'] = df.apply(
-            lambda row: is_profitable(row) if pd.notna(row['ebay_price']) else False, 
-            axis=1
-        )
+        # total_cost, ebay_price, profit, is_profitable - tüm kolonlar tek seferde
+        df = compute_profitability(df)
         
         # Filter rows with prices but keep all data
         df_with_prices = df.copy()
@@ -229,6 +261,53 @@ def load_and_process_data():
         traceback.print_exc()
         return pd.DataFrame()  # Hata durumunda boş DataFrame
 
+@st.cache_data(max_entries=32)
+def build_item_index(fingerprint, quick_filter, min_profit, max_cost, price_sources, sort_by):
+    """Filtrelenmiş ve sıralanmış satırların pozisyonları; veri ya da filtre değişmedikçe cache'ten gelir"""
+    df = load_and_process_data(fingerprint)
+    if df.empty:
+        return np.array([], dtype=int)
+    
+    mask = (
+        (df['profit'] >= min_profit) &
+        (df['total_cost'] <= max_cost) &
+        (df['price_source'].isin(price_sources))
+    )
+    # Quick filter
+    if quick_filter == "High Profit (>£100)":
+        mask &= df['profit'] > 100
+    elif quick_filter == "Low Cost (<£200)":
+        mask &= df['total_cost'] < 200
+    elif quick_filter == "Best ROI (>50%)":
+        mask &= df['profit'] / df['total_cost'] > 0.5
+    
+    column, ascending = SORT_OPTIONS[sort_by]
+    positions = np.flatnonzero(mask.to_numpy())
+    order = df[column].iloc[positions].reset_index(drop=True).sort_values(
+        ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    return positions[order]
+
+def show_pagination(total_items):
+    """Sayfa kontrolleri; gösterilecek (start, end) aralığını döndürür"""
+    total_pages = max(ceil(total_items / ITEMS_PER_PAGE), 1)
+    if st.session_state.profit_page > total_pages:
+        st.session_state.profit_page = total_pages
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Previous", key="profit_prev") and st.session_state.profit_page > 1:
+            st.session_state.profit_page -= 1
+            st.rerun()
+    with col2:
+        st.markdown(f"Page {st.session_state.profit_page} of {total_pages}")
+    with col3:
+        if st.button("Next ➡️", key="profit_next") and st.session_state.profit_page < total_pages:
+            st.session_state.profit_page += 1
+            st.rerun()
+    
+    start = (st.session_state.profit_page - 1) * ITEMS_PER_PAGE
+    return start, min(start + ITEMS_PER_PAGE, total_items)
+
 def search_ebay_for_item():
     """Manual eBay search interface"""
     st.subheader("🔍 Manual eBay Search")
@@ -243,8 +322,11 @@ def search_ebay_for_item():
             if search_title:
                 with st.spinner("Searching eBay..."):
                     try:
-                        ebay_manager = EbaySearchManager()
-                        result = ebay_manager.search_single_product(ebay_manager.setup_driver(), search_title)
+                        ebay_manager = EbaySearchManager(browsers=1, tabs_per_browser=1)
+                        try:
+                            result = ebay_manager.search(search_title)
+                        finally:
+                            ebay_manager.close()
                         
                         if result and result.get('ebay_lowest_price') != 'Not Found':
                             st.success("Price found!")
@@ -260,68 +342,18 @@ def search_ebay_for_item():
                 st.warning("Please enter a title to search")
 
 def display_item_card(row, index):
-    """Ürün kartını göster"""
-    st.markdown("""
-        <style>
-        .item-grid {
-            display: grid;
-            grid-template-columns: 200px 1fr 250px;
-            gap: 20px;
-            align-items: start;
-        }
-        .item-image {
-            width: 100%;
-            border-radius: 8px;
-        }
-        .item-details {
-            display: flex;
-            flex-direction: column;
-            gap: 10px;
-        }
-        .item-actions {
-            display: flex;
-            flex-direction: column;
-            gap: 10px;
-        }
-        .price-tag {
-            font-size: 1.2rem;
-            font-weight: bold;
-            color: #4CAF50;
-            background: rgba(76, 175, 80, 0.1);
-            padding: 5px 10px;
-            border-radius: 4px;
-        }
-        .bid-info {
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 10px;
-            margin: 10px 0;
-        }
-        .bid-box {
-            background: #262626;
-            padding: 10px;
-            border-radius: 4px;
-        }
-        .item-title {
-            font-size: 1.2rem;
-            font-weight: 500;
-            color: #E0E0E0;
-            margin-bottom: 10px;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    """Ürün kartını göster (stiller ITEM_CARD_STYLE ile sayfa başına bir kez eklenir)"""
 
     with st.container():
         col1, col2, col3 = st.columns([2, 5, 3])
         
         # Resim kolonu
         with col1:
-            try:
-                images = eval(row['images']) if isinstance(row['images'], str) else row['images']
-                if images and len(images) > 0:
-                    st.image(images[0], use_container_width=True)
-            except:
-                st.image("https://via.placeholder.com/200", use_container_width=True)
+            # Tarayıcı resmi kart görünür olunca yükler
+            images = parse_list(row['images'])
+            image_url = images[0] if images else "https://via.placeholder.com/200"
+            st.markdown(f"<img src='{html.escape(image_url, quote=True)}' loading='lazy' class='item-image'>",
+                        unsafe_allow_html=True)
 
         # Detaylar kolonu
         with col2:
@@ -418,9 +450,9 @@ def show_product_editor(row, ebay_details=None):
                 description = st.text_area("Açıklama", value=row.get('description', ''))
                 
                 # Resim galerisi
-                if pd.notna(row.get('images')):
+                if row.get('images'):
                     try:
-                        image_list = eval(row['images']) if isinstance(row['images'], str) else row['images']
+                        image_list = parse_list(row['images'])
                         st.write("Ürün Resimleri:")
                         image_cols = st.columns(min(4, len(image_list)))
                         for idx, img_col in enumerate(image_cols):
@@ -479,20 +511,8 @@ def update_ebay_prices():
         st.info("This will update all eBay prices in the CSV file")
     
     with col2:
-        if st.button("Update Prices", type="primary", help="Run eBay search for all items"):
-            with st.spinner("Updating eBay prices... This may take a while..."):
-                try:
-                    # Import main function from ebay_search.py
-                    from ebay_search import main as ebay_search_main
-                    
-                    # Run the eBay search
-                    ebay_search_main()
-                    
-                    # Reload the data
-                    st.success("✅ Prices updated successfully!")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Error updating prices: {str(e)}")
+        # eBay araması ayrı bir worker process'te çalışır; sayfa bloklanmaz
+        show_job_controls('ebay_prices', "Update Prices", help="Run eBay search for all items")
 
 def create_dashboard():
     # Sayfa genişliğini maksimuma ayarla
@@ -565,18 +585,12 @@ def create_dashboard():
             ["All", "High Profit (>£100)", "Low Cost (<£200)", "Best ROI (>50%)"]
         )
     
-    # Session state kontrolü
-    if 'last_refresh' not in st.session_state:
-        st.session_state.last_refresh = time.time()
-    
-    # Yenileme kontrolü
-    current_time = time.time()
-    if auto_refresh and (current_time - st.session_state.last_refresh) >= 2:
-        st.cache_data.clear()
-        st.session_state.last_refresh = current_time
+    # eBay fiyat güncelleme (arka plan job'ı)
+    update_ebay_prices()
     
-    # Veri yükleme
-    df = load_and_process_data()
+    # Veri yükleme - sadece CSV değiştiğinde yeniden hesaplanır
+    fingerprint = source_fingerprint(SOURCES['lots_with_ebay'])
+    df = load_and_process_data(fingerprint)
     
     if not df.empty:
         # Filtre bölümü
@@ -613,20 +627,13 @@ def create_dashboard():
             )
         st.markdown("</div>", unsafe_allow_html=True)
         
-        # Quick filter uygulama
-        if quick_filter == "High Profit (>£100)":
-            df = df[df['profit'] > 100]
-        elif quick_filter == "Low Cost (<£200)":
-            df = df[df['total_cost'] < 200]
-        elif quick_filter == "Best ROI (>50%)":
-            df = df[df['profit'] / df['total_cost'] > 0.5]
-        
-        # Ana filtreleme
-        filtered_df = df[
-            (df['profit'] >= min_profit) &
-            (df['total_cost'] <= max_cost) &
-            (df['price_source'].isin(price_source))
-        ].sort_values(by=sort_by, ascending=False)
+        # Filtre + sıralama indeksi (cache'li); sayfa filtre değişince başa döner
+        filters = (quick_filter, min_profit, max_cost, tuple(price_source), sort_by)
+        if st.session_state.get('profit_filters') != filters:
+            st.session_state.profit_filters = filters
+            st.session_state.profit_page = 1
+        item_index = build_item_index(fingerprint, *filters)
+        filtered_df = df.iloc[item_index]
         
         # İstatistikler
         st.markdown("<div class='stat-card'>", unsafe_allow_html=True)
@@ -654,9 +661,11 @@ def create_dashboard():
             st.write("Price Sources:", source_counts.to_dict())
         st.markdown("</div>", unsafe_allow_html=True)
         
-        # Ürün listesi
+        # Ürün listesi - sadece geçerli sayfadaki kartlar çizilir
         st.markdown(f"### 📋 Profitable Items ({len(filtered_df)})")
-        for index, (_, row) in enumerate(filtered_df.iterrows()):
+        st.markdown(ITEM_CARD_STYLE, unsafe_allow_html=True)
+        start, end = show_pagination(len(filtered_df))
+        for index, (_, row) in enumerate(filtered_df.iloc[start:end].iterrows(), start=start):
             with st.container():
                 st.markdown("<div class='item-card'>", unsafe_allow_html=True)
                 display_item_card(row, index)
@@ -719,7 +728,7 @@ def create_product(row, title, regular_price, sku, stock, condition, warranty,
         # Resimleri ekle
         if 'images' in row and row['images']:
             try:
-                images = eval(row['images']) if isinstance(row['images'], str) else row['images']
+                images = parse_list(row['images'])
                 if images:
                     product_data["images"] = [{"src": img} for img in images]
             except:
@@ -6,6 +6,7 @@ import csv
 import os
 from datetime import datetime
 from src.services.ebay_category_finder import EbayCategoryFinder
+from utils.lot_store import parse_list
 import time
 
 def create_product(row, title, regular_price, sku, stock, condition, warranty, 
@@ -57,7 +58,7 @@ def create_product(row, title, regular_price, sku, stock, condition, warranty,
         # Resimleri ekle
         if 'images' in row and row['images']:
             try:
-                images = eval(row['images']) if isinstance(row['images'], str) else row['images']
+                images = parse_list(row['images'])
                 if images:
                     product_data["images"] = [{"src": img} for img in images]
             except:
@@ -236,7 +237,8 @@ def create_product_page():
         # Önizleme
         with st.expander("👁️ Preview Product"):
             st.markdown("<div class='preview-container'>", unsafe_allow_html=True)
-            st.image(eval(row['images'])[0] if isinstance(row['images'], str) and eval(row['images']) else "https://via.placeholder.com/400")
+            images = parse_list(row['images'])
+            st.image(images[0] if images else "https://via.placeholder.com/400")
             st.markdown(f"### {title}")
             st.markdown(f"**Price:** £{regular_price}")
             st.markdown(f"**SKU:** {sku}")
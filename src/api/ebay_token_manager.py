@@ -3,8 +3,16 @@ import base64
 import json
 from datetime import datetime, timedelta
 import os
+import tempfile
+import threading
+import time
 from pathlib import Path
 
+# Tokens are treated as expired this long before eBay's expires_in
+EXPIRY_MARGIN = 300
+# A background refresh starts this long before the (margined) expiry
+REFRESH_AHEAD = 600
+
 class EbayTokenManager:
     def __init__(self):
         # Proje kök dizinini bul
@@ -17,6 +25,12 @@ class EbayTokenManager:
         
         # Config dizinini oluştur
         self.config_dir.mkdir(parents=True, exist_ok=True)
+
+        # (token, expiry as epoch seconds); replaced as a whole so readers never need the lock
+        self._cached = (None, 0.0)
+        # Single-flight: only one thread refreshes, the others wait for its token
+        self._refresh_lock = threading.Lock()
+        self._background_refresh = None
         
         self.load_credentials()
         
@@ -37,32 +51,76 @@ class EbayTokenManager:
             if self.token_file.exists():
                 with open(self.token_file, 'r') as f:
                     cache = json.load(f)
-                    if datetime.fromisoformat(cache['expiry']) > datetime.now():
-                        print("Using cached token")
-                        return cache['token']
+                    expiry = datetime.fromisoformat(cache['expiry']).timestamp()
+                    if expiry > time.time():
+                        return cache['token'], expiry
         except Exception as e:
             print(f"Error loading cached token: {str(e)}")
         return None
 
     def save_token_to_cache(self, token, expiry):
-        """Save token and expiry to cache file"""
+        """Save token and expiry to cache file (atomically, other processes read it)"""
         try:
             cache = {
                 'token': token,
                 'expiry': expiry.isoformat()
             }
-            with open(self.token_file, 'w') as f:
-                json.dump(cache, f)
+            fd, tmp_path = tempfile.mkstemp(prefix='.token_cache.', suffix='.tmp', dir=self.config_dir)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(cache, f)
+                os.replace(tmp_path, self.token_file)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
         except Exception as e:
             print(f"Error saving token to cache: {str(e)}")
 
     def get_access_token(self):
-        """Get access token from cache or generate new one"""
-        # Check cache first
-        cached_token = self.load_cached_token()
-        if cached_token:
-            return cached_token
+        """Get access token from memory; refreshes (once, for all threads) when missing or about to expire"""
+        token, expiry = self._cached
+        remaining = expiry - time.time()
+        if token and remaining > 0:
+            if remaining < REFRESH_AHEAD:
+                self._start_background_refresh()
+            return token
+        return self._refresh(expired_token=token)
+
+    def _start_background_refresh(self):
+        if self._background_refresh and self._background_refresh.is_alive():
+            return
+        self._background_refresh = threading.Thread(target=self._refresh_quietly, daemon=True)
+        self._background_refresh.start()
+
+    def _refresh_quietly(self):
+        try:
+            self._refresh(expired_token=self._cached[0], ahead=True)
+        except Exception:
+            # The current token is still valid; callers refresh in the foreground once it expires
+            pass
 
+    def _refresh(self, expired_token=None, ahead=False):
+        """New token into memory: from the cache file if another process already renewed it, else from eBay"""
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited for the lock
+            token, expiry = self._cached
+            if token and token != expired_token and expiry > time.time():
+                return token
+
+            cached = self.load_cached_token()
+            if cached and cached[0] != expired_token and (not ahead or cached[1] - time.time() >= REFRESH_AHEAD):
+                print("Using cached token")
+                self._cached = cached
+                return cached[0]
+
+            token, expiry = self.fetch_new_token()
+            self._cached = (token, expiry.timestamp())
+            self.save_token_to_cache(token, expiry)
+            return token
+
+    def fetch_new_token(self):
+        """(token, expiry) from eBay's client credentials grant"""
         print("Getting new access token...")
         
         try:
@@ -83,19 +141,16 @@ class EbayTokenManager:
             response = requests.post(
                 'https://api.ebay.com/identity/v1/oauth2/token',
                 headers=headers,
-                data=data
+                data=data,
+                timeout=30
             )
             
             response.raise_for_status()
             token_data = response.json()
             
             # Calculate expiry time (5 minutes before actual expiry)
-            expiry = datetime.now() + timedelta(seconds=token_data['expires_in'] - 300)
-            
-            # Save to cache
-            self.save_token_to_cache(token_data['access_token'], expiry)
-            
-            return token_data['access_token']
+            expiry = datetime.now() + timedelta(seconds=token_data['expires_in'] - EXPIRY_MARGIN)
+            return token_data['access_token'], expiry
             
         except Exception as e:
             print(f"Error getting access token: {str(e)}")
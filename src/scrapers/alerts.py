@@ -0,0 +1,250 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from .rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Put on the queue by stop() so a waiting _collect() returns at once
+_STOP = object()
+
+
+class PriceAlert:
+    def __init__(self, url, title, old_price, new_price, product_url=None, observed_at=None):
+        self.url = url
+        self.title = title
+        self.old_price = old_price
+        self.new_price = new_price
+        self.product_url = product_url
+        self.observed_at = observed_at or datetime.now()
+
+
+class AlertDispatcher:
+    """Background price-change mailer.
+
+    Alerts are queued by the monitor threads and collected for `digest_window`
+    seconds; changes to the same lot are coalesced (first old price, last new
+    price) and sent as one digest over a persistent SMTP connection, limited to
+    `max_per_minute` emails and retried with backoff on failure.
+    """
+
+    def __init__(self, sender, password='', recipient=None, host='smtp.gmail.com', port=587,
+                 use_tls=True, digest_window=30.0, max_batch=50, max_per_minute=6,
+                 max_retries=3, retry_delay=5.0, timeout=30):
+        self.sender = sender
+        self.password = password
+        self.recipient = recipient or sender
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.digest_window = digest_window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.limiter = RateLimiter(max_per_minute / 60.0, capacity=max_per_minute)
+
+        self.queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+        self.sent_emails = 0
+        self.sent_alerts = 0
+        self.failed_alerts = 0
+
+    @classmethod
+    def from_settings(cls, settings, **kwargs):
+        """Build from config/settings.json values"""
+        return cls(
+            sender=settings.get('notification_email', ''),
+            password=settings.get('email_password', ''),
+            host=settings.get('smtp_server', 'smtp.gmail.com'),
+            port=int(settings.get('smtp_port', 587)),
+            **kwargs
+        )
+
+    def submit(self, alert):
+        """Queue an alert; never blocks on SMTP"""
+        self.queue.put(alert)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.password:
+            server.login(self.sender, self.password)
+        return server
+
+    def _connection(self):
+        """Reuse the open connection if it still answers NOOP"""
+        if self.server is not None:
+            try:
+                if self.server.noop()[0] == 250:
+                    return self.server
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._disconnect()
+        self.server = self._connect()
+        return self.server
+
+    def _disconnect(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+    @staticmethod
+    def coalesce(alerts):
+        """One alert per lot: earliest old price, latest new price"""
+        merged = {}
+        for alert in alerts:
+            if alert.url in merged:
+                first = merged[alert.url]
+                merged[alert.url] = PriceAlert(alert.url, alert.title, first.old_price, alert.new_price,
+                                               alert.product_url, alert.observed_at)
+            else:
+                merged[alert.url] = alert
+        return [alert for alert in merged.values() if alert.old_price != alert.new_price]
+
+    def build_message(self, alerts):
+        msg = MIMEMultipart()
+        msg['From'] = self.sender
+        msg['To'] = self.recipient
+        if len(alerts) == 1:
+            msg['Subject'] = f"Price Change Alert: {alerts[0].title}"
+        else:
+            msg['Subject'] = f"Price Change Alert: {len(alerts)} lots changed"
+
+        lines = []
+        for alert in alerts:
+            lines.append(
+                f"Price change detected for: {alert.title}\n"
+                f"Old Price: £{alert.old_price}\n"
+                f"New Price: £{alert.new_price}\n"
+                f"Product URL: {alert.product_url or alert.url}\n"
+                f"Time: {alert.observed_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            )
+        msg.attach(MIMEText('\n'.join(lines), 'plain'))
+        return msg
+
+    def send(self, alerts):
+        """Send one digest, retrying with backoff; returns True on success"""
+        msg = self.build_message(alerts)
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.limiter.acquire()
+                self._connection().sendmail(self.sender, [self.recipient], msg.as_string())
+                self.sent_emails += 1
+                self.sent_alerts += len(alerts)
+                logger.info(f"Price alert email sent ({len(alerts)} changes)")
+                return True
+            except Exception as e:
+                logger.error(f"Email sending error (attempt {attempt}/{self.max_retries}): {str(e)}")
+                self._disconnect()
+                if attempt < self.max_retries and not self.stop_event.is_set():
+                    time.sleep(self.retry_delay * 2 ** (attempt - 1))
+        self.failed_alerts += len(alerts)
+        return False
+
+    def _collect(self):
+        """Block for the first alert, then gather more until the digest window closes"""
+        try:
+            alert = self.queue.get(timeout=1)
+        except queue.Empty:
+            return []
+        if alert is _STOP:
+            return []
+        batch = [alert]
+        deadline = time.monotonic() + self.digest_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self.stop_event.is_set():
+                break
+            try:
+                alert = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if alert is _STOP:
+                break
+            batch.append(alert)
+        return batch
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                alert = self.queue.get_nowait()
+            except queue.Empty:
+                return batch
+            if alert is not _STOP:
+                batch.append(alert)
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            alerts = self.coalesce(self._collect())
+            if alerts:
+                self.send(alerts)
+        # Flush whatever arrived before stop()
+        alerts = self.coalesce(self._drain())
+        if alerts:
+            self.send(alerts)
+        self._disconnect()
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Send what is queued and stop; waits for the mailer thread (at most `timeout` seconds if given)"""
+        self.stop_event.set()
+        self.queue.put(_STOP)
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            if self.thread.is_alive():
+                # Still sending: keep the handle so start() doesn't run a second mailer
+                logger.warning("Alert dispatcher still sending after stop timeout")
+                return
+            self.thread = None
+
+
+def benchmark(alerts=300, lots=40, digest_window=0.5, latency=0.05, failures=1):
+    """Send price alerts through a local SMTP fixture (dropping the first `failures` sends)"""
+    from .fixture_server import SMTPFixtureServer
+
+    with SMTPFixtureServer(latency=latency, fail_first=failures) as server:
+        host, port = server.address
+        dispatcher = AlertDispatcher('monitor@fixture.local', host=host, port=port, use_tls=False,
+                                     digest_window=digest_window, max_per_minute=600, retry_delay=0.1).start()
+        start = time.perf_counter()
+        for i in range(alerts):
+            lot = i % lots
+            dispatcher.submit(PriceAlert(f"https://fixture.local/lot/{lot}", f"Fixture lot {lot}", 10 + i, 11 + i))
+        dispatcher.stop()
+        seconds = time.perf_counter() - start
+        return {
+            'alerts': alerts,
+            'emails': dispatcher.sent_emails,
+            'changes_sent': dispatcher.sent_alerts,
+            'failed': dispatcher.failed_alerts,
+            'received': len(server.messages),
+            'connections': server.connections,
+            'seconds': seconds
+        }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(benchmark())
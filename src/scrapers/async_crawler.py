@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import re
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://www.i-bidder.com"
+MAX_PAGE = 107
+
+
+def build_page_url(url, page_number):
+    """Return url pointing at the given result page"""
+    if re.search(r'[?&]page=\d+', url):
+        return re.sub(r'([?&])page=\d+', rf'\g<1>page={page_number}', url)
+    separator = '&' if '?' in url else '?'
+    return f"{url}{separator}page={page_number}"
+
+
+def get_start_page(url):
+    """Page number already present in url, defaults to 1"""
+    match = re.search(r'[?&]page=(\d+)', url)
+    return int(match.group(1)) if match else 1
+
+
+def extract_auction_links(html):
+    """Collect unique lot links (a.click-track) from a result page"""
+    soup = BeautifulSoup(html, 'html.parser')
+    urls = []
+    for link in soup.find_all('a', class_='click-track'):
+        auction_url = link.get('href')
+        if auction_url:
+            if not auction_url.startswith('http'):
+                auction_url = f"{BASE_URL}{auction_url}"
+            urls.append(auction_url)
+    return list(dict.fromkeys(urls))
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and consume it"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One token bucket per host"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+
+    async def acquire(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.capacity)
+        await self.buckets[host].acquire()
+
+
+class AsyncListingCrawler:
+    """Fetches result pages in parallel and yields lot URLs as they arrive"""
+
+    def __init__(self, headers=None, concurrency=8, rate=4.0, burst=None,
+                 max_page=MAX_PAGE, timeout=30):
+        self.headers = headers or {}
+        self.concurrency = max(1, concurrency)
+        self.limiter = HostRateLimiter(rate, burst)
+        self.max_page = max_page
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def fetch_page(self, session, url, page_number):
+        """Fetch one result page; errors are treated as an empty page"""
+        page_url = build_page_url(url, page_number)
+        await self.limiter.acquire(page_url)
+        try:
+            async with session.get(page_url) as response:
+                response.raise_for_status()
+                html = await response.text()
+            page_urls = extract_auction_links(html)
+            logger.info(f"Page {page_number}: Found {len(page_urls)} auction URLs")
+            return page_urls
+        except Exception as e:
+            logger.error(f"Error processing page {page_number}: {str(e)}")
+            return []
+
+    async def crawl(self, url):
+        """Async generator over unique auction URLs for every result page of url"""
+        state = {'next_page': get_start_page(url), 'stop_page': None}
+        queue = asyncio.Queue()
+
+        async def worker(session):
+            try:
+                while True:
+                    page_number = state['next_page']
+                    stop_page = state['stop_page']
+                    if page_number > self.max_page or (stop_page is not None and page_number > stop_page):
+                        break
+                    state['next_page'] += 1
+
+                    page_urls = await self.fetch_page(session, url, page_number)
+                    if not page_urls:
+                        # Stop handing out pages after the first empty one
+                        if state['stop_page'] is None or page_number < state['stop_page']:
+                            logger.warning(f"No URLs found on page {page_number}, stopping process")
+                            state['stop_page'] = page_number
+                    await queue.put((page_number, page_urls))
+            finally:
+                await queue.put(None)
+
+        connector = aiohttp.TCPConnector(limit_per_host=self.concurrency)
+        async with aiohttp.ClientSession(headers=self.headers, timeout=self.timeout,
+                                         connector=connector) as session:
+            workers = [asyncio.create_task(worker(session)) for _ in range(self.concurrency)]
+            seen = set()
+            finished = 0
+            try:
+                while finished < len(workers):
+                    item = await queue.get()
+                    if item is None:
+                        finished += 1
+                        continue
+                    page_number, page_urls = item
+                    if state['stop_page'] is not None and page_number > state['stop_page']:
+                        continue
+                    for auction_url in page_urls:
+                        if auction_url not in seen:
+                            seen.add(auction_url)
+                            yield auction_url
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    async def collect(self, url):
+        """Crawl url and return the list of unique auction URLs"""
+        return [auction_url async for auction_url in self.crawl(url)]
+
+    def collect_sync(self, url):
+        """Blocking wrapper around collect() for non-async callers"""
+        return asyncio.run(self.collect(url))
+
+
+def benchmark(total_pages=20, links_per_page=30, latency=0.05, concurrency=8, rate=20.0):
+    """Compare the sequential page loop with the async crawler on a local fixture server"""
+    from .fixture_server import FixtureServer, listing_page_handler
+    from .ibidder_scraper import IBidderScraper
+
+    results = {}
+    with FixtureServer(listing_page_handler(total_pages, links_per_page), latency=latency) as server:
+        listing_url = f"{server.base_url}/en-gb/search-filter?searchterm="
+
+        scraper = IBidderScraper(crawl_mode='sequential')
+        start = time.perf_counter()
+        sequential_urls = scraper.get_auction_urls(listing_url, '')
+        results['sequential'] = {'seconds': time.perf_counter() - start,
+                                 'urls': len(sequential_urls)}
+
+        server.request_count = 0
+        crawler = AsyncListingCrawler(concurrency=concurrency, rate=rate)
+        start = time.perf_counter()
+        async_urls = crawler.collect_sync(listing_url)
+        results['async'] = {'seconds': time.perf_counter() - start,
+                            'urls': len(async_urls),
+                            'requests': server.request_count}
+
+    results['same_urls'] = set(sequential_urls) == set(async_urls)
+    results['speedup'] = results['sequential']['seconds'] / max(results['async']['seconds'], 1e-9)
+    return results
+
+
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name}: {value}")
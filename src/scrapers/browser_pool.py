@@ -0,0 +1,294 @@
+import logging
+import threading
+import time
+from queue import Queue, Empty
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (0.0 if empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def create_headless_driver():
+    """Default headless Chrome used by the pool"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--window-size=1920,1080')
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.implicitly_wait(10)
+    return driver
+
+
+class WorkerStats:
+    """Throughput counters for one browser worker"""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.jobs = 0
+        self.errors = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+        self.latencies = []
+        self.started = time.monotonic()
+
+    def snapshot(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            'worker': self.worker_id,
+            'jobs': self.jobs,
+            'errors': self.errors,
+            'restarts': self.restarts,
+            'jobs_per_min': self.jobs * 60 / elapsed,
+            'utilization': min(self.busy_seconds / elapsed, 1.0),
+            'p50_seconds': percentile(self.latencies, 0.5),
+            'p95_seconds': percentile(self.latencies, 0.95)
+        }
+
+
+class _Task:
+    def __init__(self, func, item, results):
+        self.func = func
+        self.item = item
+        self.results = results
+        self.attempts = 0
+        self.done = False
+
+
+class BrowserPool:
+    """N long-lived browsers with M tabs each, fed from one shared work queue"""
+
+    def __init__(self, browsers=2, tabs_per_browser=2, driver_factory=None, rate_limiter=None,
+                 url_getter=None, page_timeout=30, max_attempts=2):
+        self.browsers = max(1, browsers)
+        self.tabs_per_browser = max(1, tabs_per_browser)
+        self.driver_factory = driver_factory or create_headless_driver
+        self.rate_limiter = rate_limiter
+        self.url_getter = url_getter or (lambda item: item['url'])
+        self.page_timeout = page_timeout
+        self.max_attempts = max_attempts
+
+        self.tasks = Queue()
+        self.stats = [WorkerStats(i) for i in range(self.browsers)]
+        self.threads = []
+        self.started = False
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        with self.start_lock:
+            if self.started:
+                return self
+            for worker_id in range(self.browsers):
+                thread = threading.Thread(target=self._worker, args=(worker_id,), daemon=True)
+                thread.start()
+                self.threads.append(thread)
+            self.started = True
+        return self
+
+    def close(self):
+        """Stop workers and quit every browser; queued tasks that haven't started are dropped"""
+        if not self.started:
+            return
+        # Otherwise _STOP waits behind every queued page (e.g. after a cancelled job)
+        self._discard_tasks()
+        for _ in self.threads:
+            self.tasks.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        self.started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def map(self, func, items):
+        """Run func(driver, item) with the item's page loaded; yields (item, result) as completed"""
+        self.start()
+        results = Queue()
+        count = 0
+        for item in items:
+            self.tasks.put(_Task(func, item, results))
+            count += 1
+        try:
+            for _ in range(count):
+                yield results.get()
+        finally:
+            # Consumer stopped early (exception, JobCancelled): don't load the rest of its pages
+            self._discard_tasks(results)
+
+    def _discard_tasks(self, results=None):
+        """Drop queued tasks (only those of one map() call if results is given)"""
+        kept = []
+        while True:
+            try:
+                task = self.tasks.get_nowait()
+            except Empty:
+                break
+            if results is not None and (task is _STOP or task.results is not results):
+                kept.append(task)
+        for task in kept:
+            self.tasks.put(task)
+
+    def stats_report(self):
+        return [stats.snapshot() for stats in self.stats]
+
+    def metrics(self):
+        """Pool-wide throughput and per-job latency (page load + func)"""
+        latencies = [latency for stats in self.stats for latency in stats.latencies]
+        jobs = sum(stats.jobs for stats in self.stats)
+        elapsed = max(time.monotonic() - min(stats.started for stats in self.stats), 1e-9)
+        return {
+            'jobs': jobs,
+            'errors': sum(stats.errors for stats in self.stats),
+            'jobs_per_min': jobs * 60 / elapsed,
+            'p50_seconds': percentile(latencies, 0.5),
+            'p95_seconds': percentile(latencies, 0.95)
+        }
+
+    def format_stats(self):
+        m = self.metrics()
+        lines = [f"  total: {m['jobs']} jobs, {m['jobs_per_min']:.1f}/min, "
+                 f"p50 {m['p50_seconds']:.2f}s, p95 {m['p95_seconds']:.2f}s, {m['errors']} errors"]
+        for s in self.stats_report():
+            lines.append(f"  worker {s['worker']}: {s['jobs']} jobs, {s['jobs_per_min']:.1f}/min, "
+                         f"{s['errors']} errors, {s['restarts']} restarts, {s['utilization']:.0%} busy")
+        return '\n'.join(lines)
+
+    # --- worker internals ---
+
+    def _take_batch(self):
+        """Block for one task, then top up to one task per tab without waiting"""
+        first = self.tasks.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        while len(batch) < self.tabs_per_browser:
+            try:
+                task = self.tasks.get_nowait()
+            except Empty:
+                break
+            if task is _STOP:
+                self.tasks.put(_STOP)
+                break
+            batch.append(task)
+        return batch
+
+    def _is_healthy(self, driver, handles):
+        try:
+            return driver is not None and len(driver.window_handles) == len(handles)
+        except Exception:
+            return False
+
+    def _start_driver(self, driver, stats):
+        """(Re)create a browser with its tabs"""
+        if driver is not None:
+            stats.restarts += 1
+            logger.warning(f"Restarting browser for worker {stats.worker_id}")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        driver = self.driver_factory()
+        for _ in range(self.tabs_per_browser - 1):
+            driver.switch_to.new_window('tab')
+        return driver, list(driver.window_handles)
+
+    def _load_pages(self, driver, handles, batch):
+        """Start every page load, then wait until each tab has a fresh, complete document"""
+        if len(batch) == 1:
+            driver.switch_to.window(handles[0])
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            driver.get(self.url_getter(batch[0].item))
+            return
+
+        for handle, task in zip(handles, batch):
+            driver.switch_to.window(handle)
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            # Marker disappears once the new document replaces the old one
+            driver.execute_script("window.__poolPending = true; window.location.href = arguments[0];",
+                                  self.url_getter(task.item))
+
+        pending = set(handles[:len(batch)])
+        deadline = time.monotonic() + self.page_timeout
+        while pending and time.monotonic() < deadline:
+            for handle in list(pending):
+                driver.switch_to.window(handle)
+                ready = driver.execute_script(
+                    "return !window.__poolPending && document.readyState === 'complete';")
+                if ready:
+                    pending.discard(handle)
+            if pending:
+                time.sleep(0.1)
+        if pending:
+            logger.warning(f"{len(pending)} tab(s) did not finish loading within {self.page_timeout}s")
+
+    def _worker(self, worker_id):
+        stats = self.stats[worker_id]
+        driver, handles = None, []
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                break
+            started = time.monotonic()
+            try:
+                if not self._is_healthy(driver, handles):
+                    driver, handles = self._start_driver(driver, stats)
+                self._load_pages(driver, handles, batch)
+                for handle, task in zip(handles, batch):
+                    driver.switch_to.window(handle)
+                    try:
+                        result = task.func(driver, task.item)
+                    except WebDriverException:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Worker {worker_id} task error: {str(e)}")
+                        stats.errors += 1
+                        result = None
+                    stats.jobs += 1
+                    stats.latencies.append(time.monotonic() - started)
+                    task.results.put((task.item, result))
+                    task.done = True
+            except Exception as e:
+                # Browser çöktü: sürücüyü yeniden başlat, bitmemiş işleri kuyruğa geri koy
+                logger.error(f"Worker {worker_id} browser error: {str(e)}")
+                stats.errors += 1
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                driver = None
+                stats.restarts += 1
+                for task in batch:
+                    if task.done:
+                        continue
+                    task.attempts += 1
+                    if task.attempts < self.max_attempts:
+                        self.tasks.put(task)
+                    else:
+                        task.results.put((task.item, None))
+            finally:
+                stats.busy_seconds += time.monotonic() - started
+
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
@@ -0,0 +1,186 @@
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _temp_path(path):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    return tmp_path
+
+
+def _replace(tmp_path, path):
+    try:
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file and swap it in, so readers never see a partial file"""
+    tmp_path = _temp_path(path)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    _replace(tmp_path, path)
+
+
+def atomic_write_csv(path, fieldnames, rows):
+    """Rewrite a CSV (header + rows) atomically"""
+    tmp_path = _temp_path(path)
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+    _replace(tmp_path, path)
+    # A whole new file: everything in it is committed
+    if os.path.exists(commit_marker_path(path)):
+        mark_committed(path)
+
+
+def commit_marker_path(path):
+    return f'{path}.commit'
+
+
+def _write_commit_marker(path, size):
+    # inode: a marker left behind by an appender doesn't apply to a file that was replaced since
+    atomic_write_json(commit_marker_path(path), {'size': size, 'inode': os.stat(path).st_ino})
+
+
+def mark_committed(path):
+    """Mark the whole current file as committed (before appending to it); returns its size"""
+    size = os.path.getsize(path)
+    _write_commit_marker(path, size)
+    return size
+
+
+def _read_commit_marker(path):
+    try:
+        with open(commit_marker_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def append_csv(path, fieldnames, rows):
+    """Append a batch of rows (header first if the file is new) and fsync; returns the committed file size.
+
+    The size is also written to a `<path>.commit` marker: open_committed()
+    readers ignore anything past it, so a batch that is being written (or was
+    torn by a crash) is never read. Record the returned size in the checkpoint
+    and truncate_csv() back to it on resume.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        if f.tell() == 0:
+            writer.writeheader()
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    _write_commit_marker(path, size)
+    return size
+
+
+def truncate_csv(path, size):
+    """Cut a file back to a committed size from append_csv()"""
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        with open(path, 'r+b') as f:
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+        _write_commit_marker(path, size)
+
+
+def open_committed(path):
+    """Text stream of a CSV up to its last committed append_csv() batch (all of it without a marker)"""
+    # Marker first: a batch appended after this point is cut off, never read half-written
+    marker = _read_commit_marker(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+        inode = os.fstat(f.fileno()).st_ino
+    if marker and marker.get('inode') == inode:
+        data = data[:marker['size']]
+    return io.StringIO(data.decode('utf-8'), newline='')
+
+
+def read_csv_rows(path):
+    """Rows of an existing CSV, or [] if it doesn't exist"""
+    if not os.path.exists(path):
+        return []
+    with open_committed(path) as f:
+        return list(csv.DictReader(f))
+
+
+class ScrapeCheckpoint:
+    """Per-stage progress of a scraping run, persisted as JSON"""
+
+    STAGES = ('listing', 'products', 'lots')
+
+    def __init__(self, path='data/state/checkpoint.json'):
+        self.path = path
+        self.state = self._load()
+        self.resuming = False
+
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading checkpoint, starting fresh: {str(e)}")
+        return {}
+
+    def _new_state(self):
+        return {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'finished': None,
+            'stages': {name: {'complete': False} for name in self.STAGES}
+        }
+
+    def begin(self, resume=True):
+        """Continue an unfinished run if there is one (and resume is on), else start a new one"""
+        unfinished = self.state.get('stages') and not self.state.get('finished')
+        self.resuming = bool(resume and unfinished)
+        if self.resuming:
+            done = [name for name in self.STAGES if self.stage(name).get('complete')]
+            logger.info(f"Resuming run started {self.state['started']} (completed stages: {done or 'none'})")
+        else:
+            self.state = self._new_state()
+            self.save()
+        return self.resuming
+
+    def stage(self, name):
+        stages = self.state.setdefault('stages', {})
+        return stages.setdefault(name, {'complete': False})
+
+    def is_complete(self, name):
+        return bool(self.resuming and self.stage(name).get('complete'))
+
+    def update(self, name, **values):
+        self.stage(name).update(values)
+        self.save()
+
+    def complete(self, name, **values):
+        self.update(name, complete=True, **values)
+
+    def finish(self):
+        self.state['finished'] = datetime.now().isoformat(timespec='seconds')
+        self.save()
+
+    def save(self):
+        atomic_write_json(self.path, self.state)
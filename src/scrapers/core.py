@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .async_crawler import AsyncListingCrawler
+from .lot_parser import LOT_FIELDNAMES, REQUIRED_FIELDS, FieldStats, empty_lot, parse_lot_html
+from .rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Field names used by the older scrapers -> canonical lots_details.csv names
+FIELD_ALIASES = {
+    'title': 'name',
+    'bidding_ends': 'end_time',
+    'auction_url': 'url',
+    'image_url': 'images',
+}
+
+FLAG_FIELDS = {
+    'buy_it_now': 'has_buy_it_now',
+    'estimate_bid': 'has_estimate',
+    'current_bid': 'has_current_bid',
+    'opening_bid': 'has_opening_bid',
+}
+
+
+def _strip_currency(value):
+    return re.sub(r'\s*(GBP|£)\s*', ' ', str(value)).strip()
+
+
+def to_canonical(record):
+    """Map a lot record from any scraper onto the canonical LOT_FIELDNAMES schema"""
+    lot = empty_lot(record.get('url') or record.get('auction_url'))
+    defaults = dict(lot)
+
+    for key, value in record.items():
+        field = FIELD_ALIASES.get(key, key)
+        if field not in lot or value in (None, ''):
+            continue
+        if field == 'images' and isinstance(value, str):
+            value = [value]
+        lot[field] = value
+
+    # Playwright scraper: "123 GBP" / "16 GBP (Opening Bid)"
+    current_bid = str(lot['current_bid'])
+    if '(Opening Bid)' in current_bid:
+        if lot['opening_bid'] == defaults['opening_bid']:
+            lot['opening_bid'] = _strip_currency(current_bid.replace('(Opening Bid)', ''))
+        lot['current_bid'] = defaults['current_bid']
+    elif 'GBP' in current_bid:
+        lot['current_bid'] = _strip_currency(current_bid)
+
+    end_time = str(lot['end_time']).strip()
+    if end_time != defaults['end_time'] and not end_time.startswith('Bidding ends'):
+        lot['end_time'] = f"Bidding ends:\n{end_time}"
+
+    for field, flag in FLAG_FIELDS.items():
+        if not lot[flag] and lot[field] != defaults[field]:
+            lot[flag] = 'TRUE'
+    return lot
+
+
+class FetchBackend:
+    """Fetches raw page HTML; subclasses decide how"""
+
+    name = 'base'
+
+    def fetch_many(self, urls):
+        """Yield (url, html or None) for each url"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class HttpBackend(FetchBackend):
+    """Pooled requests session, parallel fetches under a rate limit"""
+
+    name = 'http'
+
+    def __init__(self, headers=None, workers=8, rate=4.0, timeout=30):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers, max_retries=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def fetch(self, url):
+        try:
+            self.limiter.acquire()
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.text
+        except Exception as e:
+            logger.error(f"HTTP fetch error {url}: {str(e)}")
+            return None
+
+    def fetch_many(self, urls):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            yield from zip(urls, executor.map(self.fetch, urls))
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumBackend(FetchBackend):
+    """Rendered page source from a BrowserPool"""
+
+    name = 'selenium'
+
+    def __init__(self, browsers=2, tabs_per_browser=2, rate=4.0, driver_factory=None):
+        from .browser_pool import BrowserPool
+        self.pool = BrowserPool(
+            browsers=browsers,
+            tabs_per_browser=tabs_per_browser,
+            driver_factory=driver_factory,
+            rate_limiter=RateLimiter(rate) if rate else None,
+            url_getter=lambda url: url
+        )
+
+    def fetch_many(self, urls):
+        # Completion order; each page is handed on as soon as its tab is read
+        yield from self.pool.map(lambda driver, url: driver.page_source, urls)
+
+    def close(self):
+        self.pool.close()
+
+
+class PlaywrightBackend(FetchBackend):
+    """Rendered page content from several Playwright browsers, same headers / rate limit as the others"""
+
+    name = 'playwright'
+
+    def __init__(self, browsers=2, pages_per_browser=5, headers=None, rate=4.0, wait_until='networkidle',
+                 timeout=60000):
+        self.browsers = max(1, browsers)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.headers = headers
+        self.limiter = RateLimiter(rate) if rate else None
+        self.wait_until = wait_until
+        self.timeout = timeout
+
+    async def _fetch_iter(self, urls):
+        """Async generator over (url, html or None) in completion order"""
+        from playwright.async_api import async_playwright
+
+        semaphore = asyncio.Semaphore(self.browsers * self.pages_per_browser)
+        async with async_playwright() as p:
+            browsers = [await p.chromium.launch(headless=True) for _ in range(self.browsers)]
+            contexts = [await browser.new_context(extra_http_headers=self.headers) for browser in browsers]
+            for context in contexts:
+                context.set_default_timeout(self.timeout)
+
+            async def fetch(index, url):
+                async with semaphore:
+                    if self.limiter:
+                        # RateLimiter blocks; keep the event loop free while waiting
+                        await asyncio.to_thread(self.limiter.acquire)
+                    page = await contexts[index % len(contexts)].new_page()
+                    try:
+                        await page.goto(url, wait_until=self.wait_until)
+                        return url, await page.content()
+                    except Exception as e:
+                        logger.error(f"Playwright fetch error {url}: {str(e)}")
+                        return url, None
+                    finally:
+                        await page.close()
+
+            tasks = [asyncio.ensure_future(fetch(i, url)) for i, url in enumerate(urls)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                for browser in browsers:
+                    await browser.close()
+
+    def fetch_many(self, urls):
+        # Drive the async generator one page at a time so no page waits in memory for the rest
+        loop = asyncio.new_event_loop()
+        pages = self._fetch_iter(list(urls))
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(pages.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(pages.aclose())
+            loop.close()
+
+
+BACKENDS = {
+    HttpBackend.name: HttpBackend,
+    SeleniumBackend.name: SeleniumBackend,
+    PlaywrightBackend.name: PlaywrightBackend,
+}
+
+
+def create_backend(name, **kwargs):
+    """Build a fetch backend by name ('http', 'selenium', 'playwright')"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown fetch backend: {name}")
+    return BACKENDS[name](**kwargs)
+
+
+class ScraperCore:
+    """Listing crawl (AsyncListingCrawler) + lot extraction on top of any FetchBackend, producing canonical rows"""
+
+    def __init__(self, backend=None, crawler=None):
+        self.backend = backend
+        self.crawler = crawler or AsyncListingCrawler()
+        self.stats = FieldStats()
+
+    def iter_auction_urls(self, url):
+        """Async generator yielding lot URLs as result pages arrive"""
+        return self.crawler.crawl(url)
+
+    def collect_auction_urls(self, url):
+        """Unique lot URLs of every result page of url"""
+        return self.crawler.collect_sync(url)
+
+    def scrape_lots(self, products):
+        """Yield (product, canonical lot or None, missing required fields)"""
+        products = list(products)
+        by_url = {product['url']: product for product in products}
+        for url, html in self.backend.fetch_many([product['url'] for product in products]):
+            if html is None:
+                self.stats.record_error()
+                yield by_url[url], None, list(REQUIRED_FIELDS)
+                continue
+            lot_data, found = parse_lot_html(html, url)
+            self.stats.record(found)
+            yield by_url[url], lot_data, [field for field in REQUIRED_FIELDS if field not in found]
+
+
+# Local fixture server: measure the backends, not the production throttle
+BENCHMARK_RATE = 100.0
+
+
+def benchmark_backends(names=('http', 'selenium', 'playwright'), lots=30, latency=0.05):
+    """Scrape the same fixture lot pages with each backend; returns timing and field success rates"""
+    from .fixture_server import FixtureServer, lot_page_handler
+
+    results = {}
+    with FixtureServer(lot_page_handler(), latency=latency) as server:
+        products = [{'url': f"{server.base_url}/lot/{i}"} for i in range(lots)]
+        for name in names:
+            try:
+                with create_backend(name, rate=BENCHMARK_RATE) as backend:
+                    core = ScraperCore(backend)
+                    start = time.perf_counter()
+                    rows = [lot for _, lot, _ in core.scrape_lots(products) if lot]
+                    seconds = time.perf_counter() - start
+                results[name] = {
+                    'seconds': seconds,
+                    'lots_per_second': len(rows) / max(seconds, 1e-9),
+                    'lots': len(rows),
+                    'fields': core.stats.report()['fields']
+                }
+            except Exception as e:
+                results[name] = {'error': str(e)}
+    return results
+
+
+if __name__ == "__main__":
+    for backend_name, result in benchmark_backends().items():
+        print(f"{backend_name}: {result}")
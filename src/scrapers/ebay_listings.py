@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = 'data/fixtures/ebay'
+SOLD_SEARCH_URL = "https://www.ebay.co.uk/sch/i.html?_nkw={query}&LH_Complete=1&LH_Sold=1"
+
+# Only list items are built into the tree (s-item filtering happens in find_all)
+LISTING_STRAINER = SoupStrainer('li')
+PRICE_RE = re.compile(r'£\s*(\d[\d,]*(?:\.\d+)?)')
+# eBay's first result is often a "Shop on eBay" placeholder
+PLACEHOLDER_TITLES = ('Shop on eBay',)
+TITLE_PREFIXES = ('New listing', 'NEW LISTING')
+
+
+def parse_price(price_text):
+    """Lower bound of a '£12.50' / '£10.00 to £20.00' price text"""
+    match = PRICE_RE.search(price_text or '')
+    return float(match.group(1).replace(',', '')) if match else None
+
+
+def _title(item):
+    element = item.select_one('div.s-item__title span[role="heading"]') or item.select_one('div.s-item__title')
+    title = element.get_text(' ', strip=True) if element else ''
+    for prefix in TITLE_PREFIXES:
+        if title.startswith(prefix):
+            title = title[len(prefix):].strip()
+    return title
+
+
+def _is_sold(item):
+    for signal in item.select('span.s-item__caption--signal, .s-item__caption span.POSITIVE'):
+        if 'Sold' in signal.get_text():
+            return True
+    return False
+
+
+def parse_sold_listings(html, limit=None, include_placeholders=False):
+    """Listings on an eBay search results page as dicts (title, link, price_text, price, sold)"""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=LISTING_STRAINER)
+    listings = []
+    for item in soup.find_all('li', class_='s-item'):
+        title = _title(item)
+        if not include_placeholders and title in PLACEHOLDER_TITLES:
+            continue
+        link = item.select_one('a.s-item__link')
+        price = item.select_one('span.s-item__price')
+        price_text = price.get_text(' ', strip=True) if price else ''
+        listings.append({
+            'title': title,
+            'link': link.get('href', '') if link else '',
+            'price_text': price_text,
+            'price': parse_price(price_text),
+            'sold': _is_sold(item)
+        })
+        if limit and len(listings) >= limit:
+            break
+    return listings
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """{name: (html, expected listings)} from saved search result pages"""
+    with open(os.path.join(directory, 'expected.json'), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    fixtures = {}
+    for name, spec in expected.items():
+        with open(os.path.join(directory, f"{name}.html"), 'r', encoding='utf-8') as f:
+            fixtures[name] = (f.read(), spec['listings'])
+    return fixtures
+
+
+def score_listings(parsed, expected):
+    """Share of expected listings whose title, link, price and sold flag were all parsed correctly"""
+    by_link = {listing['link']: listing for listing in parsed}
+    correct = 0
+    for want in expected:
+        got = by_link.get(want['link'])
+        if (got and got['title'] == want['title'] and got['sold'] == want['sold']
+                and got['price'] is not None and abs(got['price'] - want['price']) < 0.005):
+            correct += 1
+    return correct / max(len(expected), 1)
+
+
+# Local fixture server: don't throttle like the real site
+BENCHMARK_OPTIONS = {'http': {'rate': 100.0}, 'selenium': {'rate': 100.0}}
+
+
+def benchmark(directory=FIXTURES_DIR, backends=('http', 'selenium'), repeat=5, latency=0.05):
+    """Parse accuracy on the saved fixtures, plus fetch+parse speed per backend over a local server"""
+    from .core import create_backend
+    from .fixture_server import FixtureServer
+
+    fixtures = load_fixtures(directory)
+    results = {}
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        accuracy = {name: score_listings(parse_sold_listings(html, include_placeholders=True), expected)
+                    for name, (html, expected) in fixtures.items()}
+    parse_seconds = (time.perf_counter() - start) / (repeat * len(fixtures))
+    results['parser'] = {
+        'parser': HTML_PARSER,
+        'ms_per_page': parse_seconds * 1000,
+        'accuracy': sum(accuracy.values()) / len(accuracy),
+        'per_fixture': accuracy
+    }
+
+    def handler(path, query, headers):
+        name = path.strip('/').split('/')[-1]
+        if name not in fixtures:
+            return 404, ''
+        return 200, fixtures[name][0]
+
+    with FixtureServer(handler, latency=latency) as server:
+        urls = [f"{server.base_url}/sch/{name}" for name in fixtures] * repeat
+        for backend_name in backends:
+            try:
+                with create_backend(backend_name, **BENCHMARK_OPTIONS.get(backend_name, {})) as backend:
+                    start = time.perf_counter()
+                    pages = [parse_sold_listings(html) for _, html in backend.fetch_many(urls) if html]
+                    seconds = time.perf_counter() - start
+                results[backend_name] = {
+                    'seconds': seconds,
+                    'searches_per_min': len(pages) * 60 / max(seconds, 1e-9),
+                    'pages': len(pages)
+                }
+            except Exception as e:
+                results[backend_name] = {'error': str(e)}
+
+    if results.get('http', {}).get('pages') and results.get('selenium', {}).get('pages'):
+        results['speedup'] = results['selenium']['seconds'] / max(results['http']['seconds'], 1e-9)
+    return results
+
+
+if __name__ == "__main__":
+    for name, result in benchmark().items():
+        print(f"{name}: {result}")
@@ -0,0 +1,243 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FixtureServer:
+    """Local HTTP server that serves canned pages for scraper benchmarks"""
+
+    def __init__(self, handler, latency=0.0, host='127.0.0.1', port=0, post_handler=None):
+        # handler(path, query, headers) -> (status, body) or (status, body, extra_headers)
+        # post_handler(path, body, headers) -> same, for POST requests (405 without one)
+        self.handler = handler
+        self.post_handler = post_handler
+        self.latency = latency
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_request_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_request_handler(self):
+        fixture = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def _count(self):
+                with fixture._count_lock:
+                    fixture.request_count += 1
+                if fixture.latency:
+                    time.sleep(fixture.latency)
+
+            def do_GET(self):
+                self._count()
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                self._respond(fixture.handler(parsed.path, query, dict(self.headers)))
+
+            def do_POST(self):
+                self._count()
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if fixture.post_handler is None:
+                    self._respond((405, ''))
+                    return
+                self._respond(fixture.post_handler(urlparse(self.path).path, body, dict(self.headers)))
+
+            def _respond(self, result):
+                status, body = result[0], result[1]
+                extra_headers = dict(result[2]) if len(result) > 2 else {}
+
+                payload = body.encode('utf-8') if isinstance(body, str) else (body or b'')
+                self.send_response(status)
+                self.send_header('Content-Type', extra_headers.pop('Content-Type', 'text/html; charset=utf-8'))
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in extra_headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return RequestHandler
+
+    def start(self):
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class SMTPFixtureServer:
+    """Minimal local SMTP server (no TLS / auth) that keeps every message, for mailer benchmarks"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, fail_first=0):
+        # fail_first: drop the connection on the first N DATA commands to exercise reconnects
+        self.latency = latency
+        self.fail_first = fail_first
+        self.messages = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingTCPServer((host, port), self._make_request_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    def _make_request_handler(self):
+        fixture = self
+
+        class RequestHandler(StreamRequestHandler):
+            def _reply(self, line):
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def _read_data(self):
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        return b''.join(lines)
+                    lines.append(line[1:] if line.startswith(b'..') else line)
+
+            def handle(self):
+                with fixture._lock:
+                    fixture.connections += 1
+                self._reply('220 fixture ESMTP')
+                sender, recipients = None, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('utf-8', 'replace').strip()
+                    verb = command[:4].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self._reply('250 fixture')
+                    elif verb == 'MAIL':
+                        sender, recipients = command.split(':', 1)[1].strip(), []
+                        self._reply('250 OK')
+                    elif verb == 'RCPT':
+                        recipients.append(command.split(':', 1)[1].strip())
+                        self._reply('250 OK')
+                    elif verb == 'DATA':
+                        self._reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = self._read_data()
+                        with fixture._lock:
+                            failing = fixture.fail_first > 0
+                            if failing:
+                                fixture.fail_first -= 1
+                        if failing:
+                            self._reply('421 Service not available, closing channel')
+                            return
+                        if fixture.latency:
+                            time.sleep(fixture.latency)
+                        with fixture._lock:
+                            fixture.messages.append((sender, recipients, data))
+                        self._reply('250 OK')
+                    elif verb in ('NOOP', 'RSET'):
+                        self._reply('250 OK')
+                    elif verb == 'QUIT':
+                        self._reply('221 Bye')
+                        return
+                    else:
+                        self._reply('502 Command not implemented')
+
+        return RequestHandler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def listing_page_handler(total_pages, links_per_page, base_url=''):
+    """Handler serving i-bidder style result pages; pages past total_pages are empty"""
+    def handler(path, query, headers):
+        page = int(query.get('page', 1))
+        links = []
+        if page <= total_pages:
+            for i in range(links_per_page):
+                href = f"{base_url}/en-gb/auction-catalogues/fixture/lot-{page}-{i}"
+                links.append(f'<div class="lot-single"><a class="click-track" href="{href}">Lot {page}-{i}</a></div>')
+        return 200, f"<html><body>{''.join(links)}</body></html>"
+    return handler
+
+
+FIXTURE_LOT_PAGE = """<html><head>
+<script type="application/ld+json">{{"@type": "Product", "name": "{name}", "description": "{description}"}}</script>
+</head><body>
+<h1>{name}</h1>
+<div class="lot-images"><img src="https://portal-images.azureedge.net/fixture/{lot_id}.jpg?w=540&h=360"></div>
+<form><div>Opening bid <span class="minBidAmount">{opening}</span></div>
+<div>Estimate</div><div>{opening} GBP - {high} GBP</div>
+<span class="noBid">No bids yet</span></form>
+<div>Bidding ends:</div><div>17 Feb 2030 12:01 GMT</div>
+<div class="lot-description">{description}</div>
+<script>var feesTemplate = '<span id="commissionsExVAT">25.00%</span><span id="additionalFeeVatRate">20.00%</span>';</script>
+</body></html>"""
+
+
+def lot_page_handler():
+    """Handler serving i-bidder style lot pages at /lot/<id>"""
+    def handler(path, query, headers):
+        lot_id = path.rstrip('/').split('/')[-1]
+        return 200, FIXTURE_LOT_PAGE.format(
+            name=f"FIXTURE LOT {lot_id}",
+            description=f"Fixture description for lot {lot_id}",
+            lot_id=lot_id,
+            opening=16,
+            high=30
+        )
+    return handler
+
+
+def chat_completions_handler(content_for):
+    """POST handler mimicking the OpenAI chat-completions endpoint; content_for(user_prompt) -> reply text"""
+    def handler(path, body, headers):
+        if not path.endswith('/chat/completions'):
+            return 404, ''
+        request = json.loads(body)
+        prompt = request['messages'][-1]['content']
+        content = content_for(prompt)
+        prompt_tokens = sum(len(message['content']) for message in request['messages']) // 4
+        completion_tokens = len(content) // 4
+        return 200, json.dumps({
+            'id': 'chatcmpl-fixture',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'fixture'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens}
+        }), {'Content-Type': 'application/json'}
+    return handler
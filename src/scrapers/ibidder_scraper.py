@@ -14,12 +14,21 @@ import logging
 from queue import Queue
 import threading
 import os
+from .async_crawler import AsyncListingCrawler
+from .lot_parser import LOT_FIELDNAMES, merge_lot_data
+from .core import ScraperCore, create_backend
+from .seen_store import SeenLotStore
+from .browser_pool import BrowserPool
+from .rate_limit import RateLimiter
+from .checkpoint import ScrapeCheckpoint, append_csv, atomic_write_csv, mark_committed, read_csv_rows, truncate_csv
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class IBidderScraper:
-    def __init__(self):
+    def __init__(self, crawl_mode='async', crawl_concurrency=8, crawl_rate=4.0,
+                 detail_mode='http', detail_workers=8, detail_rate=4.0,
+                 incremental=False, browser_count=None, tabs_per_browser=2, progress=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -28,6 +37,49 @@ class IBidderScraper:
         self.thread_local = threading.local()
         self.max_workers = 1
 
+        # Listing page crawl: 'async' (parallel, rate limited) or 'sequential'
+        self.crawl_mode = crawl_mode
+        self.crawl_concurrency = crawl_concurrency
+        self.crawl_rate = crawl_rate
+
+        # Lot details: 'http' / 'playwright' (scraper core + parser, Selenium fallback),
+        # 'browser' (Selenium pool) or 'selenium' (single driver)
+        self.detail_mode = detail_mode
+        self.detail_workers = detail_workers
+        self.detail_rate = detail_rate
+        self.detail_stats = None
+        self.browser_count = browser_count or max(1, min(4, os.cpu_count() or 1))
+        self.tabs_per_browser = tabs_per_browser
+
+        # Incremental mode: only new / closing lots are scraped again
+        self.seen_store = SeenLotStore() if incremental else None
+
+        # Stage progress for resuming an interrupted run
+        self.checkpoint = ScrapeCheckpoint()
+
+        # Optional progress(stage, done, total) callback, e.g. a background job's reporter
+        self.progress = progress
+
+    def report(self, stage, done, total):
+        if self.progress:
+            self.progress(stage, done, total)
+
+    def get_crawler(self):
+        """Async listing crawler sharing this scraper's headers"""
+        return AsyncListingCrawler(
+            headers=self.headers,
+            concurrency=self.crawl_concurrency,
+            rate=self.crawl_rate
+        )
+
+    def get_core(self, backend=None):
+        """Scraper core: listing crawl with this scraper's crawler, lot pages through backend"""
+        return ScraperCore(backend, crawler=self.get_crawler())
+
+    def iter_auction_urls(self, url):
+        """Async generator yielding auction URLs as result pages arrive"""
+        return self.get_core().iter_auction_urls(url)
+
     def get_session(self):
         """Her thread için ayrı bir session oluştur"""
         if not hasattr(self.thread_local, "session"):
@@ -123,45 +175,77 @@ class IBidderScraper:
         try:
             logger.info("Starting product collection process...")
             
-            # URL'leri topla
+            # URL'leri topla (tamamlanan listing sayfaları checkpoint'ten gelir)
             all_auction_urls = []
             urls = self.get_urls_from_file('data/input/urls.txt')
+            listing = self.checkpoint.stage('listing')
+            listing_done = listing.setdefault('done', {}) if self.checkpoint.resuming else {}
             
-            for url in urls:
+            for index, url in enumerate(urls):
+                self.report('listing', index, len(urls))
+                if url in listing_done:
+                    all_auction_urls.extend(listing_done[url])
+                    continue
                 try:
                     page_urls = self.get_auction_urls(url, '')
                     all_auction_urls.extend(page_urls)
+                    listing_done[url] = page_urls
+                    self.checkpoint.update('listing', done=listing_done)
                 except Exception as e:
                     logger.error(f"Error collecting URLs from {url}: {str(e)}")
+            self.checkpoint.complete('listing')
             
             all_auction_urls = list(set(all_auction_urls))  # Tekrarları temizle
             logger.info(f"Total unique URLs collected: {len(all_auction_urls)}")
             
-            # Ürünleri işle
+            # Incremental modda bilinen URL'ler için istek atma
+            known = {}
+            if self.seen_store:
+                known = self.seen_store.get_many(all_auction_urls)
+                logger.info(f"{len(known)} URLs already known, skipping product requests for them")
+            
+            # Resume: products.csv'de zaten olan ürünleri tekrar işleme. Dosyaya yalnızca bu
+            # çalıştırmada kaydedildiyse güvenilir; yoksa önceki tamamlanmış çalıştırmaya aittir
             products = []
-            with tqdm(total=len(all_auction_urls), desc="Processing products") as pbar:
+            if self.checkpoint.resuming and self.checkpoint.stage('products').get('saved'):
+                done_urls = set(all_auction_urls)
+                products = [p for p in read_csv_rows('data/output/products.csv') if p.get('url') in done_urls]
+                logger.info(f"Resuming with {len(products)} products already saved")
+            done = {p['url'] for p in products}
+            
+            # Ürünleri işle
+            with tqdm(total=len(all_auction_urls), initial=len(done), desc="Processing products") as pbar:
                 for url in all_auction_urls:
+                    if url in done:
+                        continue
                     try:
-                        product = self.process_product(url)
+                        row = known.get(url)
+                        if row and row.get('title'):
+                            product = {'title': row['title'], 'url': url, 'image_url': row.get('image_url') or ''}
+                        else:
+                            product = self.process_product(url)
                         if product:
                             products.append(product)
                         pbar.update(1)
+                        self.report('products', pbar.n, pbar.total)
                         
                         # Her 50 üründe bir log
                         if len(products) % 50 == 0:
                             logger.info(f"Processed {len(products)}/{len(all_auction_urls)} products")
                             
                         # Her 100 üründe bir kaydet
-                        if len(products) % 100 == 0:
-                            self.save_to_csv(products, 'data/output/products.csv')
+                        if len(products) % 100 == 0 and self.save_to_csv(products, 'data/output/products.csv'):
+                            self.checkpoint.update('products', saved=len(products))
                             
                     except Exception as e:
                         logger.error(f"Error processing URL {url}: {str(e)}")
                         continue
             
             # Kalan ürünleri kaydet
-            if products:
-                self.save_to_csv(products, 'data/output/products.csv')
+            self.save_to_csv(products, 'data/output/products.csv')
+            if products and self.seen_store:
+                self.seen_store.mark_seen(products)
+            self.checkpoint.complete('products', count=len(products))
             
             logger.info(f"Successfully processed {len(products)} products")
             
@@ -170,32 +254,102 @@ class IBidderScraper:
             raise
 
     def save_to_csv(self, products, filename):
-        """Save products to CSV file"""
+        """Save products to CSV file (atomic rewrite of the full list)"""
         try:
-            mode = 'w' if not os.path.exists(filename) else 'a'
-            with open(filename, mode, newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['title', 'url', 'image_url']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                if mode == 'w':  # Yeni dosya ise başlık yaz
-                    writer.writeheader()
-                
-                writer.writerows(products)
-                
+            atomic_write_csv(filename, ['title', 'url', 'image_url'], products)
             logger.info(f"Saved {len(products)} products to {filename}")
+            return True
             
         except Exception as e:
             logger.error(f"Error saving to CSV: {str(e)}")
+            return False
+
+    def create_selenium_driver(self):
+        """Chrome driver used for the Selenium detail path"""
+        chrome_options = Options()
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--window-size=1920,1080')
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.implicitly_wait(10)
+        return driver
+
+    def iter_lot_details(self, products):
+        """Yield lot details in product order using the configured detail_mode"""
+        if self.detail_mode in ('http', 'playwright'):
+            yield from self.iter_lot_details_core(products)
+            return
+        if self.detail_mode == 'browser':
+            yield from self.iter_lot_details_pool(products)
+            return
+
+        driver = self.create_selenium_driver()
+        try:
+            for product in products:
+                try:
+                    yield self.get_lot_details(driver, product)
+                except Exception as e:
+                    logger.error(f"Error processing lot {product.get('url')}: {str(e)}")
+                    yield None
+                time.sleep(2)  # Rate limiting
+        finally:
+            driver.quit()
+
+    def create_backend(self):
+        """Fetch backend for the scraper core"""
+        if self.detail_mode == 'http':
+            return create_backend('http', headers=self.headers, workers=self.detail_workers, rate=self.detail_rate)
+        if self.detail_mode == 'playwright':
+            return create_backend('playwright', browsers=self.browser_count, headers=self.headers,
+                                  rate=self.detail_rate)
+        return create_backend(self.detail_mode, rate=self.detail_rate)
+
+    def iter_lot_details_core(self, products):
+        """Scraper core + HTML parser fast path, Selenium only for pages the parser can't handle"""
+        backend = self.create_backend()
+        core = self.get_core(backend)
+        self.detail_stats = core.stats
+        fallback_driver = None
+        try:
+            for product, lot_data, missing in core.scrape_lots(products):
+                if missing:
+                    logger.info(f"Parser missing {missing} for {product['url']}, using Selenium")
+                    core.stats.record_fallback()
+                    try:
+                        if fallback_driver is None:
+                            fallback_driver = self.create_selenium_driver()
+                        selenium_data = self.get_lot_details(fallback_driver, product)
+                        if selenium_data:
+                            lot_data = merge_lot_data(selenium_data, lot_data) if lot_data else selenium_data
+                    except Exception as e:
+                        logger.error(f"Selenium fallback error {product['url']}: {str(e)}")
+                yield lot_data
+        finally:
+            backend.close()
+            if fallback_driver is not None:
+                fallback_driver.quit()
+            logger.info(f"Lot detail field success rates:\n{core.stats.format_report()}")
+
+    def iter_lot_details_pool(self, products):
+        """Selenium details from a pool of long-lived browsers (completion order)"""
+        pool = BrowserPool(
+            browsers=self.browser_count,
+            tabs_per_browser=self.tabs_per_browser,
+            rate_limiter=RateLimiter(self.detail_rate)
+        )
+        try:
+            for _, lot_data in pool.map(
+                    lambda driver, product: self.get_lot_details(driver, product, navigate=False),
+                    products):
+                yield lot_data
+        finally:
+            pool.close()
+            logger.info(f"Browser pool stats:\n{pool.format_stats()}")
 
     def create_lots_details(self):
         """Create lots_details.csv with batch saving"""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--window-size=1920,1080')
-            
             products = []
             with open('data/output/products.csv', 'r', encoding='utf-8') as file:
                 reader = csv.DictReader(file)
@@ -203,53 +357,60 @@ class IBidderScraper:
             
             logger.info(f"Found {len(products)} products to process")
             
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.implicitly_wait(10)
+            # Incremental: bitmiş lotları atla, değişmeyenleri aynen taşı
+            carried = []
+            if self.seen_store:
+                products, carried, _ = self.seen_store.plan(products)
             
             results = []
             batch_size = 20  # Her 20 üründe bir kaydet
-            fieldnames = [
-                'name', 'current_bid', 'opening_bid', 'estimate_bid',
-                'buy_it_now', 'end_time', 'description', 'images', 'url',
-                'commission', 'vat_rate', 'has_buy_it_now', 'has_estimate',
-                'has_current_bid', 'has_opening_bid'
-            ]
-            
-            # CSV dosyasını oluştur ve başlıkları yaz
-            with open('data/output/lots_details.csv', 'w', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
-            
-            for index, product in enumerate(tqdm(products, desc="Processing lots")):
+            fieldnames = LOT_FIELDNAMES
+            output_file = 'data/output/lots_details.csv'
+            
+            committed = self.checkpoint.stage('lots').get('committed')
+            if self.checkpoint.resuming and self.checkpoint.stage('lots').get('started') and committed:
+                # Resume: bu çalıştırmada dosyaya commit edilmiş lotları atla (yarım kalan batch kesilir)
+                truncate_csv(output_file, committed)
+                done = {row['url'] for row in read_csv_rows(output_file)}
+                carried = [row for row in carried if row['url'] not in done]
+                products = [p for p in products if p['url'] not in done]
+                logger.info(f"Resuming: {len(done)} lots already saved, {len(products)} left")
+                if carried:
+                    self.checkpoint.update('lots', committed=append_csv(output_file, fieldnames, carried))
+            else:
+                # CSV dosyasını oluştur ve başlıkları yaz; önceki çalıştırmanın satırları atılır
+                atomic_write_csv(output_file, fieldnames, carried)
+                self.checkpoint.update('lots', started=True, committed=mark_committed(output_file))
+            
+            lot_details = self.iter_lot_details(products)
+            for index, result in enumerate(tqdm(lot_details, total=len(products), desc="Processing lots")):
+                self.report('lots', index + 1, len(products))
                 try:
-                    result = self.get_lot_details(driver, product)
                     if result:
                         results.append(result)
+                        if self.seen_store:
+                            self.seen_store.record(result)
                     
                     # Her 20 üründe bir veya son ürünse kaydet
                     if (len(results) >= batch_size) or (index == len(products) - 1):
                         logger.info(f"Saving batch of {len(results)} products to CSV...")
-                        with open('data/output/lots_details.csv', 'a', newline='', encoding='utf-8') as file:
-                            writer = csv.DictWriter(file, fieldnames=fieldnames)
-                            writer.writerows(results)
+                        # Sadece ekle + fsync; commit edilen boyut checkpoint'e yazılır
+                        committed = append_csv(output_file, fieldnames, results)
+                        self.checkpoint.update('lots', done=index + 1, total=len(products), committed=committed)
                         
                         # Kaydedilen ürünleri temizle
                         results = []
                         logger.info(f"Batch saved. Total progress: {index + 1}/{len(products)}")
                     
-                    time.sleep(2)  # Rate limiting
-                    
                 except Exception as e:
                     logger.error(f"Error processing lot {index + 1}: {str(e)}")
                     continue
             
-            driver.quit()
+            self.checkpoint.complete('lots')
             logger.info("Lots details collection completed!")
             
         except Exception as e:
             logger.error(f"Error creating lots_details.csv: {str(e)}")
-            if 'driver' in locals():
-                driver.quit()
             raise
 
     def cleanup(self):
@@ -261,20 +422,29 @@ class IBidderScraper:
         """Destructor: Kaynakları temizle"""
         self.cleanup()
 
-    def scrape_all(self):
+    def run_stage(self, name, func):
+        """Run a pipeline stage unless the resumed checkpoint already completed it"""
+        if self.checkpoint.is_complete(name):
+            logger.info(f"Stage '{name}' already completed in checkpoint, skipping")
+            return
+        func()
+
+    def scrape_all(self, resume=True):
         """Main workflow with detailed progress tracking"""
         try:
             total_steps = 2
             current_step = 1
             
             logger.info("=== Starting IBidder Scraping Process ===")
+            self.checkpoint.begin(resume)
             logger.info(f"Step {current_step}/{total_steps}: Creating products.csv")
             start_time = time.time()
-            self.create_products_csv()
+            self.run_stage('products', self.create_products_csv)
             
             current_step += 1
             logger.info(f"\nStep {current_step}/{total_steps}: Creating lots_details.csv")
-            self.create_lots_details()
+            self.run_stage('lots', self.create_lots_details)
+            self.checkpoint.finish()
             
             end_time = time.time()
             total_time = end_time - start_time
@@ -285,11 +455,12 @@ class IBidderScraper:
             logger.error(f"Critical error in main workflow: {str(e)}")
             raise
 
-    def get_lot_details(self, driver, product):
+    def get_lot_details(self, driver, product, navigate=True):
         """Get lot details using Selenium"""
         try:
             logger.info(f"\nProcessing: {product['url']}")
-            driver.get(product['url'])
+            if navigate:
+                driver.get(product['url'])
             wait = WebDriverWait(driver, 10)
             
             lot_data = {
@@ -411,6 +582,15 @@ class IBidderScraper:
 
     def get_auction_urls(self, url, target_category):
         """Collects auction URLs from main page"""
+        if self.crawl_mode == 'async':
+            try:
+                logger.info(f"Checking URL (async): {url}")
+                matching_urls = self.get_core().collect_auction_urls(url)
+                logger.info(f"Total unique auction URLs found: {len(matching_urls)}")
+                return matching_urls
+            except Exception as e:
+                logger.error(f"Async crawl failed, falling back to sequential: {str(e)}")
+
         try:
             logger.info(f"Checking URL: {url}")
             
@@ -477,16 +657,19 @@ class IBidderScraper:
                 url = f"https://www.i-bidder.com{url}"
             return [url]
 
-def run_scraper():
-    """Ana scraping işlemini başlatan fonksiyon"""
+def run_scraper(incremental=True, resume=True, progress=None, **options):
+    """Ana scraping işlemini başlatan fonksiyon (progress: opsiyonel progress(stage, done, total) callback,
+    options: IBidderScraper ayarları, örn. detail_mode)"""
     try:
-        scraper = IBidderScraper()
+        scraper = IBidderScraper(incremental=incremental, progress=progress, **options)
+        scraper.checkpoint.begin(resume)
         
         logger.info("Step 1: Creating products.csv...")
-        scraper.create_products_csv()
+        scraper.run_stage('products', scraper.create_products_csv)
         
         logger.info("\nStep 2: Creating lots_details.csv...")
-        scraper.create_lots_details()
+        scraper.run_stage('lots', scraper.create_lots_details)
+        scraper.checkpoint.finish()
         
         logger.info("All processes completed successfully!")
         return True
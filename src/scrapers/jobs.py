@@ -0,0 +1,260 @@
+import importlib
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+ACTIVE = (QUEUED, RUNNING)
+
+# Job kind -> (callable accepting progress=, stages it reports in order)
+JOB_KINDS = {
+    'scraper': ('src.scrapers.ibidder_scraper:run_scraper', ('listing', 'products', 'lots')),
+    'ebay_prices': ('ebay_search:main', ('ebay_http', 'ebay_browser')),
+    'enrichment': ('utils.product_enricher:run_enrichment', ('enrichment',)),
+}
+
+HEARTBEAT_INTERVAL = 5
+# A running job whose worker hasn't beaten for this long is considered dead
+HEARTBEAT_TIMEOUT = 60
+# Cancelled jobs that don't stop at their next progress report are killed after this
+CANCEL_GRACE = 30
+
+
+class JobCancelled(BaseException):
+    """Raised from the progress callback; a BaseException so per-item `except Exception` handlers let it through"""
+
+
+class JobStore:
+    """SQLite table of background jobs, shared by every dashboard process and the workers"""
+
+    def __init__(self, db_path='data/state/jobs.db'):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT,
+                status TEXT,
+                stage TEXT,
+                done INTEGER DEFAULT 0,
+                total INTEGER DEFAULT 0,
+                progress REAL DEFAULT 0,
+                message TEXT,
+                error TEXT,
+                pid INTEGER,
+                cancel_requested INTEGER DEFAULT 0,
+                created_at TEXT,
+                started_at TEXT,
+                finished_at TEXT,
+                heartbeat_at TEXT
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS jobs_kind ON jobs (kind, id)')
+
+    def get(self, job_id):
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest(self, kind):
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM jobs WHERE kind = ? ORDER BY id DESC LIMIT 1', (kind,)).fetchone()
+        return dict(row) if row else None
+
+    def update(self, job_id, **fields):
+        columns = ', '.join(f'{name} = ?' for name in fields)
+        with self.lock:
+            self.conn.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*fields.values(), job_id))
+
+    def create_unless_active(self, kind, is_alive):
+        """(job id, created) - the active job of this kind if there is a live one, else a new queued job"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                placeholders = ','.join('?' * len(ACTIVE))
+                row = self.conn.execute(
+                    f'SELECT * FROM jobs WHERE kind = ? AND status IN ({placeholders}) ORDER BY id DESC LIMIT 1',
+                    (kind, *ACTIVE)).fetchone()
+                if row and is_alive(dict(row)):
+                    self.conn.execute('COMMIT')
+                    return row['id'], False
+                if row:
+                    self.conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                                      (FAILED, 'Worker stopped responding', now, row['id']))
+                cursor = self.conn.execute(
+                    'INSERT INTO jobs (kind, status, message, created_at, heartbeat_at) VALUES (?, ?, ?, ?, ?)',
+                    (kind, QUEUED, 'Queued', now, now))
+                self.conn.execute('COMMIT')
+                return cursor.lastrowid, True
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _age(timestamp):
+    if not timestamp:
+        return timedelta.max
+    return datetime.now() - datetime.fromisoformat(timestamp)
+
+
+class JobRunner:
+    """Runs scraper / price update jobs in separate worker processes.
+
+    submit() starts at most one job per kind: while one is alive, every
+    dashboard gets its id back and watches the same job through status().
+    Workers stream stage progress into the shared job table.
+    """
+
+    def __init__(self, db_path='data/state/jobs.db', log_dir='data/state/jobs'):
+        self.store = JobStore(db_path)
+        self.log_dir = log_dir
+
+    def is_alive(self, job):
+        return job['status'] in ACTIVE and _age(job['heartbeat_at']) < timedelta(seconds=HEARTBEAT_TIMEOUT)
+
+    def submit(self, kind):
+        """Id of the running job of this kind, or of a newly started one"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id, created = self.store.create_unless_active(kind, self.is_alive)
+        if created:
+            self._spawn(job_id)
+            logger.info(f"Job {job_id} ({kind}) started")
+        return job_id
+
+    def _spawn(self, job_id):
+        os.makedirs(self.log_dir, exist_ok=True)
+        log = open(os.path.join(self.log_dir, f'{job_id}.log'), 'a', encoding='utf-8')
+        options = {}
+        if os.name == 'nt':
+            options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options['start_new_session'] = True
+        # Worker outlives the Streamlit rerun (and the session) that started it
+        process = subprocess.Popen([sys.executable, '-m', 'src.scrapers.jobs', str(job_id), self.store.db_path],
+                                   cwd=os.getcwd(), stdout=log, stderr=subprocess.STDOUT, **options)
+        log.close()
+        self.store.update(job_id, pid=process.pid)
+
+    def status(self, job_id):
+        """Job dict; an active job whose worker died is reported (and stored) as failed"""
+        job = self.store.get(job_id)
+        if job and job['status'] in ACTIVE and not self.is_alive(job):
+            self.store.update(job_id, status=FAILED, error='Worker stopped responding',
+                              finished_at=datetime.now().isoformat())
+            job = self.store.get(job_id)
+        return job
+
+    def latest(self, kind):
+        job = self.store.latest(kind)
+        return self.status(job['id']) if job else None
+
+    def cancel(self, job_id):
+        """Ask the worker to stop at its next progress report (killed after CANCEL_GRACE seconds)"""
+        job = self.store.get(job_id)
+        if not job or job['status'] not in ACTIVE:
+            return False
+        self.store.update(job_id, cancel_requested=1, message='Cancelling...')
+        return True
+
+
+class ProgressReporter:
+    """progress(stage, done, total) callback handed to the job function; raises JobCancelled once cancelled"""
+
+    def __init__(self, store, job_id, stages, min_interval=0.5):
+        self.store = store
+        self.job_id = job_id
+        self.stages = list(stages)
+        self.min_interval = min_interval
+        self.last_write = 0.0
+        self.cancel_requested_at = None
+
+    def cancelled(self):
+        job = self.store.get(self.job_id)
+        return bool(job and job['cancel_requested'])
+
+    def __call__(self, stage, done, total):
+        now = time.monotonic()
+        finished_stage = total and done >= total
+        if now - self.last_write < self.min_interval and not finished_stage:
+            return
+        self.last_write = now
+
+        index = self.stages.index(stage) if stage in self.stages else 0
+        fraction = min(done / total, 1.0) if total else 0.0
+        progress = (index + fraction) / max(len(self.stages), 1)
+        self.store.update(self.job_id, stage=stage, done=done, total=total, progress=progress,
+                          message=f"Step {index + 1}/{len(self.stages)}: {stage} ({done}/{total})",
+                          heartbeat_at=datetime.now().isoformat())
+        if self.cancelled():
+            raise JobCancelled()
+
+    def heartbeat(self, stop):
+        """Keep the job alive between reports; hard-stop a cancelled job that ignores the flag"""
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            self.store.update(self.job_id, heartbeat_at=datetime.now().isoformat())
+            if self.cancelled():
+                self.cancel_requested_at = self.cancel_requested_at or time.monotonic()
+                if time.monotonic() - self.cancel_requested_at > CANCEL_GRACE:
+                    self.store.update(self.job_id, status=CANCELLED, message='Cancelled',
+                                      finished_at=datetime.now().isoformat())
+                    logger.warning(f"Job {self.job_id} didn't stop in {CANCEL_GRACE}s, exiting")
+                    os._exit(1)
+
+
+def run_job(job_id, db_path='data/state/jobs.db'):
+    """Worker entry point: run one job and record its outcome"""
+    store = JobStore(db_path)
+    job = store.get(job_id)
+    target, stages = JOB_KINDS[job['kind']]
+    reporter = ProgressReporter(store, job_id, stages)
+    stop = threading.Event()
+    threading.Thread(target=reporter.heartbeat, args=(stop,), daemon=True).start()
+
+    store.update(job_id, status=RUNNING, pid=os.getpid(), message='Starting',
+                 started_at=datetime.now().isoformat(), heartbeat_at=datetime.now().isoformat())
+    try:
+        if reporter.cancelled():
+            raise JobCancelled()
+        module_name, func_name = target.split(':')
+        func = getattr(importlib.import_module(module_name), func_name)
+        result = func(progress=reporter)
+        if result is False:
+            store.update(job_id, status=FAILED, error='Job reported failure', message='Failed')
+        else:
+            store.update(job_id, status=DONE, progress=1.0, message='Completed')
+    except JobCancelled:
+        store.update(job_id, status=CANCELLED, message='Cancelled')
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed")
+        store.update(job_id, status=FAILED, error=str(e), message='Failed')
+    finally:
+        stop.set()
+        store.update(job_id, finished_at=datetime.now().isoformat())
+        store.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_job(int(sys.argv[1]), *sys.argv[2:3])
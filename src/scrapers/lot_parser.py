@@ -0,0 +1,232 @@
+import json
+import re
+import threading
+
+from bs4 import BeautifulSoup
+
+LOT_FIELDNAMES = [
+    'name', 'current_bid', 'opening_bid', 'estimate_bid',
+    'buy_it_now', 'end_time', 'description', 'images', 'url',
+    'commission', 'vat_rate', 'has_buy_it_now', 'has_estimate',
+    'has_current_bid', 'has_opening_bid'
+]
+
+# Fields the parser tries to fill, in report order
+PARSED_FIELDS = [
+    'name', 'current_bid', 'opening_bid', 'estimate_bid', 'buy_it_now',
+    'end_time', 'description', 'images', 'commission', 'vat_rate'
+]
+
+# Without these the page is handed to the Selenium fallback
+REQUIRED_FIELDS = ('name', 'end_time', 'commission', 'vat_rate')
+
+AMOUNT = r'(\d[\d,]*(?:\.\d+)?)'
+ESTIMATE_RE = re.compile(rf'{AMOUNT}\s*([A-Z]{{3}})\s*-\s*{AMOUNT}\s*([A-Z]{{3}})')
+END_TIME_RE = re.compile(r'Bidding ends:\s*(\d{1,2} \w{3} \d{4} \d{1,2}:\d{2}(?: \w+)?)')
+BUY_NOW_RE = re.compile(rf'Buy it now\s*(?:for|price)?[:\s]*(?:£\s*)?{AMOUNT}', re.IGNORECASE)
+CURRENT_BID_RE = re.compile(rf'Current bid[:\s]*(?:£\s*)?{AMOUNT}', re.IGNORECASE)
+COMMISSION_RES = [
+    re.compile(r'commissionsExVAT"?>\s*([\d.]+)\s*%'),
+    re.compile(r'"?commissionsExVAT"?\s*[:=]\s*"?([\d.]+)'),
+]
+VAT_RES = [
+    re.compile(r'additionalFeeVatRate"?>\s*([\d.]+)\s*%'),
+    re.compile(r'"?additionalFeeVatRate"?\s*[:=]\s*"?([\d.]+)'),
+]
+
+
+def empty_lot(url):
+    """Lot dict with the same defaults get_lot_details uses"""
+    return {
+        'name': 'Unknown',
+        'current_bid': 'No Bid',
+        'opening_bid': 'Unknown',
+        'estimate_bid': 'Unknown',
+        'buy_it_now': 'Unknown',
+        'end_time': 'Unknown',
+        'description': 'Unknown',
+        'images': [],
+        'url': url,
+        'commission': '0',
+        'vat_rate': '0',
+        'has_buy_it_now': '',
+        'has_estimate': '',
+        'has_current_bid': '',
+        'has_opening_bid': ''
+    }
+
+
+def _text(element):
+    return element.get_text(' ', strip=True) if element else ''
+
+
+def _first_match(patterns, text):
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _json_ld_product(soup):
+    """Product object from application/ld+json blocks, if the page has one"""
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except (TypeError, ValueError):
+            continue
+        items = data if isinstance(data, list) else data.get('@graph', [data])
+        for item in items:
+            if isinstance(item, dict) and item.get('@type') in ('Product', 'IndividualProduct'):
+                return item
+    return {}
+
+
+def parse_lot_html(html, url):
+    """Parse a lot page from static HTML; returns (lot_data, set of fields found)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    lot_data = empty_lot(url)
+    found = set()
+    product = _json_ld_product(soup)
+    page_text = soup.get_text('\n', strip=True)
+    scripts = '\n'.join(script.string for script in soup.find_all('script') if script.string)
+
+    # Name
+    name = _text(soup.find('h1')) or product.get('name', '')
+    if name:
+        lot_data['name'] = name.strip()
+        found.add('name')
+
+    # Commission ve VAT: popup span'leri ya da script template'leri
+    commission = _text(soup.find(id='commissionsExVAT')).replace('%', '').strip()
+    vat = _text(soup.find(id='additionalFeeVatRate')).replace('%', '').strip()
+    commission = commission or _first_match(COMMISSION_RES, scripts)
+    vat = vat or _first_match(VAT_RES, scripts)
+    if commission:
+        lot_data['commission'] = commission
+        found.add('commission')
+    if vat:
+        lot_data['vat_rate'] = vat
+        found.add('vat_rate')
+
+    # Opening bid
+    opening_bid = _text(soup.select_one('span.minBidAmount'))
+    if opening_bid:
+        lot_data['opening_bid'] = opening_bid
+        lot_data['has_opening_bid'] = 'TRUE'
+        found.add('opening_bid')
+
+    # Current bid
+    if soup.select_one('span.noBid'):
+        found.add('current_bid')
+    else:
+        current_bid = _text(soup.select_one('.currentBid strong, .current-bid strong, span.bidAmount strong'))
+        if not current_bid:
+            match = CURRENT_BID_RE.search(page_text)
+            current_bid = match.group(1) if match else ''
+        if current_bid:
+            lot_data['current_bid'] = current_bid
+            lot_data['has_current_bid'] = 'TRUE'
+            found.add('current_bid')
+
+    # Estimate
+    estimate_label = re.search(r'Estimate', page_text)
+    if estimate_label:
+        match = ESTIMATE_RE.search(page_text, estimate_label.start())
+        if match:
+            lot_data['estimate_bid'] = f"{match.group(1)} {match.group(2)} - {match.group(3)} {match.group(4)}"
+            lot_data['has_estimate'] = 'TRUE'
+            found.add('estimate_bid')
+
+    # Buy it now
+    match = BUY_NOW_RE.search(page_text)
+    if match:
+        lot_data['buy_it_now'] = match.group(1)
+        lot_data['has_buy_it_now'] = 'TRUE'
+        found.add('buy_it_now')
+
+    # End time - Selenium ile aynı format
+    match = END_TIME_RE.search(page_text)
+    if match:
+        lot_data['end_time'] = f"Bidding ends:\n{match.group(1)}"
+        found.add('end_time')
+
+    # Description
+    description = _text(soup.select_one('[itemprop="description"], .lot-description, #lot-description'))
+    if not description:
+        description = product.get('description', '')
+    if not description:
+        meta = soup.find('meta', attrs={'property': 'og:description'})
+        description = meta.get('content', '') if meta else ''
+    if description:
+        lot_data['description'] = description.strip()
+        found.add('description')
+
+    # Images
+    images = []
+    for img in soup.find_all('img'):
+        src = img.get('src') or img.get('data-src')
+        if src and 'portal-images' in src and src not in images:
+            images.append(src)
+    if not images and product.get('image'):
+        image = product['image']
+        images = image if isinstance(image, list) else [image]
+    if images:
+        lot_data['images'] = images
+        found.add('images')
+
+    return lot_data, found
+
+
+def merge_lot_data(primary, secondary):
+    """Fill fields left at their defaults in primary from secondary"""
+    defaults = empty_lot(primary.get('url'))
+    merged = dict(primary)
+    for field in LOT_FIELDNAMES:
+        if merged.get(field) == defaults[field] and secondary.get(field) != defaults[field]:
+            merged[field] = secondary[field]
+    return merged
+
+
+class FieldStats:
+    """Per-field success counters for the HTTP parser"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = 0
+        self.fallbacks = 0
+        self.fetch_errors = 0
+        self.hits = {field: 0 for field in PARSED_FIELDS}
+
+    def record(self, found):
+        with self.lock:
+            self.pages += 1
+            for field in found:
+                if field in self.hits:
+                    self.hits[field] += 1
+
+    def record_fallback(self):
+        with self.lock:
+            self.fallbacks += 1
+
+    def record_error(self):
+        with self.lock:
+            self.fetch_errors += 1
+
+    def report(self):
+        """Success rate per field plus fallback / error counts"""
+        pages = max(self.pages, 1)
+        return {
+            'pages': self.pages,
+            'fallbacks': self.fallbacks,
+            'fetch_errors': self.fetch_errors,
+            'fields': {field: self.hits[field] / pages for field in PARSED_FIELDS}
+        }
+
+    def format_report(self):
+        report = self.report()
+        lines = [f"Parsed {report['pages']} pages, "
+                 f"{report['fallbacks']} Selenium fallbacks, {report['fetch_errors']} fetch errors"]
+        for field, rate in report['fields'].items():
+            lines.append(f"  {field:<14} {rate:6.1%}")
+        return '\n'.join(lines)
@@ -10,19 +10,27 @@ from queue import Queue
 import csv
 from datetime import datetime
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import json
+from .price_poller import PricePoller
+from .seen_store import parse_end_time
+from .price_store import PriceStore
+from .price_history import PriceHistory
+from .alerts import AlertDispatcher, PriceAlert
+from .checkpoint import open_committed
 
 class PriceMonitor:
-    def __init__(self, driver_count=5, tabs_per_driver=5):
+    def __init__(self, driver_count=5, tabs_per_driver=5, mode='http', poll_workers=4, poll_rate=4.0):
         self.driver_count = driver_count
         self.tabs_per_driver = tabs_per_driver
+        # 'http': PricePoller (conditional GET, adaptive intervals); 'selenium': eski tam sayfa polling
+        self.mode = mode
+        self.poll_workers = poll_workers
+        self.poll_rate = poll_rate
+        self.poller = None
+        self.lots_file = 'data/output/lots_details.csv'
         self.drivers = []
         self.stop_event = threading.Event()
         self.url_queue = Queue()
-        self.results_lock = threading.Lock()
         self.results = {}
         self.csv_file = 'data/check/published_products.csv'
         self.settings_file = 'config/settings.json'
@@ -31,108 +39,108 @@ class PriceMonitor:
         with open(self.settings_file, 'r') as f:
             self.settings = json.load(f)
         
-        # CSV dosyası yoksa veya boşsa, başlangıç yapısını oluştur
-        if not os.path.exists(self.csv_file) or os.path.getsize(self.csv_file) == 0:
-            columns = ['title', 'auction_url', 'woo_product_id', 'product_url', 
-                      'current_price', 'last_price', 'last_check']
-            self.df = pd.DataFrame(columns=columns)
-            self.df.to_csv(self.csv_file, index=False)
-        else:
-            # CSV'yi DataFrame olarak yükle
-            self.df = pd.read_csv(self.csv_file)
-            
-            # Yeni kolonları ekle (yoksa)
-            if 'current_price' not in self.df.columns:
-                self.df['current_price'] = None
-            if 'last_price' not in self.df.columns:
-                self.df['last_price'] = None
-            if 'last_check' not in self.df.columns:
-                self.df['last_check'] = None
-            
-            # Değişiklikleri kaydet
-            self.df.to_csv(self.csv_file, index=False)
+        # URL index'li fiyat deposu; değişiklikler log'a yazılır, CSV periyodik snapshot
+        self.store = PriceStore(self.csv_file).start()
+        # Tüm fiyat gözlemleri (lot, zaman, fiyat) - app.py grafikleri için
+        self.history = PriceHistory()
+        # Email'ler arka planda, tek SMTP bağlantısı üzerinden özet olarak gönderilir
+        self.alerts = AlertDispatcher.from_settings(self.settings).start()
 
-    def send_email_alert(self, product_title, old_price, new_price, product_url):
-        """Fiyat değişikliği için email gönder"""
+    def send_email_alert(self, product_title, old_price, new_price, product_url, auction_url=None):
+        """Fiyat değişikliğini email kuyruğuna ekle (AlertDispatcher toplu gönderir)"""
+        self.alerts.submit(PriceAlert(auction_url or product_url, product_title,
+                                      old_price, new_price, product_url))
+
+    def update_csv(self, url, current_price):
+        """Fiyat bilgisini güncelle (PriceStore'a yazılır, CSV arka planda kaydedilir)"""
+        if url not in self.store or current_price in ['N/A', None, '']:
+            return
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.settings['notification_email']
-            msg['To'] = self.settings['notification_email']
-            msg['Subject'] = f"Price Change Alert: {product_title}"
-            
-            body = f"""
-            Price change detected for: {product_title}
-            Old Price: £{old_price}
-            New Price: £{new_price}
-            Product URL: {product_url}
-            
-            Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Email gönderme işlemi (SMTP ayarlarını settings.json'dan al)
-            server = smtplib.SMTP('smtp.gmail.com', 587)
-            server.starttls()
-            server.login(self.settings['notification_email'], self.settings['email_password'])
-            text = msg.as_string()
-            server.sendmail(self.settings['notification_email'], self.settings['notification_email'], text)
-            server.quit()
-            
-            print(f"Email sent for price change: {product_title}")
-            
+            clean_price = current_price.replace('£', '').replace('GBP', '').replace(',', '').strip()
+            price_float = float(clean_price)
+        except (ValueError, TypeError) as e:
+            print(f"Price conversion error ({url}): {str(e)}")
+            return
+
+        try:
+            row, old_price = self.store.update(url, price_float)
+            self.history.append(url, price_float)
+
+            # Fiyat değişikliği kontrolü
+            if old_price is not None and price_float != old_price:
+                self.send_email_alert(
+                    row['title'],
+                    old_price,
+                    price_float,
+                    row['product_url'],
+                    url
+                )
         except Exception as e:
-            print(f"Email sending error: {str(e)}")
+            print(f"Price update error ({url}): {str(e)}")
 
-    def update_csv(self, url, current_price):
-        """CSV'deki fiyat bilgisini güncelle"""
+    def load_end_times(self):
+        """auction_url -> end datetime from lots_details.csv"""
+        end_times = {}
+        if not os.path.exists(self.lots_file):
+            return end_times
         try:
-            with self.results_lock:
-                # URL'ye göre ilgili satırı bul
-                mask = self.df['auction_url'] == url
-                
-                if not mask.any():
-                    return
-                
-                row = self.df.loc[mask].iloc[0]
-                old_price = row.get('current_price')
-                
-                # Fiyatı temizle ve float'a çevir
-                if current_price not in ['N/A', None, '']:
-                    try:
-                        clean_price = current_price.replace('£', '').replace('GBP', '').strip()
-                        price_float = float(clean_price)
-                        
-                        # Fiyat değişikliği kontrolü
-                        if old_price is not None and price_float != old_price:
-                            self.send_email_alert(
-                                row['title'],
-                                old_price,
-                                price_float,
-                                row['product_url']
-                            )
-                        
-                        # Fiyatları güncelle
-                        self.df.loc[mask, 'last_price'] = old_price
-                        self.df.loc[mask, 'current_price'] = price_float
-                        self.df.loc[mask, 'last_check'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        
-                    except (ValueError, TypeError) as e:
-                        print(f"Price conversion error ({url}): {str(e)}")
-                        return
-                
-                # DataFrame'i CSV'ye kaydet
-                self.df.to_csv(self.csv_file, index=False)
-                
+            with open_committed(self.lots_file) as file:
+                for row in csv.DictReader(file):
+                    end_time = parse_end_time(row.get('end_time'))
+                    if row.get('url') and end_time:
+                        end_times[row['url']] = end_time
         except Exception as e:
-            print(f"CSV update error ({url}): {str(e)}")
+            print(f"End time loading error: {str(e)}")
+        return end_times
+
+    def handle_price_change(self, change):
+        """PricePoller callback - only called when the price actually moved"""
+        print(f"Price change for {change.url}: {change.old_price} -> {change.new_price}")
+        self.update_csv(change.url, str(change.new_price))
+
+    def start(self):
+        """Start the HTTP price poller in the background"""
+        if self.poller:
+            return self.poller
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        }
+        self.stop_event.clear()
+        self.store.start()
+        self.alerts.start()
+        self.poller = PricePoller(self.handle_price_change, headers=headers,
+                                  workers=self.poll_workers, rate=self.poll_rate)
+        end_times = self.load_end_times()
+        for url in self.store.urls():
+            self.poller.add(url, end_time=end_times.get(url),
+                            last_price=self.store.get(url)['current_price'])
+        print(f"Monitoring {len(self.poller.lots)} lots over HTTP")
+        return self.poller.start()
+
+    def check_now(self):
+        """Check every monitored lot immediately"""
+        if self.poller:
+            self.poller.check_all_now()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.poller:
+            self.poller.stop()
+            self.poller = None
+        self.store.close()
+        self.alerts.stop()
 
     def monitor_urls(self):
         """Published ürünlerin fiyatlarını izle"""
+        if self.mode == 'http':
+            self.start()
+            self.stop_event.wait()
+            return
+
         while True:
             try:
                 # CSV'den URL'leri al
-                urls = self.df['auction_url'].tolist()
+                urls = self.store.urls()
                 
                 for url in urls:
                     self.url_queue.put(url)
@@ -247,7 +255,7 @@ def main():
     except KeyboardInterrupt:
         print("\nProgram stopping...")
     finally:
-        monitor.stop_event.set()
+        monitor.stop()
         for driver in monitor.drivers:
             try:
                 driver.quit()
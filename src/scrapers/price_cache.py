@@ -0,0 +1,178 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from .title_matcher import extract_model_numbers, tokenize
+
+logger = logging.getLogger(__name__)
+
+FRESH = 'fresh'
+STALE = 'stale'
+
+# Queries sharing a model key must also share this much of their other words (Jaccard)
+MIN_SHARED_WORDS = 0.55
+
+
+def normalize_query(query):
+    return ' '.join(str(query or '').lower().split())
+
+
+def cache_key(query, by_model=True):
+    """Shared key for a cleaned search query: its first model number if any, else the query itself"""
+    models = extract_model_numbers(query) if by_model else []
+    if models:
+        return f"model:{models[0]}"
+    return f"q:{normalize_query(query)}"
+
+
+def _words(query):
+    models = {model.lower() for model in extract_model_numbers(query)}
+    return {token for token in tokenize(query) if not token.isdigit() and token not in models}
+
+
+def same_product(query, other):
+    """Whether two queries with the same model key describe the same product.
+
+    A model-like token alone can be a lot / pallet reference ("... & MORE/1558-TL"),
+    so the remaining words have to overlap too.
+    """
+    words, other_words = _words(query), _words(other)
+    if not words or not other_words:
+        return True
+    return len(words & other_words) / len(words | other_words) >= MIN_SHARED_WORDS
+
+
+def resolve_keys(queries, known=None):
+    """{query: key}: the model key only for queries that match the first query (or known query) using it"""
+    known = dict(known or {})
+    keys = {}
+    for query in queries:
+        key = cache_key(query)
+        if key.startswith('model:'):
+            if key in known and not same_product(query, known[key]):
+                key = cache_key(query, by_model=False)
+            else:
+                known.setdefault(key, query)
+        keys[query] = key
+    return keys
+
+
+class MarketPriceCache:
+    """SQLite cache of eBay search results keyed by normalized query / model number.
+
+    Entries younger than `ttl_hours` are fresh; up to `stale_hours` they are
+    served as stale and should be revalidated in the background. Results with
+    no price expire after `empty_ttl_hours`. The table is kept to `max_entries`
+    rows by evicting the least recently used.
+    """
+
+    def __init__(self, db_path='data/state/market_prices.db', ttl_hours=24, stale_hours=72,
+                 empty_ttl_hours=6, max_entries=5000):
+        self.db_path = db_path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.stale = timedelta(hours=max(stale_hours, ttl_hours))
+        self.empty_ttl = timedelta(hours=empty_ttl_hours)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = {FRESH: 0, STALE: 0, 'miss': 0}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS prices (
+                    key TEXT PRIMARY KEY,
+                    query TEXT,
+                    result_json TEXT,
+                    has_price INTEGER,
+                    fetched_at TEXT,
+                    accessed_at TEXT
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS prices_accessed ON prices (accessed_at)')
+
+    def _state(self, row, now):
+        age = now - datetime.fromisoformat(row['fetched_at'])
+        ttl = self.ttl if row['has_price'] else self.empty_ttl
+        if age <= ttl:
+            return FRESH
+        if row['has_price'] and age <= self.stale:
+            return STALE
+        return None
+
+    def get_many(self, keys):
+        """{key: (result, 'fresh' | 'stale')} for usable entries; touches them for LRU"""
+        keys = list(dict.fromkeys(keys))
+        now = datetime.now()
+        found = {}
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for row in self.conn.execute(f'SELECT * FROM prices WHERE key IN ({placeholders})', chunk):
+                    state = self._state(row, now)
+                    if state:
+                        found[row['key']] = (json.loads(row['result_json']), state)
+            if found:
+                with self.conn:
+                    self.conn.executemany('UPDATE prices SET accessed_at = ? WHERE key = ?',
+                                          [(now.isoformat(), key) for key in found])
+            for key in keys:
+                self.hits[found[key][1] if key in found else 'miss'] += 1
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key, (None, None))
+
+    def lookup(self, queries):
+        """({query: key}, {key: (result, state)}) for cleaned queries.
+
+        Queries share a model-number key (and its cached price) only if they
+        describe the same product as each other and as the query it was stored for.
+        """
+        queries = list(dict.fromkeys(queries))
+        keys = resolve_keys(queries)
+        model_keys = [key for key in set(keys.values()) if key.startswith('model:')]
+        with self.lock:
+            stored = {}
+            for i in range(0, len(model_keys), 500):
+                chunk = model_keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                stored.update(self.conn.execute(
+                    f'SELECT key, query FROM prices WHERE key IN ({placeholders})', chunk).fetchall())
+        keys = resolve_keys(queries, known=stored)
+        return keys, self.get_many(keys.values())
+
+    def put_many(self, entries):
+        """Store {key: (query, result)}"""
+        now = datetime.now().isoformat()
+        rows = [(key, query, json.dumps(result), int(bool(result and result.get('ebay_lowest_price'))), now, now)
+                for key, (query, result) in entries.items()]
+        with self.lock:
+            with self.conn:
+                self.conn.executemany('INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?)', rows)
+                self._evict()
+
+    def put(self, key, query, result):
+        self.put_many({key: (query, result)})
+
+    def _evict(self):
+        count = self.conn.execute('SELECT COUNT(*) FROM prices').fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute('''
+                DELETE FROM prices WHERE key IN (
+                    SELECT key FROM prices ORDER BY accessed_at ASC LIMIT ?
+                )
+            ''', (count - self.max_entries,))
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM prices').fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,111 @@
+import glob
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# One fixed-size record per observation, appended to a per-day segment file
+RECORD_DTYPE = np.dtype([('lot', '<u4'), ('ts', '<f8'), ('price', '<f8')])
+SEGMENT_FORMAT = '%Y-%m-%d'
+
+
+class PriceHistory:
+    """Append-only (lot, timestamp, price) log stored as daily binary segments.
+
+    Lot URLs are interned to integer ids (lots.txt, line number = id), so each
+    observation costs 20 bytes. Range queries only memory-map the segments
+    that overlap the requested time window.
+    """
+
+    def __init__(self, directory='data/state/price_history'):
+        self.directory = directory
+        self.lots_file = os.path.join(directory, 'lots.txt')
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.lot_urls = []
+        if os.path.exists(self.lots_file):
+            with open(self.lots_file, 'r', encoding='utf-8') as f:
+                self.lot_urls = [line.rstrip('\n') for line in f if line.strip()]
+        self.lot_ids = {url: i for i, url in enumerate(self.lot_urls)}
+
+    def _lot_id(self, url):
+        """Id for url, interning it if new (call with self.lock held)"""
+        lot_id = self.lot_ids.get(url)
+        if lot_id is None:
+            lot_id = len(self.lot_urls)
+            with open(self.lots_file, 'a', encoding='utf-8') as f:
+                f.write(url + '\n')
+            self.lot_urls.append(url)
+            self.lot_ids[url] = lot_id
+        return lot_id
+
+    def _segment_path(self, day):
+        return os.path.join(self.directory, f"{day.strftime(SEGMENT_FORMAT)}.bin")
+
+    def append(self, url, price, timestamp=None):
+        self.append_many([(url, price, timestamp)])
+
+    def append_many(self, observations):
+        """Append (url, price, timestamp or None) observations"""
+        by_segment = {}
+        with self.lock:
+            for url, price, timestamp in observations:
+                timestamp = timestamp or datetime.now()
+                record = (self._lot_id(url), timestamp.timestamp(), float(price))
+                by_segment.setdefault(self._segment_path(timestamp), []).append(record)
+            for path, records in by_segment.items():
+                with open(path, 'ab') as f:
+                    np.array(records, dtype=RECORD_DTYPE).tofile(f)
+
+    def urls(self):
+        return list(self.lot_urls)
+
+    def _segments(self, start=None, end=None):
+        paths = sorted(glob.glob(os.path.join(self.directory, '*.bin')))
+        first = start.strftime(SEGMENT_FORMAT) if start else None
+        last = end.strftime(SEGMENT_FORMAT) if end else None
+        for path in paths:
+            day = os.path.basename(path)[:-4]
+            if (first and day < first) or (last and day > last):
+                continue
+            yield path
+
+    def query(self, urls=None, start=None, end=None):
+        """Observations as a DataFrame (url, timestamp, price), sorted by lot then time"""
+        with self.lock:
+            lot_ids = None
+            if urls is not None:
+                lot_ids = np.array([self.lot_ids[url] for url in urls if url in self.lot_ids], dtype='<u4')
+            lot_urls = np.array(self.lot_urls, dtype=object)
+
+        chunks = []
+        for path in self._segments(start, end):
+            size = os.path.getsize(path) // RECORD_DTYPE.itemsize
+            if not size:
+                continue
+            records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(size,))
+            mask = np.ones(size, dtype=bool)
+            if start:
+                mask &= records['ts'] >= start.timestamp()
+            if end:
+                mask &= records['ts'] <= end.timestamp()
+            if lot_ids is not None:
+                mask &= np.isin(records['lot'], lot_ids)
+            chunks.append(np.array(records[mask]))
+
+        if not chunks:
+            return pd.DataFrame(columns=['url', 'timestamp', 'price'])
+        records = np.concatenate(chunks)
+        records = records[np.lexsort((records['ts'], records['lot']))]
+        return pd.DataFrame({
+            'url': lot_urls[records['lot']],
+            'timestamp': pd.to_datetime(records['ts'], unit='s', utc=True)
+                           .tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None),
+            'price': records['price']
+        })
+
+    def latest(self, hours=24):
+        """Observations from the last `hours` hours"""
+        return self.query(start=datetime.now() - timedelta(hours=hours))
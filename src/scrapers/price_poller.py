@@ -0,0 +1,253 @@
+import heapq
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .lot_parser import parse_lot_html
+from .rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# (seconds before end, poll interval) - first match wins
+DEFAULT_SCHEDULE = [
+    (10 * 60, 15),
+    (60 * 60, 60),
+    (6 * 60 * 60, 5 * 60),
+    (24 * 60 * 60, 15 * 60),
+]
+DISTANT_INTERVAL = 60 * 60
+UNKNOWN_END_INTERVAL = 5 * 60
+
+PRICE_PATTERNS = [
+    re.compile(r'data-price="([\d.,]+)"'),
+    re.compile(r'itemprop="price"[^>]*content="([\d.,]+)"'),
+    re.compile(r'class="[^"]*\b(?:priceTxt|price-value|current-price)\b[^"]*"[^>]*>\s*(?:<[^>]+>\s*)*£?\s*([\d.,]+)'),
+]
+
+
+def extract_price(html):
+    """Current price text from a lot page; cheap regex scan first, full parse as fallback"""
+    for pattern in PRICE_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            return match.group(1)
+    lot_data, found = parse_lot_html(html, None)
+    if lot_data['has_current_bid']:
+        return lot_data['current_bid']
+    if lot_data['has_opening_bid']:
+        return lot_data['opening_bid']
+    return None
+
+
+def parse_price(price_text):
+    try:
+        return float(str(price_text).replace('£', '').replace('GBP', '').replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+class PriceChange:
+    """Emitted when a monitored lot's price differs from the last observation"""
+
+    def __init__(self, url, old_price, new_price, price_text, observed_at):
+        self.url = url
+        self.old_price = old_price
+        self.new_price = new_price
+        self.price_text = price_text
+        self.observed_at = observed_at
+
+    def __repr__(self):
+        return f"PriceChange({self.url!r}, {self.old_price} -> {self.new_price})"
+
+
+class _LotState:
+    def __init__(self, url, end_time=None, last_price=None):
+        self.url = url
+        self.end_time = end_time
+        self.last_price = last_price
+        self.etag = None
+        self.last_modified = None
+        self.checks = 0
+        self.not_modified = 0
+
+
+class PricePoller:
+    """HTTP price polling with conditional GETs and per-lot adaptive intervals"""
+
+    def __init__(self, on_change, headers=None, workers=4, rate=4.0, timeout=20,
+                 schedule=None, distant_interval=DISTANT_INTERVAL,
+                 unknown_end_interval=UNKNOWN_END_INTERVAL):
+        self.on_change = on_change
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate)
+        self.schedule = schedule or DEFAULT_SCHEDULE
+        self.distant_interval = distant_interval
+        self.unknown_end_interval = unknown_end_interval
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self.lots = {}
+        # One live schedule per lot: heap entries whose due time differs from due[url] are stale
+        self.heap = []
+        self.due = {}
+        self.in_flight = set()
+        # In-flight lots asked to be checked again as soon as their current check finishes
+        self.recheck = set()
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def add(self, url, end_time=None, last_price=None):
+        """Start monitoring url (due immediately)"""
+        with self.condition:
+            if url not in self.lots:
+                self.lots[url] = _LotState(url, end_time, last_price)
+            else:
+                self.lots[url].end_time = end_time or self.lots[url].end_time
+            self._due_now(url, time.monotonic())
+            self.condition.notify()
+
+    def remove(self, url):
+        with self.condition:
+            self.lots.pop(url, None)
+            self.due.pop(url, None)
+            self.recheck.discard(url)
+
+    def _schedule(self, url, due):
+        self.due[url] = due
+        heapq.heappush(self.heap, (due, url))
+
+    def _due_now(self, url, now):
+        if url in self.in_flight:
+            self.recheck.add(url)
+        else:
+            self._schedule(url, now)
+
+    def next_interval(self, state, now=None):
+        """Seconds until the next check: faster near the end time, slower for distant lots"""
+        if state.end_time is None:
+            return self.unknown_end_interval
+        remaining = (state.end_time - (now or datetime.now())).total_seconds()
+        if remaining <= 0:
+            return None
+        for threshold, interval in self.schedule:
+            if remaining <= threshold:
+                return min(interval, max(remaining, 1))
+        return self.distant_interval
+
+    def check(self, url):
+        """Poll one lot; returns a PriceChange if the price moved"""
+        state = self.lots.get(url)
+        if state is None:
+            return None
+        headers = {}
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        self.limiter.acquire()
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        state.checks += 1
+        if response.status_code == 304:
+            state.not_modified += 1
+            return None
+        response.raise_for_status()
+        state.etag = response.headers.get('ETag', state.etag)
+        state.last_modified = response.headers.get('Last-Modified', state.last_modified)
+
+        price_text = extract_price(response.text)
+        new_price = parse_price(price_text)
+        if new_price is None or new_price == state.last_price:
+            return None
+        change = PriceChange(url, state.last_price, new_price, price_text, datetime.now())
+        state.last_price = new_price
+        return change
+
+    def check_all_now(self):
+        """Make every monitored lot due immediately"""
+        with self.condition:
+            now = time.monotonic()
+            for url in self.lots:
+                self._due_now(url, now)
+            # Drop the superseded entries while we're at it
+            self.heap = [(due, url) for url, due in self.due.items()]
+            heapq.heapify(self.heap)
+            self.condition.notify_all()
+
+    def _next_due(self):
+        with self.condition:
+            while not self.stop_event.is_set():
+                if not self.heap:
+                    self.condition.wait(1)
+                    continue
+                due, url = self.heap[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self.condition.wait(min(wait, 1))
+                    continue
+                heapq.heappop(self.heap)
+                if url in self.lots and self.due.get(url) == due:
+                    del self.due[url]
+                    self.in_flight.add(url)
+                    return url
+            return None
+
+    def _reschedule(self, url):
+        with self.condition:
+            self.in_flight.discard(url)
+            state = self.lots.get(url)
+            if state is None:
+                return
+            interval = self.next_interval(state)
+            if interval is None:
+                logger.info(f"Lot ended, no longer monitoring: {url}")
+                del self.lots[url]
+                self.recheck.discard(url)
+                return
+            if url in self.recheck:
+                self.recheck.discard(url)
+                interval = 0
+            self._schedule(url, time.monotonic() + interval)
+            self.condition.notify()
+
+    def _worker(self):
+        while not self.stop_event.is_set():
+            url = self._next_due()
+            if url is None:
+                break
+            try:
+                change = self.check(url)
+                if change:
+                    self.on_change(change)
+            except Exception as e:
+                logger.error(f"Price check error ({url}): {str(e)}")
+            finally:
+                self._reschedule(url)
+
+    def start(self):
+        self.stop_event.clear()
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=5)
+        self.threads = []
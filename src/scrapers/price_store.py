@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import threading
+import zlib
+from datetime import datetime
+
+from .checkpoint import atomic_write_csv, read_csv_rows
+
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['title', 'auction_url', 'woo_product_id', 'product_url',
+                 'current_price', 'last_price', 'last_check']
+
+
+def _to_float(value):
+    if value in (None, ''):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number
+
+
+class PriceStore:
+    """Monitored lot prices indexed by auction_url.
+
+    Updates go to an in-memory dict under a per-URL lock stripe and are queued;
+    a background flusher appends them to a JSONL change log and rewrites the
+    CSV snapshot every `snapshot_every` changes (or on close). On load the
+    snapshot is read and the change log replayed on top of it.
+    """
+
+    def __init__(self, csv_file='data/check/published_products.csv',
+                 log_file='data/state/price_changes.jsonl',
+                 flush_interval=5.0, snapshot_every=500, stripes=64):
+        self.csv_file = csv_file
+        self.log_file = log_file
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.pending_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending = []
+        self.changes_since_snapshot = 0
+        self.stop_event = threading.Event()
+        self.flusher = None
+
+        rows = read_csv_rows(csv_file)
+        self.columns = list(PRICE_COLUMNS)
+        if rows:
+            self.columns += [column for column in rows[0] if column not in self.columns]
+        self.rows = {}
+        for row in rows:
+            row['current_price'] = _to_float(row.get('current_price'))
+            row['last_price'] = _to_float(row.get('last_price'))
+            if row.get('auction_url'):
+                self.rows[row['auction_url']] = row
+        self._replay_log()
+        if not rows or self.changes_since_snapshot:
+            self.snapshot()
+
+    def _lock_for(self, url):
+        return self.locks[zlib.crc32(url.encode('utf-8')) % len(self.locks)]
+
+    def _replay_log(self):
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    continue
+                row = self.rows.get(change.get('url'))
+                if row is not None:
+                    row['last_price'] = change.get('old_price')
+                    row['current_price'] = change.get('price')
+                    row['last_check'] = change.get('checked')
+                    self.changes_since_snapshot += 1
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, url):
+        return url in self.rows
+
+    def urls(self):
+        return list(self.rows)
+
+    def get(self, url):
+        row = self.rows.get(url)
+        return dict(row) if row else None
+
+    def update(self, url, price):
+        """Record an observed price; returns (row copy, old price) or (None, None) for unknown URLs"""
+        row = self.rows.get(url)
+        if row is None:
+            return None, None
+        checked = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock_for(url):
+            old_price = row['current_price']
+            row['last_price'] = old_price
+            row['current_price'] = price
+            row['last_check'] = checked
+            snapshot = dict(row)
+        with self.pending_lock:
+            self.pending.append({'url': url, 'old_price': old_price, 'price': price, 'checked': checked})
+        return snapshot, old_price
+
+    def flush(self):
+        """Append queued changes to the log; snapshot the CSV once enough have piled up"""
+        with self.flush_lock:
+            with self.pending_lock:
+                pending, self.pending = self.pending, []
+            if pending:
+                os.makedirs(os.path.dirname(self.log_file) or '.', exist_ok=True)
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(change) + '\n' for change in pending)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.changes_since_snapshot += len(pending)
+            if self.changes_since_snapshot >= self.snapshot_every:
+                self._snapshot()
+
+    def snapshot(self):
+        with self.flush_lock:
+            self._snapshot()
+
+    def _snapshot(self):
+        rows = []
+        for url, row in self.rows.items():
+            with self._lock_for(url):
+                rows.append(dict(row))
+        atomic_write_csv(self.csv_file, self.columns, rows)
+        # Log entries are now part of the snapshot
+        if os.path.exists(self.log_file):
+            os.remove(self.log_file)
+        self.changes_since_snapshot = 0
+
+    def _run_flusher(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Price store flush error: {str(e)}")
+
+    def start(self):
+        """Start the background flusher"""
+        if self.flusher is None:
+            self.stop_event.clear()
+            self.flusher = threading.Thread(target=self._run_flusher, daemon=True)
+            self.flusher.start()
+        return self
+
+    def close(self):
+        """Stop the flusher and write a final snapshot"""
+        self.stop_event.set()
+        if self.flusher:
+            self.flusher.join(timeout=self.flush_interval + 5)
+            self.flusher = None
+        self.flush()
+        self.snapshot()
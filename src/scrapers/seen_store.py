@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+END_TIME_FORMAT = '%d %b %Y %H:%M'
+
+# Volatile or bookkeeping fields left out of the content hash
+HASH_EXCLUDED_FIELDS = ('url',)
+
+
+def parse_end_time(value):
+    """Parse 'Bidding ends:\\n17 Feb 2025 12:01 GMT' style values"""
+    if not value or not isinstance(value, str):
+        return None
+    match = re.search(r'(\d{1,2} \w{3} \d{4} \d{1,2}:\d{2})', value)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), END_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def content_hash(lot_data):
+    """Stable hash of a lot row"""
+    payload = {k: v for k, v in lot_data.items() if k not in HASH_EXCLUDED_FIELDS}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class SeenLotStore:
+    """SQLite store of every lot URL seen, keyed by URL"""
+
+    def __init__(self, db_path='data/state/lots.db', closing_window_hours=24, max_age_hours=None):
+        self.db_path = db_path
+        self.closing_window = timedelta(hours=closing_window_hours)
+        self.max_age = timedelta(hours=max_age_hours) if max_age_hours else None
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS lots (
+                    url TEXT PRIMARY KEY,
+                    title TEXT,
+                    image_url TEXT,
+                    first_seen TEXT,
+                    last_seen TEXT,
+                    last_scraped TEXT,
+                    content_hash TEXT,
+                    end_time TEXT,
+                    row_json TEXT
+                )
+            ''')
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM lots WHERE url = ?', (url,)).fetchone()
+        return dict(row) if row else None
+
+    def get_many(self, urls):
+        """Rows for the given URLs as {url: row}"""
+        rows = {}
+        urls = list(urls)
+        with self.lock:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for row in self.conn.execute(f'SELECT * FROM lots WHERE url IN ({placeholders})', chunk):
+                    rows[row['url']] = dict(row)
+        return rows
+
+    def mark_seen(self, products):
+        """Register listing products (title/url/image_url), keeping existing scrape data"""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock, self.conn:
+            self.conn.executemany('''
+                INSERT INTO lots (url, title, image_url, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    title = COALESCE(excluded.title, lots.title),
+                    image_url = COALESCE(excluded.image_url, lots.image_url)
+            ''', [(p['url'], p.get('title'), p.get('image_url'), now, now) for p in products])
+
+    def record(self, lot_data):
+        """Store a freshly scraped lot; returns True if its content changed"""
+        url = lot_data['url']
+        new_hash = content_hash(lot_data)
+        end_time = parse_end_time(lot_data.get('end_time'))
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT content_hash FROM lots WHERE url = ?', (url,)).fetchone()
+            self.conn.execute('''
+                INSERT INTO lots (url, title, first_seen, last_seen, last_scraped, content_hash, end_time, row_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    last_scraped = excluded.last_scraped,
+                    content_hash = excluded.content_hash,
+                    end_time = excluded.end_time,
+                    row_json = excluded.row_json
+            ''', (url, lot_data.get('name'), now, now, now, new_hash,
+                  end_time.isoformat() if end_time else None,
+                  json.dumps(lot_data, default=str)))
+        return row is None or row['content_hash'] != new_hash
+
+    def needs_scrape(self, row, now=None):
+        """New lots, lots without a known end time and lots close to closing"""
+        now = now or datetime.now()
+        if not row or not row.get('row_json') or not row.get('end_time'):
+            return True
+        end_time = datetime.fromisoformat(row['end_time'])
+        if end_time - now <= self.closing_window:
+            return True
+        if self.max_age and row.get('last_scraped'):
+            return now - datetime.fromisoformat(row['last_scraped']) >= self.max_age
+        return False
+
+    def is_ended(self, row, now=None):
+        now = now or datetime.now()
+        return bool(row and row.get('end_time') and datetime.fromisoformat(row['end_time']) <= now)
+
+    def plan(self, products, now=None):
+        """Split products into (to_scrape, carried_rows, ended_count)"""
+        now = now or datetime.now()
+        rows = self.get_many(p['url'] for p in products)
+        to_scrape, carried, ended = [], [], 0
+        for product in products:
+            row = rows.get(product['url'])
+            if self.is_ended(row, now):
+                ended += 1
+            elif self.needs_scrape(row, now):
+                to_scrape.append(product)
+            else:
+                carried.append(json.loads(row['row_json']))
+        logger.info(f"Incremental plan: {len(to_scrape)} to scrape, "
+                    f"{len(carried)} carried forward, {ended} ended")
+        return to_scrape, carried, ended
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,185 @@
+import json
+import re
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+
+import numpy as np
+
+LABELED_PAIRS_FILE = 'data/fixtures/title_pairs.json'
+
+# Tokens mixing letters and digits (P2424HEB, DHP484Z, GSR12V-15) identify a model
+MODEL_RE = re.compile(r'\b(?=[a-z0-9-]*\d)(?=[a-z0-9-]*[a-z])[a-z0-9]+(?:-[a-z0-9]+)*\b', re.IGNORECASE)
+# Unit-like tokens that look like model numbers but aren't (18v, 5ah, 24in, 2x, 1080p, 500ml, 5-in-1, 13th)
+UNIT_RE = re.compile(r'^(?:\d+(?:v|ah|mm|cm|in|w|kw|kg|x|pcs|pc|l|ml|m|gb|tb|hz|p|st|nd|rd|th)|\d+-?in-?\d+)$',
+                     re.IGNORECASE)
+TOKEN_RE = re.compile(r'[a-z0-9]+(?:[.-][a-z0-9]+)*')
+
+# Condition / listing noise that says nothing about which product it is
+STOPWORDS = {
+    'new', 'used', 'refurbished', 'untested', 'faulty', 'broken', 'spares', 'repairs', 'working',
+    'tested', 'boxed', 'box', 'open', 'sealed', 'genuine', 'original', 'brand', 'listing', 'the',
+    'and', 'for', 'with', 'a', 'an', 'of', 'in', 'x', 'uk', 'free', 'postage', 'fast', 'p', 'n',
+    'pn', 'only', 'good', 'condition', 'excellent', 'job', 'lot', 'rrp'
+}
+
+# Score = weighted n-gram cosine + token overlap + model-number agreement
+NGRAM_WEIGHT = 0.45
+TOKEN_WEIGHT = 0.25
+MODEL_WEIGHT = 0.30
+DEFAULT_THRESHOLD = 0.55
+
+
+def extract_model_numbers(text):
+    """Model-number-like tokens in text, normalized (upper case, no dashes)"""
+    models = []
+    for match in MODEL_RE.finditer(text or ''):
+        token = match.group(0)
+        if len(token) < 4 or UNIT_RE.match(token):
+            continue
+        model = token.replace('-', '').upper()
+        if model not in models:
+            models.append(model)
+    return models
+
+
+def tokenize(title):
+    """Lower-cased product tokens without condition noise"""
+    tokens = (token.replace('-', '') for token in TOKEN_RE.findall(str(title or '').lower()))
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def _ngrams(tokens, n=3):
+    grams = Counter()
+    for token in tokens:
+        padded = f" {token} "
+        if len(padded) <= n:
+            grams[padded] += 1
+            continue
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+class TitleMatcher:
+    """Scores listing titles against a product title in one vectorized batch"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, ngram=3):
+        self.threshold = threshold
+        self.ngram = ngram
+
+    def _model_scores(self, query_models, titles_models):
+        if not query_models:
+            return np.full(len(titles_models), 0.5)
+        scores = np.empty(len(titles_models))
+        for i, models in enumerate(titles_models):
+            if any(model in models for model in query_models):
+                scores[i] = 1.0
+            elif any(q in m or m in q for q in query_models for m in models if len(m) >= 5):
+                # DHP484 vs DHP484Z: same base model, different variant suffix
+                scores[i] = 0.8
+            else:
+                # Missing or a different model number
+                scores[i] = 0.0 if models else 0.3
+        return scores
+
+    def score(self, query, titles):
+        """Similarity of each title to query, as a numpy array in [0, 1]"""
+        titles = list(titles)
+        if not titles:
+            return np.zeros(0)
+        query_tokens = tokenize(query)
+        title_tokens = [tokenize(title) for title in titles]
+
+        # Character n-gram vectors over the batch vocabulary, IDF-weighted within the batch
+        query_grams = _ngrams(query_tokens, self.ngram)
+        title_grams = [_ngrams(tokens, self.ngram) for tokens in title_tokens]
+        vocabulary = {gram: i for i, gram in enumerate(set(query_grams).union(*title_grams))}
+        matrix = np.zeros((len(titles) + 1, len(vocabulary)))
+        for row, grams in enumerate([query_grams] + title_grams):
+            for gram, count in grams.items():
+                matrix[row, vocabulary[gram]] = count
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        matrix *= np.log((len(titles) + 2) / (document_frequency + 1)) + 1
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1
+        matrix /= norms[:, None]
+        ngram_scores = matrix[1:] @ matrix[0]
+
+        # Token overlap relative to the shorter title (lot titles carry long descriptions)
+        query_set = set(query_tokens)
+        token_scores = np.array([
+            len(query_set & set(tokens)) / max(min(len(query_set), len(set(tokens))), 1)
+            for tokens in title_tokens
+        ])
+
+        model_scores = self._model_scores(
+            extract_model_numbers(' '.join(query_tokens)),
+            [extract_model_numbers(' '.join(tokens)) for tokens in title_tokens]
+        )
+        return NGRAM_WEIGHT * ngram_scores + TOKEN_WEIGHT * token_scores + MODEL_WEIGHT * model_scores
+
+    def is_match(self, title, query):
+        return bool(self.score(query, [title])[0] > self.threshold)
+
+    def best(self, query, titles):
+        """(index, score) of the best title above the threshold, or (None, best score)"""
+        scores = self.score(query, titles)
+        if not len(scores):
+            return None, 0.0
+        index = int(np.argmax(scores))
+        if scores[index] > self.threshold:
+            return index, float(scores[index])
+        return None, float(scores[index])
+
+
+def load_labeled_pairs(path=LABELED_PAIRS_FILE):
+    """[(product title, listing title, is same product)]"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [(pair['query'], pair['listing'], pair['match']) for pair in json.load(f)]
+
+
+def _accuracy(predictions, labels):
+    return float(sum(p == l for p, l in zip(predictions, labels)) / max(len(labels), 1))
+
+
+def benchmark(path=LABELED_PAIRS_FILE, sequence_threshold=0.5, repeat=20):
+    """Accuracy and throughput of TitleMatcher vs the old SequenceMatcher ratio on labeled pairs"""
+    pairs = load_labeled_pairs(path)
+    labels = [label for _, _, label in pairs]
+    matcher = TitleMatcher()
+
+    by_query = {}
+    for i, (query, listing, _) in enumerate(pairs):
+        by_query.setdefault(query, []).append((i, listing))
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scores = [0.0] * len(pairs)
+        for query, items in by_query.items():
+            batch = matcher.score(query, [listing for _, listing in items])
+            for (i, _), value in zip(items, batch):
+                scores[i] = value
+    matcher_seconds = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ratios = [SequenceMatcher(None, listing.lower(), query.lower()).ratio() for query, listing, _ in pairs]
+    sequence_seconds = (time.perf_counter() - start) / repeat
+
+    return {
+        'pairs': len(pairs),
+        'title_matcher': {
+            'accuracy': _accuracy([s > matcher.threshold for s in scores], labels),
+            'pairs_per_second': len(pairs) / max(matcher_seconds, 1e-9)
+        },
+        'sequence_matcher': {
+            'accuracy': _accuracy([r > sequence_threshold for r in ratios], labels),
+            'pairs_per_second': len(pairs) / max(sequence_seconds, 1e-9)
+        }
+    }
+
+
+if __name__ == "__main__":
+    for name, result in benchmark().items():
+        print(f"{name}: {result}")
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CONFIG_DIR = Path(__file__).parent.parent.parent / 'config'
+# GetCategories dumps, newest naming first
+CATEGORY_CACHE_FILES = [CONFIG_DIR / 'categories_cache_uk.json', CONFIG_DIR / 'categories_cache.json']
+INDEX_FILE = CONFIG_DIR / 'categories_index.pkl'
+# Bump when the pickled layout changes
+INDEX_VERSION = 1
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = {'and', 'the', 'for', 'with', 'of', 'other', 'in', 'a', 'an', 'to', 'new', 'used'}
+LEAF_BONUS = 0.05
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased tokens, stopwords dropped, simple plural folding (laptops -> laptop)"""
+    tokens = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class CategoryIndex:
+    """eBay category tree with an inverted token index and precomputed full paths.
+
+    Built from the GetCategories dump ({id: {id, name, parent_id, level, is_leaf}}).
+    Title lookups only touch the posting lists of the title's tokens.
+    """
+
+    def __init__(self, categories: Dict[str, Dict[str, Any]]):
+        self.ids = list(categories)
+        self.position = {category_id: i for i, category_id in enumerate(self.ids)}
+        self.names = [categories[category_id].get('name') or '' for category_id in self.ids]
+        self.is_leaf = np.array([str(categories[category_id].get('is_leaf', '')).lower() == 'true'
+                                 for category_id in self.ids])
+
+        # Parent / child adjacency (roots are their own parent in GetCategories)
+        self.parent = np.full(len(self.ids), -1, dtype=np.int32)
+        self.children: Dict[int, List[int]] = {}
+        for i, category_id in enumerate(self.ids):
+            parent = self.position.get(categories[category_id].get('parent_id'))
+            if parent is not None and parent != i:
+                self.parent[i] = parent
+                self.children.setdefault(parent, []).append(i)
+        self.paths = [self._build_path(i) for i in range(len(self.ids))]
+
+        # Inverted index over category names
+        postings: Dict[str, List[int]] = {}
+        name_tokens = [set(tokenize(name)) for name in self.names]
+        for i, tokens in enumerate(name_tokens):
+            for token in tokens:
+                postings.setdefault(token, []).append(i)
+        self.postings = {token: np.array(items, dtype=np.int32) for token, items in postings.items()}
+        self.idf = {token: float(np.log((len(self.ids) + 1) / (len(items) + 1)) + 1)
+                    for token, items in postings.items()}
+        self.name_weight = np.array([sum(self.idf[token] for token in tokens) or 1.0 for tokens in name_tokens])
+
+    def _build_path(self, i: int) -> Tuple[int, ...]:
+        path = []
+        seen = set()
+        while i >= 0 and i not in seen:
+            seen.add(i)
+            path.append(i)
+            i = int(self.parent[i])
+        return tuple(reversed(path))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, category_id):
+        return str(category_id) in self.position
+
+    def get(self, category_id: str) -> Optional[Dict[str, Any]]:
+        i = self.position.get(str(category_id))
+        if i is None:
+            return None
+        parent = int(self.parent[i])
+        return {
+            'id': self.ids[i],
+            'name': self.names[i],
+            'parent_id': self.ids[parent] if parent >= 0 else None,
+            'is_leaf': bool(self.is_leaf[i]),
+            'path': self.path(self.ids[i])
+        }
+
+    def path(self, category_id: str) -> List[str]:
+        """Category names from the root down to category_id"""
+        i = self.position.get(str(category_id))
+        return [self.names[j] for j in self.paths[i]] if i is not None else []
+
+    def path_ids(self, category_id: str) -> List[str]:
+        i = self.position.get(str(category_id))
+        return [self.ids[j] for j in self.paths[i]] if i is not None else []
+
+    def child_ids(self, category_id: str) -> List[str]:
+        i = self.position.get(str(category_id))
+        return [self.ids[j] for j in self.children.get(i, [])] if i is not None else []
+
+    def search(self, title: str, limit: int = 5) -> List[Tuple[str, float, float]]:
+        """[(category id, score, share of title tokens matched)] best first"""
+        tokens = list(dict.fromkeys(tokenize(title)))
+        tokens_in_index = [token for token in tokens if token in self.postings]
+        if not tokens_in_index:
+            return []
+
+        candidates = np.unique(np.concatenate([self.postings[token] for token in tokens_in_index]))
+        matched_weight = np.zeros(len(candidates))
+        matched_count = np.zeros(len(candidates))
+        for token in tokens_in_index:
+            hits = np.searchsorted(candidates, self.postings[token])
+            matched_weight[hits] += self.idf[token]
+            matched_count[hits] += 1
+
+        # Matched IDF, plus how much of the category name it covers, plus a nudge towards leaves
+        coverage = matched_weight / self.name_weight[candidates]
+        scores = matched_weight * (0.5 + 0.5 * coverage) + LEAF_BONUS * self.is_leaf[candidates]
+        top = np.argsort(-scores, kind='stable')[:limit]
+        return [(self.ids[candidates[k]], float(scores[k]), float(matched_count[k] / len(tokens)))
+                for k in top]
+
+    def best_match(self, title: str) -> Optional[Dict[str, Any]]:
+        results = self.search(title, limit=1)
+        if not results:
+            return None
+        category_id, score, confidence = results[0]
+        return {
+            'category_id': category_id,
+            'category_name': self.names[self.position[category_id]],
+            'category_path': ' > '.join(self.path(category_id)),
+            'confidence': confidence
+        }
+
+
+def _source_file() -> Optional[Path]:
+    for path in CATEGORY_CACHE_FILES:
+        if path.exists():
+            return path
+    return None
+
+
+def _fingerprint(path: Path) -> Tuple[str, int, int]:
+    stat = os.stat(path)
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def load_index(source: Optional[Path] = None, index_file: Path = INDEX_FILE) -> Optional[CategoryIndex]:
+    """Index for the cached category dump: the pickled one if it matches the dump, else rebuilt and saved"""
+    source = source or _source_file()
+    if source is None:
+        return None
+    fingerprint = _fingerprint(source)
+
+    if index_file.exists():
+        try:
+            with open(index_file, 'rb') as f:
+                saved = pickle.load(f)
+            if saved.get('version') == INDEX_VERSION and saved.get('source') == fingerprint:
+                return saved['index']
+        except Exception as e:
+            logger.warning(f"Category index unreadable, rebuilding: {e}")
+
+    with open(source, 'r', encoding='utf-8') as f:
+        index = CategoryIndex(json.load(f))
+    try:
+        tmp_path = index_file.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': INDEX_VERSION, 'source': fingerprint, 'index': index}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_file)
+    except OSError as e:
+        logger.warning(f"Category index not saved: {e}")
+    logger.info(f"Category index built: {len(index)} categories from {source}")
+    return index
+
+
+_index: Optional[CategoryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_category_index(reload: bool = False) -> Optional[CategoryIndex]:
+    """Process-wide index, loaded on first use (None while no category dump exists)"""
+    global _index
+    with _index_lock:
+        if _index is None or reload:
+            _index = load_index()
+        return _index
@@ -2,6 +2,7 @@ import requests
 import base64
 from pathlib import Path
 from ..api.ebay_token_manager import token_manager
+from .category_index import CATEGORY_CACHE_FILES, get_category_index
 from typing import Optional, Dict, Any, List
 import urllib.parse
 from ebaysdk.finding import Connection as Finding
@@ -59,9 +60,14 @@ class EbayService:
             "X-EBAY-API-CERT-NAME": token_manager.client_secret
         }
 
-    def get_all_categories(self) -> Optional[Dict[str, Any]]:
-        """Get all eBay categories"""
+    def get_all_categories(self, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Get all eBay categories (from the local dump unless refresh, otherwise downloaded once and cached)"""
         try:
+            cache_path = CATEGORY_CACHE_FILES[0]
+            if not refresh and cache_path.exists():
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+
             # XML request body
             xml_request = """<?xml version="1.0" encoding="utf-8"?>
             <GetCategoriesRequest xmlns="urn:ebay:apis:eBLBaseComponents">    
@@ -115,7 +121,8 @@ class EbayService:
                     level = category.find("CategoryLevel")
                     leaf = category.find("LeafCategory")
                     
-                    if all([category_id, category_name]):
+                    # Element'ler alt düğümü olmadığında False döner; None ile kontrol et
+                    if category_id is not None and category_name is not None:
                         categories[category_id.text] = {
                             "id": category_id.text,
                             "name": category_name.text,
@@ -126,11 +133,12 @@ class EbayService:
                 
                 if categories:
                     # Save categories to file for caching
-                    cache_path = Path(__file__).parent.parent.parent / 'config' / 'categories_cache_uk.json'
-                    with open(cache_path, 'w') as f:
-                        import json
+                    cache_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(cache_path, 'w', encoding='utf-8') as f:
                         json.dump(categories, f, indent=2)
                     
+                    # İndeksi yeni ağaçla yeniden kur
+                    get_category_index(reload=True)
                     print(f"\nCached {len(categories)} UK categories")
                     return categories
                 else:
@@ -148,47 +156,21 @@ class EbayService:
             return None
 
     def find_category_by_name(self, title: str) -> Optional[Dict[str, Any]]:
-        """Find category by matching title with category names"""
+        """Find category by matching title with category names (shared in-memory category index)"""
         try:
-            # Try to load from cache first
-            cache_path = Path(__file__).parent.parent.parent / 'config' / 'categories_cache.json'
-            
-            if not cache_path.exists():
+            index = get_category_index()
+            if index is None:
                 print("Categories cache not found, fetching categories...")
-                categories = self.get_all_categories()
-            else:
-                print("Loading categories from cache...")
-                with open(cache_path) as f:
-                    import json
-                    categories = json.load(f)
+                self.get_all_categories(refresh=True)
+                index = get_category_index()
             
-            if not categories:
+            if not index:
                 print("No categories available")
                 return None
                 
-            # Clean and split the search title
-            search_terms = set(title.lower().split())
-            
-            best_match = None
-            best_score = 0
-            
-            # Search through categories
-            for cat_id, cat_data in categories.items():
-                cat_name = cat_data['name'].lower()
-                cat_terms = set(cat_name.split())
-                
-                # Calculate match score
-                matches = len(search_terms.intersection(cat_terms))
-                if matches > best_score:
-                    best_score = matches
-                    best_match = cat_data
-            
+            best_match = index.best_match(title)
             if best_match:
-                return {
-                    "category_id": best_match['id'],
-                    "category_name": best_match['name'],
-                    "confidence": best_score / len(search_terms)
-                }
+                return best_match
             
             # Fallback for laboratory equipment
             return {
@@ -341,6 +323,35 @@ class EbayService:
             print(f"Error extracting item ID: {str(e)}")
             return None
 
+    def fetch_category_names(self, category_id: str, index=None) -> List[str]:
+        """Category names from category_id up to the root via GetCategories (stops at the first indexed parent)"""
+        category_response = self.shopping_api.execute('GetCategories', {
+            'CategoryID': category_id,
+            'DetailLevel': 'ReturnAll',
+            'ViewAllNodes': 'true'
+        })
+        
+        categories = []
+        # Kategori yolunu oluştur
+        current_cat = category_response.dict()['Categories']['Category'][0]
+        while current_cat:
+            categories.append(current_cat['CategoryName'])
+            
+            # Üst kategoriye geç
+            parent_id = current_cat.get('CategoryParentID')
+            if not parent_id or parent_id == current_cat['CategoryID']:
+                break
+            if index and parent_id in index:
+                # Kalan yol indekste hazır
+                categories.extend(reversed(index.path(parent_id)))
+                break
+            parent_response = self.shopping_api.execute('GetCategories', {
+                'CategoryID': parent_id,
+                'DetailLevel': 'ReturnAll'
+            })
+            current_cat = parent_response.dict()['Categories']['Category'][0]
+        return categories
+
     def get_item_details(self, item_url: str) -> Optional[Dict]:
         """eBay ürün linkinden detaylı bilgileri al"""
         try:
@@ -354,12 +365,8 @@ class EbayService:
 
             print(f"Making API call for item ID: {item_id}")
             
-            # Önce kategori cache'ini kontrol et
-            cache_path = Path(__file__).parent.parent.parent / 'config' / 'categories_cache_uk.json'
-            categories_cache = {}
-            if cache_path.exists():
-                with open(cache_path, 'r') as f:
-                    categories_cache = json.load(f)
+            # Kategori yolu için yerel indeks
+            index = get_category_index()
 
             # Shopping API ile ürün detaylarını al
             response = self.shopping_api.execute('GetSingleItem', {
@@ -378,36 +385,11 @@ class EbayService:
 
             # Kategori detaylarını al
             try:
-                category_response = self.shopping_api.execute('GetCategories', {
-                    'CategoryID': primary_category_id,
-                    'DetailLevel': 'ReturnAll',
-                    'ViewAllNodes': 'true'
-                })
-                
-                category_info = category_response.dict()
-                categories = []
-                category_path = []
-
-                # Kategori yolunu oluştur
-                current_cat = category_info['Categories']['Category'][0]
-                while current_cat:
-                    categories.append(current_cat['CategoryName'])
-                    category_path.insert(0, current_cat['CategoryName'])
-                    
-                    # Üst kategoriye geç
-                    parent_id = current_cat.get('CategoryParentID')
-                    if parent_id and parent_id != current_cat['CategoryID']:
-                        # Cache'den veya API'den üst kategoriyi bul
-                        if parent_id in categories_cache:
-                            current_cat = categories_cache[parent_id]
-                        else:
-                            parent_response = self.shopping_api.execute('GetCategories', {
-                                'CategoryID': parent_id,
-                                'DetailLevel': 'ReturnAll'
-                            })
-                            current_cat = parent_response.dict()['Categories']['Category'][0]
-                    else:
-                        break
+                if index and primary_category_id in index:
+                    # Yol indekste hazır: API çağrısı gerekmez (yapraktan köke)
+                    categories = list(reversed(index.path(primary_category_id)))
+                else:
+                    categories = self.fetch_category_names(primary_category_id, index)
 
             except Exception as e:
                 print(f"Error getting category details: {str(e)}")
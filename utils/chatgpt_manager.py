@@ -1,157 +1,369 @@
 import openai
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import json
 import hashlib
 import os
-from datetime import datetime, timedelta
-import sqlite3
+import re
+import time
+
+from utils.llm_cache import get_response_cache
+from utils.shipping_estimator import ShippingEstimator, finish_estimate, known_answers, load_category_index
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+# Budget of one bulk run; keep below the account's rate limits
+DEFAULT_RPM = 500
+DEFAULT_TPM = 200000
+
+SYSTEM_PROMPT = "You are a precise technical writer. Respond only with the requested information, no explanations."
+
+# One request returns every field the eBay and website listings need
+LISTING_PROMPT = """Product title: {title}
+
+Return a JSON object with exactly these keys:
+- "technical_description": a 30-word technical sales description
+- "brand": only the brand name
+- "model_number": only the model/part number
+- "item_type": the item type category
+- "specifications": technical specifications as bullet points in one string
+- "metadata": an object with keys "category", "make" and "model"
+Use "" for anything that can't be determined from the title."""
+LISTING_FIELDS = ['technical_description', 'brand', 'model_number', 'item_type', 'specifications']
+METADATA_FIELDS = ['category', 'make', 'model']
+LISTING_MAX_TOKENS = 400
+LISTING_QUERY_TYPE = 'listing_content'
+# Before the single JSON request, eBay and website fields were cached separately under these types
+LEGACY_LISTING_TYPES = ('ebay_listing', 'website_listing')
+
+
+def empty_listing() -> Dict:
+    return {**{field: '' for field in LISTING_FIELDS}, 'metadata': {field: '' for field in METADATA_FIELDS}}
+
+
+def parse_listing(content: str) -> Optional[Dict]:
+    """Listing dict from a model response, None unless it is a JSON object"""
+    # Some models wrap JSON in ```json fences even in JSON mode
+    content = re.sub(r'^```(?:json)?\s*|\s*```$', '', (content or '').strip())
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    listing = empty_listing()
+    for field in LISTING_FIELDS:
+        value = data.get(field)
+        if isinstance(value, list):
+            value = '\n'.join(f"- {item}" for item in value)
+        listing[field] = str(value).strip() if value is not None else ''
+    metadata = data.get('metadata') if isinstance(data.get('metadata'), dict) else {}
+    for field in METADATA_FIELDS:
+        value = metadata.get(field)
+        listing['metadata'][field] = str(value).strip() if value is not None else ''
+    return listing
+
+
+def estimate_tokens(text: str, max_tokens: int) -> int:
+    """Upper bound of a request's token use: ~4 characters per prompt token plus the completion limit"""
+    return len(text) // 4 + max_tokens
+
+
+class RateBudget:
+    """Async requests-per-minute and tokens-per-minute budget.
+
+    Two buckets refilled continuously; a request waits until both can cover it.
+    Token use is reserved from an estimate up front and settled with the actual usage.
+    """
+
+    def __init__(self, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM):
+        self.rpm = float(rpm)
+        self.tpm = float(tpm)
+        self.requests = self.rpm
+        self.tokens = self.tpm
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed_minutes = (now - self.updated) / 60
+        self.requests = min(self.rpm, self.requests + elapsed_minutes * self.rpm)
+        self.tokens = min(self.tpm, self.tokens + elapsed_minutes * self.tpm)
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        """Wait until one request and `tokens` tokens are available and reserve them"""
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.requests >= 1 and self.tokens >= tokens:
+                    self.requests -= 1
+                    self.tokens -= tokens
+                    return
+                wait = max((1 - self.requests) / self.rpm, (tokens - self.tokens) / self.tpm) * 60
+                await asyncio.sleep(max(wait, 0.01))
+
+    def settle(self, reserved: int, used: int):
+        """Give back (or charge) the difference between the reservation and the reported usage"""
+        self._refill()
+        self.tokens = max(min(self.tpm, self.tokens + reserved - used), -self.tpm)
 
 class ChatGPTManager:
-    def __init__(self, api_key: str, cache_db: str = 'cache/chatgpt_cache.db'):
+    def __init__(self, api_key: str, cache_db: str = 'cache/chatgpt_cache.db', base_url: str = None,
+                 model: str = DEFAULT_MODEL, rpm: float = DEFAULT_RPM, tpm: float = DEFAULT_TPM):
         self.api_key = api_key
-        openai.api_key = api_key
+        # base_url lets tests point the manager at a local chat-completions mock
+        self.base_url = base_url
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self._client = None
+        self._shipping = None
         self.cache_db = cache_db
-        self.setup_cache_db()
-        
-    def setup_cache_db(self):
-        """Initialize SQLite cache database"""
-        os.makedirs(os.path.dirname(self.cache_db), exist_ok=True)
-        with sqlite3.connect(self.cache_db) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS response_cache (
-                    query_hash TEXT PRIMARY KEY,
-                    response TEXT,
-                    timestamp DATETIME,
-                    query_type TEXT
-                )
-            ''')
+        # Memory tier in front of one shared SQLite connection per cache file
+        self.cache = get_response_cache(cache_db)
 
+    @property
+    def client(self) -> openai.OpenAI:
+        if self._client is None:
+            self._client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
+        return self._client
+        
     def get_cache_key(self, query: str, query_type: str) -> str:
         """Generate unique cache key for a query"""
         return hashlib.md5(f"{query_type}:{query}".encode()).hexdigest()
 
-    def get_cached_response(self, query: str, query_type: str) -> str:
-        """Get cached response if exists and not expired"""
-        cache_key = self.get_cache_key(query, query_type)
-        with sqlite3.connect(self.cache_db) as conn:
-            cursor = conn.execute(
-                'SELECT response, timestamp FROM response_cache WHERE query_hash = ?', 
-                (cache_key,)
-            )
-            result = cursor.fetchone()
-            
-            if result:
-                response, timestamp = result
-                cache_date = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-                if datetime.now() - cache_date < timedelta(days=30):
-                    return response
-        return None
+    def get_cached_response(self, query: str, query_type: str, count: bool = True) -> str:
+        """Get cached response if exists and not expired (count=False: leave the hit/miss stats alone)"""
+        return self.cache.get(self.get_cache_key(query, query_type), count)
 
     def cache_response(self, query: str, query_type: str, response: str):
         """Cache the response"""
-        cache_key = self.get_cache_key(query, query_type)
-        with sqlite3.connect(self.cache_db) as conn:
-            conn.execute(
-                'INSERT OR REPLACE INTO response_cache (query_hash, response, timestamp, query_type) VALUES (?, ?, ?, ?)',
-                (cache_key, response, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), query_type)
-            )
+        self.cache.put(self.get_cache_key(query, query_type), query_type, response)
 
-    def get_ebay_listing_content(self, title: str, description: str = None) -> Dict:
-        """Get all required content for eBay listing"""
-        query_type = 'ebay_listing'
+    def prefetch(self, queries: List[str], query_type: str) -> int:
+        """Load cached responses for many queries into memory with one lookup"""
+        return self.cache.prefetch([self.get_cache_key(query, query_type) for query in queries])
+
+    def cache_stats(self) -> Dict:
+        return self.cache.get_stats()
+
+    def _legacy_listing(self, title: str) -> Optional[Dict]:
+        """Listing merged from the old ebay_listing + website_listing answers; re-cached as listing_content"""
+        # Probes only: the listing_content lookup already counted this title's hit or miss
+        parts = [self.get_cached_response(title, query_type, count=False) for query_type in LEGACY_LISTING_TYPES]
+        if not all(parts):
+            return None
+        try:
+            merged = {**json.loads(parts[0]), **json.loads(parts[1])}
+        except ValueError:
+            return None
+        listing = parse_listing(json.dumps(merged))
+        if listing is not None:
+            self.cache_response(title, LISTING_QUERY_TYPE, json.dumps(listing))
+        return listing
+
+    def get_listing_content(self, title: str) -> Dict:
+        """All listing fields for a title from a single JSON-mode request"""
+        query_type = LISTING_QUERY_TYPE
         cached = self.get_cached_response(title, query_type)
         if cached:
             return json.loads(cached)
+        listing = self._legacy_listing(title)
+        if listing is not None:
+            return listing
 
-        prompts = [
-            f"Write a 30-word technical sales description for: {title}",
-            f"Extract only the brand name for: {title}",
-            f"Extract only the model/part number for: {title}",
-            f"What is the item type category for: {title}"
-        ]
-
-        responses = []
-        for prompt in prompts:
-            responses.append(self._make_api_call(prompt))
-
-        result = {
-            'technical_description': responses[0],
-            'brand': responses[1],
-            'model_number': responses[2],
-            'item_type': responses[3]
-        }
+        listing = parse_listing(self._make_api_call(
+            LISTING_PROMPT.format(title=title), max_tokens=LISTING_MAX_TOKENS, json_mode=True))
+        if listing is None:
+            return empty_listing()
 
-        self.cache_response(title, query_type, json.dumps(result))
-        return result
+        self.cache_response(title, query_type, json.dumps(listing))
+        return listing
+
+    def get_ebay_listing_content(self, title: str, description: str = None) -> Dict:
+        """Get all required content for eBay listing"""
+        listing = self.get_listing_content(title)
+        return {field: listing[field] for field in ['technical_description', 'brand', 'model_number', 'item_type']}
 
     def get_website_listing_content(self, title: str) -> Dict:
         """Get content for website listing"""
-        query_type = 'website_listing'
-        cached = self.get_cached_response(title, query_type)
-        if cached:
-            return json.loads(cached)
+        listing = self.get_listing_content(title)
+        return {'specifications': listing['specifications'], 'metadata': listing['metadata']}
 
-        prompts = [
-            f"Provide technical specifications in bullet points for: {title}",
-            f"Extract category, make, and model for: {title} in JSON format"
-        ]
+    async def get_listing_contents_async(self, titles: List[str], concurrency: int = 8) -> Dict[str, Dict]:
+        """{title: listing} for many titles, requested concurrently within the rpm/tpm budget"""
+        query_type = LISTING_QUERY_TYPE
+        results = {}
+        pending = []
+        titles = list(dict.fromkeys(titles))
+        self.prefetch(titles, query_type)
+        for title in titles:
+            cached = self.get_cached_response(title, query_type)
+            if cached:
+                results[title] = json.loads(cached)
+            else:
+                pending.append(title)
+        if pending:
+            for legacy_type in LEGACY_LISTING_TYPES:
+                self.prefetch(pending, legacy_type)
+            for title in list(pending):
+                listing = self._legacy_listing(title)
+                if listing is not None:
+                    results[title] = listing
+                    pending.remove(title)
+        if not pending:
+            return results
 
-        responses = []
-        for prompt in prompts:
-            responses.append(self._make_api_call(prompt))
+        budget = RateBudget(self.rpm, self.tpm)
+        semaphore = asyncio.Semaphore(concurrency)
 
-        result = {
-            'specifications': responses[0],
-            'metadata': json.loads(responses[1])
-        }
+        async def enrich(client, title):
+            async with semaphore:
+                content = await self._make_api_call_async(
+                    client, budget, LISTING_PROMPT.format(title=title), max_tokens=LISTING_MAX_TOKENS, json_mode=True)
+            listing = parse_listing(content)
+            if listing is None:
+                return title, empty_listing()
+            self.cache_response(title, query_type, json.dumps(listing))
+            return title, listing
 
-        self.cache_response(title, query_type, json.dumps(result))
-        return result
+        async with openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url) as client:
+            for title, listing in await asyncio.gather(*(enrich(client, title) for title in pending)):
+                results[title] = listing
+        self.cache.flush()
+        return results
 
-    def get_shipping_info(self, title: str) -> Dict:
-        """Get size and weight estimation"""
+    def get_listing_contents(self, titles: List[str], concurrency: int = 8) -> Dict[str, Dict]:
+        return asyncio.run(self.get_listing_contents_async(titles, concurrency))
+
+    @property
+    def shipping(self) -> ShippingEstimator:
+        """Local estimator, seeded with the LLM shipping answers already cached"""
+        if self._shipping is None:
+            self._shipping = ShippingEstimator(known_answers(self.cache.responses('shipping_info')),
+                                               category_index=load_category_index())
+        return self._shipping
+
+    def get_shipping_info(self, title: str, use_estimator: bool = True) -> Dict:
+        """Get size and weight estimation; the LLM is only asked when the local estimate isn't confident"""
         query_type = 'shipping_info'
         cached = self.get_cached_response(title, query_type)
         if cached:
+            if use_estimator:
+                self.shipping.record('cached')
             return json.loads(cached)
 
+        if use_estimator:
+            estimate = self.shipping.estimate(title)
+            if self.shipping.is_confident(estimate):
+                self.shipping.record(estimate['source'])
+                return estimate
+
         prompt = f"Estimate dimensions (cm) and weight (kg) for: {title}. Format: JSON with keys: length, width, height, weight"
-        response = self._make_api_call(prompt)
-        
+        response = self._make_api_call(prompt, json_mode=True)
+        if use_estimator:
+            self.shipping.record('llm')
+
         try:
-            shipping_info = json.loads(response)
+            size = json.loads(response)
             # Add 5kg to weight as per specification
-            shipping_info['weight'] += 5
-            
-            # Determine shipping category
-            if (shipping_info['weight'] <= 15 and 
-                max(shipping_info['length'], shipping_info['width'], shipping_info['height']) <= 120):
-                category = 'small'
-            elif shipping_info['weight'] <= 30:
-                category = 'medium'
-            else:
-                category = 'large'
-                
-            shipping_info['category'] = category
-            
+            shipping_info = finish_estimate(*(float(size[key]) for key in ('length', 'width', 'height', 'weight')),
+                                            title=title, source='llm')
             self.cache_response(title, query_type, json.dumps(shipping_info))
+            if use_estimator:
+                self.shipping.learn(title, shipping_info)
             return shipping_info
-        except:
+        except (ValueError, KeyError, TypeError):
             return {'error': 'Could not parse shipping information'}
 
-    def _make_api_call(self, prompt: str) -> str:
+    def shipping_report(self) -> Dict:
+        return self.shipping.report()
+
+    def _request(self, prompt: str, max_tokens: int, json_mode: bool) -> Dict:
+        request = {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': max_tokens,
+            'temperature': 0.3
+        }
+        if json_mode:
+            request['response_format'] = {"type": "json_object"}
+        return request
+
+    def _make_api_call(self, prompt: str, max_tokens: int = 100, json_mode: bool = False) -> str:
         """Make API call to ChatGPT with minimal tokens"""
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a precise technical writer. Respond only with the requested information, no explanations."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.3
-            )
+            response = self.client.chat.completions.create(**self._request(prompt, max_tokens, json_mode))
             return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"ChatGPT API Error: {str(e)}")
-            return "" 
\ No newline at end of file
+            return ""
+
+    async def _make_api_call_async(self, client: openai.AsyncOpenAI, budget: RateBudget, prompt: str,
+                                   max_tokens: int = 100, json_mode: bool = False) -> str:
+        reserved = estimate_tokens(SYSTEM_PROMPT + prompt, max_tokens)
+        await budget.acquire(reserved)
+        try:
+            response = await client.chat.completions.create(**self._request(prompt, max_tokens, json_mode))
+        except Exception as e:
+            print(f"ChatGPT API Error: {str(e)}")
+            return ""
+        if response.usage:
+            budget.settle(reserved, response.usage.total_tokens)
+        return (response.choices[0].message.content or '').strip()
+
+
+def fixture_listing(prompt: str) -> str:
+    """Mock model reply for a listing prompt: a JSON listing derived from the title"""
+    title = prompt.split('\n')[0].replace('Product title:', '').strip()
+    words = title.split()
+    return json.dumps({
+        'technical_description': f"{title} in working condition.",
+        'brand': words[0] if words else '',
+        'model_number': words[-1] if len(words) > 1 else '',
+        'item_type': 'Fixture',
+        'specifications': [f"Title: {title}"],
+        'metadata': {'category': 'Fixture', 'make': words[0] if words else '', 'model': ''}
+    })
+
+
+def benchmark(titles: int = 100, latency: float = 0.05, concurrency: int = 8) -> Dict:
+    """Listing requests against a local chat-completions mock: sequential vs concurrent, then cached"""
+    import tempfile
+    from src.scrapers.fixture_server import FixtureServer, chat_completions_handler
+
+    names = [f"Fixture Brand Product {i} MODEL{i}" for i in range(titles)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, \
+            FixtureServer(None, latency=latency, post_handler=chat_completions_handler(fixture_listing)) as server:
+        def manager(name):
+            return ChatGPTManager('fixture-key', cache_db=os.path.join(directory, f"{name}.db"),
+                                  base_url=f"{server.base_url}/v1")
+
+        sequential = manager('sequential')
+        start = time.perf_counter()
+        listings = [sequential.get_listing_content(name) for name in names]
+        results['sequential'] = {'seconds': time.perf_counter() - start,
+                                 'parsed': sum(bool(listing['brand']) for listing in listings)}
+
+        concurrent = manager('concurrent')
+        for label in ('concurrent', 'cached'):
+            before = server.request_count
+            start = time.perf_counter()
+            listings = concurrent.get_listing_contents(names, concurrency)
+            results[label] = {'seconds': time.perf_counter() - start, 'requests': server.request_count - before,
+                              'parsed': sum(bool(listing['brand']) for listing in listings.values())}
+        results['cache'] = concurrent.cache_stats()
+        for cached in (sequential, concurrent):
+            cached.cache.close()
+    return results
+
+
+if __name__ == "__main__":
+    for label, result in benchmark().items():
+        print(f"{label}: {result}")
\ No newline at end of file
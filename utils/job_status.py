@@ -0,0 +1,52 @@
+import streamlit as st
+
+from src.scrapers.jobs import ACTIVE, CANCELLED, DONE, FAILED, JobRunner
+
+
+@st.cache_resource
+def get_job_runner():
+    """One JobRunner (and job table connection) per Streamlit server"""
+    return JobRunner()
+
+
+@st.fragment(run_every=2)
+def show_job_controls(kind, label, help=None):
+    """Start button and live progress of the latest `kind` job.
+
+    Only this fragment reruns while the job is watched; the whole page reruns
+    once when a job this session saw running finishes, so it picks up the new data.
+    """
+    runner = get_job_runner()
+    job = runner.latest(kind)
+    active = bool(job and job['status'] in ACTIVE)
+
+    if st.button(label, type="primary", help=help, disabled=active, key=f"job_start_{kind}"):
+        # Başka bir dashboard aynı işi başlattıysa onun id'si döner
+        runner.submit(kind)
+        job = runner.latest(kind)
+        active = True
+
+    watched_key = f"job_watched_{kind}"
+    if not job:
+        return None
+
+    if active:
+        st.session_state[watched_key] = job['id']
+        st.progress(min(job['progress'] or 0.0, 1.0), text=job['message'] or job['status'])
+        if job['cancel_requested']:
+            st.caption("Cancelling...")
+        elif st.button("Cancel", key=f"job_cancel_{kind}"):
+            runner.cancel(job['id'])
+        return job
+
+    if job['status'] == DONE:
+        st.success(f"✅ Last run completed at {job['finished_at'][:19].replace('T', ' ')}")
+    elif job['status'] == FAILED:
+        st.error(f"❌ Last run failed: {job['error']}")
+    elif job['status'] == CANCELLED:
+        st.warning("⚠️ Last run was cancelled")
+
+    if st.session_state.get(watched_key) == job['id']:
+        del st.session_state[watched_key]
+        st.rerun(scope="app")
+    return job
@@ -0,0 +1,219 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Two-tier cache of LLM responses: an in-process LRU in front of one shared SQLite (WAL) connection.
+
+    Entries older than `ttl_days` are ignored. Writes are queued and stored in
+    batches of `write_batch`; flush() (also run at exit) stores the rest. The
+    memory tier keeps `memory_entries` responses, the table `max_entries` rows,
+    evicting the least recently used.
+    """
+
+    def __init__(self, db_path='cache/chatgpt_cache.db', ttl_days=30, memory_entries=10000,
+                 max_entries=200000, write_batch=50):
+        self.db_path = db_path
+        self.ttl = ttl_days * 86400
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.write_batch = write_batch
+        self.lock = threading.RLock()
+        self.memory = OrderedDict()
+        self.pending = {}
+        # Memory hits since the last flush: their accessed_at is stored in batches
+        self.touched = {}
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = self._connect()
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    query_type TEXT,
+                    response TEXT,
+                    created_at REAL,
+                    accessed_at REAL
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+            self._import_legacy()
+        atexit.register(self.close)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _db(self):
+        """Open connection; reopened if close() already ran (e.g. at exit while a thread still works)"""
+        if self.conn is None:
+            self.conn = self._connect()
+        return self.conn
+
+    def _import_legacy(self):
+        """Carry over rows of the old per-call `response_cache` table once (timestamps were local time)"""
+        legacy = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'response_cache'").fetchone()
+        if not legacy or self.conn.execute('SELECT 1 FROM responses LIMIT 1').fetchone():
+            return
+        self.conn.execute('''
+            INSERT OR IGNORE INTO responses
+            SELECT query_hash, query_type, response,
+                   CAST(strftime('%s', timestamp, 'utc') AS REAL), CAST(strftime('%s', timestamp, 'utc') AS REAL)
+            FROM response_cache
+        ''')
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _load(self, keys, now):
+        """{key: (response, created_at)} of fresh rows; touches them for LRU"""
+        found = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._db().execute(
+                f'SELECT key, response, created_at FROM responses WHERE key IN ({placeholders}) AND created_at >= ?',
+                (*chunk, now - self.ttl))
+            for key, response, created_at in rows:
+                found[key] = (response, created_at)
+        if found:
+            with self.conn:
+                self.conn.executemany('UPDATE responses SET accessed_at = ? WHERE key = ?',
+                                      [(now, key) for key in found])
+        return found
+
+    def get_many(self, keys, count=True):
+        """{key: response} for cached keys, memory first (count=False: probe without touching the hit/miss stats)"""
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        found = {}
+        with self.lock:
+            missing = []
+            for key in keys:
+                entry = self.memory.get(key)
+                if entry is None and key in self.pending:
+                    # Fell out of memory before its batch was written
+                    entry = self.pending[key][1:]
+                if entry and entry[1] >= now - self.ttl:
+                    self._remember(key, entry)
+                    found[key] = entry[0]
+                    self.touched[key] = now
+                    if count:
+                        self.stats['memory_hits'] += 1
+                else:
+                    missing.append(key)
+            if missing:
+                loaded = self._load(missing, now)
+                for key, entry in loaded.items():
+                    self._remember(key, entry)
+                    found[key] = entry[0]
+                if count:
+                    self.stats['disk_hits'] += len(loaded)
+                    self.stats['misses'] += len(missing) - len(loaded)
+            if len(self.touched) >= self.write_batch:
+                self.flush()
+        return found
+
+    def get(self, key, count=True):
+        return self.get_many([key], count).get(key)
+
+    def prefetch(self, keys):
+        """Load the stored entries for keys into memory in one query; returns how many keys are cached"""
+        now = time.time()
+        keys = list(dict.fromkeys(keys))
+        with self.lock:
+            missing = [key for key in keys if key not in self.memory]
+            loaded = self._load(missing, now) if missing else {}
+            for key, entry in loaded.items():
+                self._remember(key, entry)
+        return len(keys) - len(missing) + len(loaded)
+
+    def responses(self, query_type):
+        """Every fresh stored (and queued) response of a query type"""
+        with self.lock:
+            self.flush()
+            rows = self._db().execute('SELECT response FROM responses WHERE query_type = ? AND created_at >= ?',
+                                     (query_type, time.time() - self.ttl))
+            return [response for response, in rows]
+
+    def put(self, key, query_type, response):
+        entry = (response, time.time())
+        with self.lock:
+            self._remember(key, entry)
+            self.pending[key] = (query_type, *entry)
+            if len(self.pending) >= self.write_batch:
+                self.flush()
+
+    def flush(self):
+        """Store queued writes and memory-hit access times, evict past max_entries"""
+        with self.lock:
+            if not self.pending and not self.touched:
+                return
+            rows = [(key, query_type, response, created_at, self.touched.get(key, created_at))
+                    for key, (query_type, response, created_at) in self.pending.items()]
+            # Without this the hottest entries (served from memory) look oldest to _evict
+            touched = [(accessed_at, key) for key, accessed_at in self.touched.items() if key not in self.pending]
+            conn = self._db()
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)', rows)
+                conn.executemany('UPDATE responses SET accessed_at = ? WHERE key = ?', touched)
+                self._evict()
+            self.stats['writes'] += len(rows)
+            self.pending.clear()
+            self.touched.clear()
+
+    def _evict(self):
+        count = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute('''
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?
+                )
+            ''', (count - self.max_entries,))
+            self.stats['evictions'] += count - self.max_entries
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.stats['memory_hits'] + self.stats['disk_hits'] + self.stats['misses']
+            hits = self.stats['memory_hits'] + self.stats['disk_hits']
+            return {**self.stats, 'memory_entries': len(self.memory), 'pending_writes': len(self.pending),
+                    'hit_rate': hits / lookups if lookups else 0.0}
+
+    def close(self):
+        with self.lock:
+            if self.conn is None:
+                return
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache flush failed: {e}")
+            self.conn.close()
+            self.conn = None
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(db_path='cache/chatgpt_cache.db', **options):
+    """One ResponseCache (and connection) per database file in this process"""
+    path = os.path.abspath(db_path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None or cache.conn is None:
+            cache = _caches[path] = ResponseCache(db_path, **options)
+        return cache
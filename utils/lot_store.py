@@ -0,0 +1,272 @@
+import ast
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from src.scrapers.checkpoint import open_committed
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = 'data/store'
+# Bump when build_lots_frame's output changes so old stores are rebuilt
+STORE_VERSION = 1
+META_KEY = b'source'
+ROW_HASH = 'row_hash'
+
+# Store name -> CSV the scrapers write
+SOURCES = {
+    'lots': 'data/output/lots_details.csv',
+    'lots_with_ebay': 'data/output/lots_details_with_ebay.csv',
+}
+# Written by the catalog enricher rather than parsed from a CSV; one row per lot name
+ENRICHMENT_STORE = 'enrichment'
+ENRICHMENT_KEY = 'name'
+ENRICHMENT_COLUMNS = ['technical_description', 'specifications', 'model_number', 'brand']
+
+# Bid columns keep their display text ('No Bid', 'Unknown'); the number goes to <column>_value
+BID_COLUMNS = ['current_bid', 'opening_bid', 'buy_it_now']
+# Pure price / percentage columns are replaced by floats
+PRICE_COLUMNS = ['ebay_lowest_price', 'suggested_price', 'current_price']
+PERCENT_COLUMNS = ['commission', 'vat_rate']
+FLAG_COLUMNS = ['has_buy_it_now', 'has_estimate', 'has_current_bid', 'has_opening_bid']
+LIST_COLUMNS = ['images', 'all_prices']
+
+END_TIME_FORMAT = '%d %b %Y %H:%M GMT'
+NUMBER_NOISE = ['£', 'GBP', ',', '%']
+
+
+def parse_float(text):
+    """float() of each string, NaN where it doesn't parse.
+
+    to_numeric only finds the valid entries; the numbers themselves come from
+    float(), since pandas' own parser is not always correctly rounded.
+    """
+    valid = pd.to_numeric(text, errors='coerce').notna()
+    values = pd.Series(np.nan, index=text.index)
+    values[valid] = text[valid].to_numpy(dtype=object).astype(float)
+    return values
+
+
+def parse_number(series):
+    """'£1,200.50' / '25.00%' / 'No Bid' column -> float column"""
+    text = series.astype(str)
+    for noise in NUMBER_NOISE:
+        text = text.str.replace(noise, '')
+    return parse_float(text.str.strip().where(series.notna()))
+
+
+def parse_list(value):
+    """"['a', 'b']" -> ['a', 'b']; anything else -> []"""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str) or not value.startswith('['):
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return [str(item) for item in parsed] if isinstance(parsed, (list, tuple)) else []
+
+
+def parse_end_time(series):
+    """'Bidding ends:\\n17 Feb 2025 12:01 GMT' -> Timestamp (NaT when unknown)"""
+    text = series.astype(str).str.replace('Bidding ends:', '').str.strip()
+    return pd.to_datetime(text, format=END_TIME_FORMAT, errors='coerce')
+
+
+def build_lots_frame(raw):
+    """Typed frame from a raw (all-string) lots CSV frame"""
+    df = raw.copy()
+    for column in BID_COLUMNS:
+        if column in df.columns:
+            df[f'{column}_value'] = parse_number(df[column])
+    if 'estimate_bid' in df.columns:
+        bounds = df['estimate_bid'].astype(str).str.split('-', n=1, expand=True).reindex(columns=[0, 1])
+        df['estimate_low'] = parse_number(bounds[0].where(df['estimate_bid'].notna()))
+        df['estimate_high'] = parse_number(bounds[1])
+    for column in PRICE_COLUMNS + PERCENT_COLUMNS:
+        if column in df.columns:
+            df[column] = parse_number(df[column])
+    for column in FLAG_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(str).str.strip().str.lower().eq('true')
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(parse_list).astype(object)
+    if 'end_time' in df.columns:
+        df['ends_at'] = parse_end_time(df['end_time'])
+    if 'time_remaining' in df.columns:
+        df['ends_at'] = df['ends_at'].fillna(parse_end_time(df['time_remaining'])) \
+            if 'ends_at' in df.columns else parse_end_time(df['time_remaining'])
+    if 'last_update' in df.columns:
+        df['last_update'] = pd.to_datetime(df['last_update'], errors='coerce')
+    return df
+
+
+def store_path(name, directory=STORE_DIR):
+    return os.path.join(directory, f'{name}.arrow')
+
+
+def source_fingerprint(*paths):
+    """((path, mtime_ns, size), ...) - a stat-only cache key that changes whenever a file is rewritten"""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+
+def content_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_meta(path, sha1=None):
+    (_, mtime_ns, size), = source_fingerprint(path)
+    return {'version': STORE_VERSION, 'mtime_ns': mtime_ns, 'size': size, 'sha1': sha1 or content_hash(path)}
+
+
+def read_store(name, directory=STORE_DIR):
+    """(memory-mapped table, source metadata) of the existing store, or (None, {})"""
+    path = store_path(name, directory)
+    if not os.path.exists(path):
+        return None, {}
+    try:
+        table = feather.read_table(path, memory_map=True)
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Lot store unreadable ({path}): {e}")
+        return None, {}
+    meta = json.loads((table.schema.metadata or {}).get(META_KEY, b'{}'))
+    if meta.get('version') != STORE_VERSION:
+        return None, {}
+    return table, meta
+
+
+def _to_frame(table):
+    df = table.to_pandas()
+    for column in LIST_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].map(lambda values: [] if values is None else list(values))
+    return df
+
+
+def _write_table(name, df, meta, directory):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), META_KEY: json.dumps(meta)})
+
+    path = store_path(name, directory)
+    os.makedirs(directory, exist_ok=True)
+    # Unique temp name: two writers of the same store must not share one file
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        # Uncompressed so readers can memory-map it
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_frame(name, directory=STORE_DIR):
+    """Frame of a store written with write_frame, or None"""
+    table, _ = read_store(name, directory)
+    return _to_frame(table) if table is not None else None
+
+
+def write_frame(name, df, directory=STORE_DIR):
+    _write_table(name, df.reset_index(drop=True), {'version': STORE_VERSION}, directory)
+
+
+def with_enrichment(lots_df, directory=STORE_DIR):
+    """lots_df with the enriched columns joined on the lot name ('' where not enriched yet)"""
+    stored = read_frame(ENRICHMENT_STORE, directory)
+    lots_df = lots_df.drop(columns=[column for column in ENRICHMENT_COLUMNS if column in lots_df.columns])
+    if stored is None or ENRICHMENT_KEY not in stored.columns or ENRICHMENT_KEY not in lots_df.columns:
+        return lots_df.assign(**{column: '' for column in ENRICHMENT_COLUMNS})
+    enriched = stored.drop_duplicates(ENRICHMENT_KEY, keep='last').set_index(ENRICHMENT_KEY)[ENRICHMENT_COLUMNS]
+    joined = enriched.reindex(lots_df[ENRICHMENT_KEY].str.strip()).fillna('')
+    joined.index = lots_df.index
+    return lots_df.join(joined)
+
+
+def _build_incremental(raw, hashes, previous):
+    """Typed frame for raw, reusing rows of the previous store whose CSV row didn't change"""
+    columns = list(build_lots_frame(raw.iloc[:0]).columns)
+    if previous is None or set(previous.columns) != set(columns) | {ROW_HASH}:
+        return build_lots_frame(raw), len(raw)
+
+    known = previous.drop_duplicates(ROW_HASH).set_index(ROW_HASH)
+    reuse = pd.Index(hashes).isin(known.index)
+    parts = []
+    if reuse.any():
+        reused = known.loc[hashes[reuse], columns]
+        reused.index = raw.index[reuse]
+        parts.append(reused)
+    if not reuse.all():
+        parts.append(build_lots_frame(raw[~reuse]))
+    df = pd.concat(parts) if len(parts) > 1 else parts[0]
+    return df.loc[raw.index], int((~reuse).sum())
+
+
+def write_store(name, directory=STORE_DIR, previous=None):
+    """Parse the source CSV into the store, re-parsing only rows that changed since previous"""
+    source = SOURCES[name]
+    # Fingerprint before reading: if the CSV changes meanwhile the next load rebuilds again
+    meta = _source_meta(source)
+    raw = pd.read_csv(open_committed(source), dtype=str)
+    hashes = pd.util.hash_pandas_object(raw, index=False).to_numpy()
+
+    df, parsed = _build_incremental(raw, hashes, previous)
+    df[ROW_HASH] = hashes
+    df = df.reset_index(drop=True)
+    _write_table(name, df, meta, directory)
+    logger.info(f"Lot store written: {store_path(name, directory)} ({len(df)} rows, {parsed} parsed)")
+    return df
+
+
+def load_lots(name='lots', directory=STORE_DIR):
+    """Typed lots frame; re-parses changed rows first if its CSV changed"""
+    source = SOURCES[name]
+    if not os.path.exists(source):
+        raise FileNotFoundError(source)
+
+    table, meta = read_store(name, directory)
+    (_, mtime_ns, size), = source_fingerprint(source)
+    if table is not None and (meta.get('mtime_ns'), meta.get('size')) == (mtime_ns, size):
+        return _to_frame(table)
+
+    previous = _to_frame(table) if table is not None else None
+    del table
+    try:
+        sha1 = content_hash(source)
+        if previous is not None and meta.get('sha1') == sha1:
+            # Rewritten with the same content: only the fingerprint needs updating
+            _write_table(name, previous, _source_meta(source, sha1), directory)
+            return previous
+        return write_store(name, directory=directory, previous=previous)
+    except OSError as e:
+        # Another reader may hold the old file open; serve from CSV this time
+        logger.warning(f"Lot store write failed ({name}): {e}")
+        return build_lots_frame(pd.read_csv(open_committed(source), dtype=str))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for store_name, source in SOURCES.items():
+        if os.path.exists(source):
+            write_store(store_name)
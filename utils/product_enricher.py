@@ -1,22 +1,99 @@
 from utils.chatgpt_manager import ChatGPTManager
-from typing import Dict
+from utils.lot_store import ENRICHMENT_COLUMNS, ENRICHMENT_KEY, ENRICHMENT_STORE, SOURCES, STORE_DIR, read_frame, write_frame
+from typing import Dict, List
+from datetime import datetime
+import logging
 import os
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ENRICHED_FIELDS = ENRICHMENT_COLUMNS
+TITLE_COLUMN = ENRICHMENT_KEY
 
 class ProductEnricher:
     def __init__(self):
         api_key = os.getenv('OPENAI_API_KEY')
-        self.chatgpt = ChatGPTManager(api_key)
+        self.chatgpt = ChatGPTManager(api_key, base_url=os.getenv('OPENAI_BASE_URL'))
 
     def enrich_product(self, product_data: Dict) -> Dict:
         """Enrich product data with ChatGPT generated content"""
-        title = product_data['title']
-        
-        # Cache'den veya API'den bilgileri al
-        enriched_data = {
-            'technical_description': self.chatgpt.get_technical_description(title),
-            'specifications': self.chatgpt.get_specifications(title),
-            'model_number': self.chatgpt.get_model_number(title),
-            'brand': self.chatgpt.get_brand(title)
-        }
-        
-        return {**product_data, **enriched_data} 
\ No newline at end of file
+        # Cache'den veya tek bir API isteğinden tüm alanları al
+        listing = self.chatgpt.get_listing_content(product_data['title'])
+        return {**product_data, **{field: listing[field] for field in ENRICHED_FIELDS}}
+
+    def enrich_products(self, products: List[Dict], concurrency: int = 8) -> List[Dict]:
+        """enrich_product for many products, requested concurrently"""
+        listings = self.chatgpt.get_listing_contents([product['title'] for product in products], concurrency)
+        return [{**product, **{field: listings[product['title']][field] for field in ENRICHED_FIELDS}}
+                for product in products]
+
+    def enrich_catalog(self, source: str = SOURCES['lots'], chunk_size: int = 200, concurrency: int = 8,
+                       resume: bool = True, progress=None, directory: str = STORE_DIR) -> Dict:
+        """Enrich every lot name of a lots CSV into the enrichment store, chunk by chunk.
+
+        Names already in the store (resume) are skipped and names in the LLM
+        cache cost no request; the store is rewritten after each chunk, so an
+        interrupted run continues where it stopped. with_enrichment() joins the
+        store back onto the lots frame.
+        """
+        stored = read_frame(ENRICHMENT_STORE, directory) if resume else None
+        if stored is None or TITLE_COLUMN not in stored.columns:
+            stored = pd.DataFrame(columns=[TITLE_COLUMN, *ENRICHED_FIELDS, 'enriched_at'])
+        done = set(stored[TITLE_COLUMN])
+
+        # İsim sütunu tek başına ucuz; toplamı bilmek ilerleme için gerekli
+        titles = pd.read_csv(source, usecols=[TITLE_COLUMN], dtype=str)[TITLE_COLUMN].dropna().str.strip()
+        titles = [title for title in dict.fromkeys(titles) if title]
+        todo = [title for title in titles if title not in done]
+        resumed = len(titles) - len(todo)
+        stats = {'titles': len(titles), 'resumed': resumed, 'cached': 0, 'requested': 0,
+                 'enriched': 0, 'failed': 0}
+        report(progress, resumed, stats['titles'])
+        started = time.monotonic()
+
+        for i in range(0, len(todo), chunk_size):
+            chunk = todo[i:i + chunk_size]
+            cached = self.chatgpt.prefetch(chunk, 'listing_content')
+            listings = self.chatgpt.get_listing_contents(chunk, concurrency)
+
+            rows = []
+            for title in chunk:
+                listing = listings[title]
+                # Boş sonuçlar kaydedilmez, sonraki çalıştırmada tekrar denenir
+                if not any(listing[field] for field in ENRICHED_FIELDS):
+                    stats['failed'] += 1
+                    continue
+                rows.append({TITLE_COLUMN: title, **{field: listing[field] for field in ENRICHED_FIELDS},
+                             'enriched_at': datetime.now().isoformat()})
+            if rows:
+                stored = pd.concat([stored, pd.DataFrame(rows)], ignore_index=True)
+                write_frame(ENRICHMENT_STORE, stored, directory)
+
+            stats['cached'] += cached
+            stats['requested'] += len(chunk) - cached
+            stats['enriched'] += len(rows)
+            seconds = time.monotonic() - started
+            stats['seconds'] = seconds
+            stats['titles_per_second'] = (i + len(chunk)) / max(seconds, 1e-9)
+            logger.info(f"Enriched {resumed + i + len(chunk)}/{stats['titles']} titles "
+                        f"({stats['titles_per_second']:.1f}/s, {stats['cached']} from cache, "
+                        f"{stats['failed']} failed)")
+            report(progress, resumed + i + len(chunk), stats['titles'])
+
+        logger.info(f"Catalog enrichment finished: {stats}")
+        return stats
+
+
+def report(progress, done: int, total: int):
+    if progress:
+        progress('enrichment', done, total)
+
+
+def run_enrichment(progress=None) -> bool:
+    """Background job entry point (see src.scrapers.jobs)"""
+    stats = ProductEnricher().enrich_catalog(progress=progress)
+    # Only a run where every request failed counts as a failure
+    return not (stats['failed'] and not stats['enriched'])
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from utils.lot_store import parse_float
+
+# Fiyat önceliği: buy_it_now > estimate_bid > current_bid > opening_bid
+USE_BUY_IT_NOW = True
+USE_ESTIMATE = True
+USE_CURRENT_BID = False
+USE_OPENING_BID = False
+
+# eBay fee by price source; anything else is a similar-item match
+FEE_RATES = {
+    'ebay_exact': 0.25,
+    'google': 0.12,
+}
+DEFAULT_FEE_RATE = 0.26
+
+# Total cost must be <= 50% of the eBay price
+MAX_COST_RATIO = 0.5
+
+PRICE_MISSING = ['Unknown', 'Not Found', 'Not Available', 'No Bid', 'N/A']
+
+
+def clean_price_column(series):
+    """'£12.50' / 'Unknown' / NaN column -> float column (NaN when missing or unparseable)"""
+    text = series.astype(object).where(~series.isin(PRICE_MISSING))
+    return parse_float(text.astype(str).str.replace('£', '').str.strip().where(text.notna()))
+
+
+def _missing(series, tokens):
+    """True where a value is None or one of tokens (NaN counts as present, like the row checks)"""
+    values = series.to_numpy(dtype=object)
+    return series.isin(tokens).to_numpy() | np.equal(values, None)
+
+
+def _to_float(series, remove=None):
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    text = series.astype(str)
+    if remove:
+        text = text.str.replace(remove, '')
+    return parse_float(text.str.strip())
+
+
+def estimate_high_price(estimates):
+    """Upper end of '200 GBP - 300 GBP' estimates; NaN when missing or unparseable"""
+    estimates = estimates.astype(object)
+    high = estimates.where(estimates.notna() & (estimates != 'Unknown')).astype(str).str.split('-').str[1]
+    return parse_float(high.str.replace('GBP', '').str.strip())
+
+
+def purchase_price(df, use_buy_it_now=USE_BUY_IT_NOW, use_estimate=USE_ESTIMATE,
+                   use_current_bid=USE_CURRENT_BID, use_opening_bid=USE_OPENING_BID):
+    """Bid used for costing, picked by the first enabled and present price in priority order"""
+    n = len(df)
+    bid = np.full(n, np.nan)
+    decided = np.zeros(n, dtype=bool)
+
+    # (enabled, present mask, value) - first present one wins, even if its value doesn't parse
+    candidates = [
+        (use_buy_it_now, lambda: ~_missing(df['buy_it_now'], ['Unknown', '']),
+         lambda: _to_float(df['buy_it_now'], 'GBP')),
+        (use_estimate, lambda: df['estimate_bid'].notna().to_numpy(),
+         lambda: estimate_high_price(df['estimate_bid'])),
+        (use_current_bid, lambda: ~_missing(df['current_bid'], ['No Bid', '']),
+         lambda: _to_float(df['current_bid'])),
+        (use_opening_bid, lambda: ~_missing(df['opening_bid'], ['', 'Unknown']),
+         lambda: _to_float(df['opening_bid'])),
+    ]
+    for enabled, present, value in candidates:
+        if not enabled:
+            continue
+        take = present() & ~decided
+        bid[take] = value().to_numpy(dtype=float)[take]
+        decided |= take
+    return pd.Series(bid, index=df.index)
+
+
+def _round2(values):
+    # Python round() on Python floats (np.float64 rounds differently) so results match the row functions
+    return np.array([round(value, 2) for value in np.asarray(values, dtype=float).tolist()], dtype=float)
+
+
+def total_cost(df, **priority):
+    """Bid + VAT + commission, rounded to pence"""
+    bid = purchase_price(df, **priority).to_numpy()
+    vat_rate = pd.to_numeric(df['vat_rate'], errors='coerce').to_numpy(dtype=float)
+    commission = pd.to_numeric(df['commission'], errors='coerce').to_numpy(dtype=float)
+    total = bid + bid * (vat_rate / 100) + bid * (commission / 100)
+    return pd.Series(_round2(total), index=df.index)
+
+
+def fee_rates(df):
+    """eBay fee rate per row from price_source"""
+    if 'price_source' not in df.columns:
+        return np.full(len(df), DEFAULT_FEE_RATE)
+    source = df['price_source'].astype(object)
+    rates = np.full(len(df), DEFAULT_FEE_RATE)
+    for name, rate in FEE_RATES.items():
+        rates[(source == name).to_numpy()] = rate
+    return rates
+
+
+def compute_profitability(df, **priority):
+    """Copy of df with total_cost, ebay_price, profit and is_profitable columns.
+
+    Same results as the row functions on the Profitability page; expects
+    ebay_lowest_price already cleaned to floats (see clean_price_column).
+    """
+    df = df.copy()
+    df['total_cost'] = total_cost(df, **priority)
+    ebay_price = pd.to_numeric(df['ebay_lowest_price'], errors='coerce').to_numpy(dtype=float)
+    df['ebay_price'] = ebay_price
+
+    cost = df['total_cost'].to_numpy()
+    fee = ebay_price * fee_rates(df)
+    df['profit'] = _round2(ebay_price - cost - fee)
+    df['is_profitable'] = ~np.isnan(ebay_price) & (cost <= ebay_price * MAX_COST_RATIO)
+    return df
@@ -0,0 +1,248 @@
+import json
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Added to every item weight for packaging (as the LLM estimate always did)
+PACKING_WEIGHT = 5
+SMALL_WEIGHT = 15
+SMALL_MAX_SIDE = 120
+MEDIUM_WEIGHT = 30
+
+# Below this the caller should ask the LLM instead
+MIN_CONFIDENCE = 0.5
+RULE_CONFIDENCE = 0.8
+# Title matched rules of different devices ("air fryer oven", "tv stand cabinet"): ask the LLM
+AMBIGUOUS_CONFIDENCE = 0.4
+# Pallets / "20 X ..." lots: one item's profile says nothing about the whole lot
+MULTI_ITEM_CONFIDENCE = 0.3
+CATEGORY_CONFIDENCE = 0.6
+MIN_SIMILARITY = 0.5
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+MULTI_ITEM_RE = re.compile(r'\b(?:pallets?|job lot|bulk lot|(?:[2-9]|\d{2,})\s?x)\b', re.IGNORECASE)
+# Accessory words after these come with the device ("tablet incl case"), they don't describe it
+INCLUDES_WORDS = {'with', 'incl', 'inc', 'including', 'includes', 'plus'}
+
+# Typical item size: length, width, height (cm), weight (kg)
+PROFILES = {
+    'accessory': (25, 20, 8, 0.5),
+    'watch': (12, 10, 8, 0.3),
+    'phone': (20, 12, 8, 0.5),
+    'headphones': (25, 20, 10, 0.5),
+    'camera': (25, 20, 15, 1.5),
+    'tablet': (30, 22, 5, 1),
+    'clothing': (35, 25, 12, 1),
+    'laptop': (45, 35, 10, 3),
+    'console': (40, 30, 15, 4),
+    'speaker': (60, 20, 20, 4),
+    'small_appliance': (40, 30, 30, 4),
+    'power_tool': (45, 35, 15, 4),
+    'vacuum': (75, 30, 25, 4),
+    'robot_vacuum': (45, 45, 15, 5),
+    'monitor': (70, 50, 20, 7),
+    'coffee_machine': (45, 35, 45, 8),
+    'desktop': (50, 25, 50, 10),
+    'printer': (55, 45, 35, 12),
+    'microwave': (55, 45, 35, 14),
+    'bicycle': (150, 30, 80, 15),
+    'tv': (130, 85, 20, 20),
+    'lawn_mower': (120, 60, 50, 30),
+    'furniture': (150, 80, 80, 40),
+    'large_appliance': (90, 65, 65, 70),
+}
+
+# Keyword phrase -> profile, most specific first
+KEYWORD_RULES = [
+    (('case', 'cover', 'charger', 'cable', 'adapter', 'screen protector', 'remote', 'strap', 'bag'), 'accessory'),
+    (('robot vacuum', 'robotic vacuum', 'roomba'), 'robot_vacuum'),
+    (('microwave',), 'microwave'),
+    (('washing machine', 'dishwasher', 'fridge', 'freezer', 'tumble dryer', 'range cooker', 'oven'),
+     'large_appliance'),
+    (('coffee machine', 'espresso', 'bean to cup', 'nespresso'), 'coffee_machine'),
+    (('lawn mower', 'lawnmower', 'mower'), 'lawn_mower'),
+    (('vacuum', 'hoover', 'dyson v'), 'vacuum'),
+    (('smartwatch', 'watch', 'necklace', 'bracelet'), 'watch'),
+    (('iphone', 'smartphone', 'mobile phone', 'galaxy s', 'pixel'), 'phone'),
+    (('headphones', 'earbuds', 'airpods', 'headset'), 'headphones'),
+    (('camera', 'lens', 'gopro', 'drone'), 'camera'),
+    (('ipad', 'tablet', 'kindle', 'ereader'), 'tablet'),
+    (('laptop', 'macbook', 'notebook', 'chromebook', 'thinkpad', 'latitude'), 'laptop'),
+    (('playstation', 'ps5', 'ps4', 'xbox', 'nintendo', 'console'), 'console'),
+    (('soundbar', 'speaker', 'amplifier'), 'speaker'),
+    (('kettle', 'toaster', 'blender', 'air fryer', 'food processor', 'mixer', 'iron', 'hair dryer'),
+     'small_appliance'),
+    (('drill', 'saw', 'grinder', 'sander', 'impact driver', 'power tool', 'multi tool'), 'power_tool'),
+    (('monitor', 'display', 'projector'), 'monitor'),
+    (('desktop', 'tower pc', 'imac', 'mac mini', 'workstation', 'server'), 'desktop'),
+    (('printer', 'scanner', 'photocopier'), 'printer'),
+    (('bike', 'bicycle', 'scooter'), 'bicycle'),
+    (('tv', 'television', 'oled', 'qled'), 'tv'),
+    (('sofa', 'table', 'chair', 'desk', 'wardrobe', 'bed', 'mattress', 'cabinet', 'shelving'), 'furniture'),
+    (('jacket', 'coat', 'dress', 'shirt', 'jeans', 'trainers', 'shoes', 'boots', 'clothing'), 'clothing'),
+]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def shipping_category(info: Dict) -> str:
+    """small / medium / large bucket of a shipping estimate (weight already includes packing)"""
+    if info['weight'] <= SMALL_WEIGHT and max(info['length'], info['width'], info['height']) <= SMALL_MAX_SIDE:
+        return 'small'
+    if info['weight'] <= MEDIUM_WEIGHT:
+        return 'medium'
+    return 'large'
+
+
+def finish_estimate(length: float, width: float, height: float, weight: float, **extra) -> Dict:
+    """Shipping dict from an item's size; adds the packing weight and the bucket"""
+    info = {'length': length, 'width': width, 'height': height, 'weight': weight + PACKING_WEIGHT, **extra}
+    info['category'] = shipping_category(info)
+    return info
+
+
+def is_multi_item(text: str) -> bool:
+    return bool(MULTI_ITEM_RE.search(text or ''))
+
+
+def match_rules(text: str) -> Tuple[Optional[str], float]:
+    """(profile, confidence) from the keyword rules, (None, 0) when nothing matches"""
+    tokens = tokenize(text)
+    padded = f" {' '.join(tokens)} "
+    # Title up to "with" / "incl": where a main accessory word ("laptop charger") would be
+    cut = next((i for i, token in enumerate(tokens) if token in INCLUDES_WORDS), len(tokens))
+    head = f" {' '.join(tokens[:cut])} "
+
+    matched = []
+    for phrases, profile in KEYWORD_RULES:
+        searched = head if profile == 'accessory' else padded
+        if any(f" {phrase} " in searched for phrase in phrases) and profile not in matched:
+            matched.append(profile)
+    if not matched:
+        return None, 0.0
+    if len(matched) == 1:
+        return matched[0], RULE_CONFIDENCE
+    devices = [profile for profile in matched if profile != 'accessory']
+    if matched[0] == 'accessory' and len(devices) == 1:
+        # Accessories name what they fit ("laptop charger"), so they win over the device
+        return 'accessory', RULE_CONFIDENCE
+    return matched[0], AMBIGUOUS_CONFIDENCE
+
+
+class ShippingEstimator:
+    """Local size / weight estimate for a title, so most products need no LLM call.
+
+    Three sources, the most confident answer wins:
+    - keyword rules on the title,
+    - the same rules on the title's eBay category path (category index),
+    - earlier LLM answers for a similar title (token overlap).
+    `stats` counts where each answer came from; report() sums up the calls avoided.
+    """
+
+    def __init__(self, known: Optional[Dict[str, Dict]] = None, category_index=None,
+                 min_confidence: float = MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self.category_index = category_index
+        self.lock = threading.Lock()
+        self.known = {}
+        self.postings: Dict[str, set] = {}
+        self.stats = {'cached': 0, 'rules': 0, 'category': 0, 'similar': 0, 'llm': 0}
+        for title, info in (known or {}).items():
+            self.learn(title, info)
+
+    def learn(self, title: str, info: Dict):
+        """Remember an LLM answer for similar-title lookups"""
+        tokens = frozenset(tokenize(title))
+        sizes = [info.get(key) for key in ('length', 'width', 'height', 'weight')]
+        if not tokens or not all(isinstance(size, (int, float)) for size in sizes):
+            return
+        with self.lock:
+            self.known[tokens] = info
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(tokens)
+
+    def _similar(self, title: str) -> Tuple[Optional[Dict], float]:
+        tokens = frozenset(tokenize(title))
+        with self.lock:
+            candidates = set().union(*(self.postings.get(token, ()) for token in tokens)) if tokens else set()
+            best, best_similarity = None, 0.0
+            for other in candidates:
+                similarity = len(tokens & other) / len(tokens | other)
+                if similarity > best_similarity:
+                    best, best_similarity = other, similarity
+            return (self.known[best], best_similarity) if best else (None, 0.0)
+
+    def _category_profile(self, title: str) -> Tuple[Optional[str], float, Optional[str]]:
+        if self.category_index is None:
+            return None, 0.0, None
+        match = self.category_index.best_match(title)
+        if not match:
+            return None, 0.0, None
+        profile, _ = match_rules(match['category_path'])
+        return profile, CATEGORY_CONFIDENCE if profile else 0.0, match['category_path']
+
+    def estimate(self, title: str) -> Dict:
+        """Best local estimate with 'confidence' and 'source'; confident when confidence >= min_confidence"""
+        candidates = []
+        profile, confidence = match_rules(title)
+        if profile:
+            candidates.append((confidence, 'rules', finish_estimate(*PROFILES[profile], profile=profile)))
+        profile, confidence, path = self._category_profile(title)
+        if profile:
+            candidates.append((confidence, 'category',
+                               finish_estimate(*PROFILES[profile], profile=profile, category_path=path)))
+        info, similarity = self._similar(title)
+        if info and similarity >= MIN_SIMILARITY:
+            size = {key: info[key] for key in ('length', 'width', 'height', 'weight')}
+            candidates.append((similarity, 'similar', {**size, 'category': shipping_category(size)}))
+
+        if not candidates:
+            return {'confidence': 0.0, 'source': None}
+        confidence, source, info = max(candidates, key=lambda candidate: candidate[0])
+        if is_multi_item(title):
+            confidence = min(confidence, MULTI_ITEM_CONFIDENCE)
+        return {**info, 'confidence': round(confidence, 2), 'source': source}
+
+    def is_confident(self, estimate: Dict) -> bool:
+        return estimate['confidence'] >= self.min_confidence
+
+    def record(self, source: str):
+        with self.lock:
+            self.stats[source] += 1
+
+    def report(self) -> Dict:
+        """LLM calls avoided by the cache and the local estimate, vs calls made"""
+        with self.lock:
+            local = self.stats['rules'] + self.stats['category'] + self.stats['similar']
+            avoided = self.stats['cached'] + local
+            total = avoided + self.stats['llm']
+            return {**self.stats, 'estimated_locally': local, 'calls_avoided': avoided, 'llm_calls': self.stats['llm'],
+                    'avoided_share': avoided / total if total else 0.0}
+
+
+def load_category_index():
+    """Shared eBay category index if the eBay service package and a category dump are available"""
+    try:
+        from src.services.category_index import get_category_index
+        return get_category_index()
+    except Exception as e:
+        logger.info(f"Shipping estimator runs without category priors: {e}")
+        return None
+
+
+def known_answers(responses: List[str]) -> Dict[str, Dict]:
+    """{title: shipping info} from cached LLM shipping responses that recorded their title"""
+    known = {}
+    for response in responses:
+        try:
+            info = json.loads(response)
+        except ValueError:
+            continue
+        if isinstance(info, dict) and info.get('title'):
+            known[info['title']] = info
+    return known